@@ -0,0 +1,53 @@
+"""add posting jobs
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 03:27:20.716767
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('posting_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_type', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('max_attempts', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_run_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('posting_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_posting_jobs_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_posting_jobs_next_run_at'), ['next_run_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_posting_jobs_status'), ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('posting_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_posting_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_posting_jobs_next_run_at'))
+        batch_op.drop_index(batch_op.f('ix_posting_jobs_id'))
+
+    op.drop_table('posting_jobs')
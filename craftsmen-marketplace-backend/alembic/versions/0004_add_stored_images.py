@@ -0,0 +1,45 @@
+"""add stored images
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 03:27:23.943130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_images',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('file_url', sa.String(length=500), nullable=False),
+    sa.Column('variants', sa.JSON(), nullable=True),
+    sa.Column('file_size', sa.Integer(), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('file_url')
+    )
+    with op.batch_alter_table('stored_images', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stored_images_content_hash'), ['content_hash'], unique=True)
+        batch_op.create_index(batch_op.f('ix_stored_images_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('stored_images', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stored_images_id'))
+        batch_op.drop_index(batch_op.f('ix_stored_images_content_hash'))
+
+    op.drop_table('stored_images')
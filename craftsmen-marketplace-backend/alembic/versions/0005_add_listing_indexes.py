@@ -0,0 +1,61 @@
+"""add listing indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 03:27:25.706429
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_items_product_id'), ['product_id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_created', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_orders_customer_created', ['customer_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_orders_status_created', ['status', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('posting_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_posting_jobs_next_run_at'))
+        batch_op.drop_index(batch_op.f('ix_posting_jobs_status'))
+        batch_op.create_index('ix_posting_jobs_status_next_run', ['status', 'next_run_at', 'id'], unique=False)
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_active_category_created', ['is_active', 'category', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_products_active_created', ['is_active', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_products_owner_active_created', ['owner_id', 'is_active', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_owner_active_created')
+        batch_op.drop_index('ix_products_active_created')
+        batch_op.drop_index('ix_products_active_category_created')
+
+    with op.batch_alter_table('posting_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_posting_jobs_status_next_run')
+        batch_op.create_index(batch_op.f('ix_posting_jobs_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_posting_jobs_next_run_at'), ['next_run_at'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_status_created')
+        batch_op.drop_index('ix_orders_customer_created')
+        batch_op.drop_index('ix_orders_created')
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_product_id'))
+        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
@@ -0,0 +1,107 @@
+"""add product search
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 09:12:41.318204
+
+Full-text index over name, description, category and ai_generated_caption.
+
+SQLite: an FTS5 table `products_fts` holding the active products, kept in
+sync by triggers on `products`. Batch migrations that rebuild `products`
+drop those triggers and must recreate them (see `_create_sqlite_triggers`).
+
+Postgres: a generated, weighted `search_vector` tsvector column with a
+partial GIN index over active products, so every write updates it without
+application code.
+
+Neither object is part of the models; alembic/env.py excludes them from
+autogenerate.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = "name, description, category, ai_generated_caption"
+
+# Name outranks category, then the caption, then the free-form description
+SQLITE_RANK = "bm25(10.0, 1.0, 5.0, 2.0)"
+
+POSTGRES_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(ai_generated_caption, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+)
+
+
+def _create_sqlite_triggers() -> None:
+    new_row = f"SELECT new.id, {', '.join('new.' + c for c in SEARCH_COLUMNS.split(', '))} WHERE new.is_active"
+    op.execute(f"""
+        CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts(rowid, {SEARCH_COLUMNS}) {new_row};
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN
+            DELETE FROM products_fts WHERE rowid = old.id;
+        END
+    """)
+    # Only re-index when a searched column or is_active changes, not on every post ID update
+    op.execute(f"""
+        CREATE TRIGGER products_fts_update AFTER UPDATE OF {SEARCH_COLUMNS}, is_active ON products BEGIN
+            DELETE FROM products_fts WHERE rowid = old.id;
+            INSERT INTO products_fts(rowid, {SEARCH_COLUMNS}) {new_row};
+        END
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        # Prefix indexes make `term*` queries for 2-6 character prefixes cheap;
+        # app/services/product_search.py relies on PREFIX_INDEX_LENGTHS matching
+        op.execute(f"""
+            CREATE VIRTUAL TABLE products_fts USING fts5(
+                {SEARCH_COLUMNS},
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6'
+            )
+        """)
+        op.execute(f"INSERT INTO products_fts(products_fts, rank) VALUES ('rank', '{SQLITE_RANK}')")
+        _create_sqlite_triggers()
+        op.execute(f"INSERT INTO products_fts(rowid, {SEARCH_COLUMNS}) SELECT id, {SEARCH_COLUMNS} FROM products WHERE is_active")
+    elif dialect == "postgresql":
+        op.add_column(
+            'products',
+            sa.Column(
+                'search_vector',
+                postgresql.TSVECTOR(),
+                sa.Computed(POSTGRES_SEARCH_VECTOR, persisted=True)
+            )
+        )
+        op.create_index(
+            'ix_products_search_vector', 'products', ['search_vector'],
+            postgresql_using='gin', postgresql_where=sa.text('is_active')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS products_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_insert")
+        op.execute("DROP TABLE IF EXISTS products_fts")
+    elif dialect == "postgresql":
+        op.drop_index('ix_products_search_vector', table_name='products')
+        op.drop_column('products', 'search_vector')
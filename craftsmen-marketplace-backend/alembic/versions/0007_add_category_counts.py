@@ -0,0 +1,38 @@
+"""add category counts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 11:04:52.870113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category_counts',
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('product_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+    # Start from the current catalog; product writes keep it up to date from here
+    op.execute(
+        "INSERT INTO category_counts (category, product_count) "
+        "SELECT COALESCE(category, ''), COUNT(*) FROM products WHERE is_active "
+        "GROUP BY COALESCE(category, '')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('category_counts')
@@ -0,0 +1,54 @@
+"""add sales rollups
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 11:47:19.502614
+
+The tables start empty. Fill them from existing orders with
+`python -m app.services.sales_rollups` before serving analytics.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'status')
+    )
+    op.create_table('daily_product_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id', 'status')
+    )
+    with op.batch_alter_table('daily_product_sales', schema=None) as batch_op:
+        batch_op.create_index('ix_daily_product_sales_owner_day', ['owner_id', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('daily_product_sales', schema=None) as batch_op:
+        batch_op.drop_index('ix_daily_product_sales_owner_day')
+
+    op.drop_table('daily_product_sales')
+    op.drop_table('daily_sales')
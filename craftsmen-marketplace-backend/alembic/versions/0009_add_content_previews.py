@@ -0,0 +1,41 @@
+"""add content previews
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 12:36:08.917342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('content_previews',
+    sa.Column('token', sa.String(length=32), nullable=False),
+    sa.Column('content', sa.JSON(), nullable=False),
+    sa.Column('product_name', sa.String(length=200), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('token')
+    )
+    with op.batch_alter_table('content_previews', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_content_previews_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('content_previews', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_content_previews_expires_at'))
+
+    op.drop_table('content_previews')
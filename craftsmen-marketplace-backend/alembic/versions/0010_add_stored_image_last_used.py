@@ -0,0 +1,33 @@
+"""add stored image last used
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 18:04:51.127734
+
+The prune grace period now starts when an upload last stored or reused an
+image, not when it was first stored. Existing rows start from created_at.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('stored_images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE stored_images SET last_used_at = created_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('stored_images', schema=None) as batch_op:
+        batch_op.drop_column('last_used_at')
@@ -0,0 +1,70 @@
+"""add product name search
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 20:37:15.604918
+
+Search ranks products whose name matches ahead of the rest. A column filter
+on `products_fts` ({name} : ...) still walks every document that holds the
+words in any column, so on SQLite names and categories get a second FTS5
+table, `products_fts_name`, whose doclists list name matches newest first
+and can be narrowed to a category without a join. It holds the active
+products and is kept in sync by triggers on `products`, which batch
+migrations that rebuild `products` must recreate (see
+`_create_sqlite_triggers`).
+
+Postgres needs nothing: name matches are the weight A entries of
+`search_vector`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_sqlite_triggers() -> None:
+    op.execute("""
+        CREATE TRIGGER products_fts_name_insert AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts_name(rowid, name, category) SELECT new.id, new.name, new.category WHERE new.is_active;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_name_delete AFTER DELETE ON products BEGIN
+            DELETE FROM products_fts_name WHERE rowid = old.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_name_update AFTER UPDATE OF name, category, is_active ON products BEGIN
+            DELETE FROM products_fts_name WHERE rowid = old.id;
+            INSERT INTO products_fts_name(rowid, name, category) SELECT new.id, new.name, new.category WHERE new.is_active;
+        END
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        # Same tokenizer and prefix indexes as products_fts, so one MATCH string serves both
+        op.execute("""
+            CREATE VIRTUAL TABLE products_fts_name USING fts5(
+                name, category,
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6'
+            )
+        """)
+        _create_sqlite_triggers()
+        op.execute("INSERT INTO products_fts_name(rowid, name, category) SELECT id, name, category FROM products WHERE is_active")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS products_fts_name_update")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_name_delete")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_name_insert")
+        op.execute("DROP TABLE IF EXISTS products_fts_name")
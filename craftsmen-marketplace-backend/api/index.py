@@ -18,5 +18,10 @@ except ImportError as e:
     sys.path.insert(0, str(project_root / "app"))
     from main import app
 
+# Vercel has no release phase, so migrations run on cold start; this is a
+# quick version check once the database is up to date
+from app.core.migrations import upgrade_database
+upgrade_database()
+
 # Add Mangum handler for serverless deployment
 handler = Mangum(app)
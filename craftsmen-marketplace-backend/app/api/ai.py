@@ -1,10 +1,14 @@
+from typing import List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.services.ai_service import AIService
-from app.schemas.schemas import GenerateCaptionResponse
+from app.services.gemini_client import GeminiBusyError
+from app.services.registry import get_ai_service
+from app.schemas.schemas import BatchCaptionResponse, GenerateCaptionResponse
 
 router = APIRouter()
-ai_service = AIService()
+
+# Products accepted by one /generate-captions/batch request
+MAX_BATCH_PRODUCTS = 100
 
 class CaptionRequest(BaseModel):
     product_name: str
@@ -12,10 +16,14 @@ class CaptionRequest(BaseModel):
     description: str = None
     category: str = None
 
+class BatchCaptionRequest(BaseModel):
+    products: List[CaptionRequest]
+
 @router.get("/test")
 async def test_ai_service():
     """Test endpoint to debug AI service"""
     try:
+        ai_service = get_ai_service()
         print(f"🔍 AI Service Model: {ai_service.model is not None}")
         print(f"🔍 Has Model: {hasattr(ai_service, 'model')}")
         if ai_service.model:
@@ -32,19 +40,27 @@ async def test_ai_service():
         return {"error": str(e)}
 
 @router.post("/generate-caption", response_model=GenerateCaptionResponse)
-async def generate_caption(request: CaptionRequest):
-    """Generate an AI caption for a product based on name and price"""
+async def generate_caption(request: CaptionRequest, fresh: bool = False):
+    """
+    Generate an AI caption for a product based on name and price
+    
+    The same product fields return the cached caption; pass `fresh=true`
+    to generate a new one.
+    """
     
     try:
-        caption_response = await ai_service.generate_product_caption(
+        caption_response = await get_ai_service().generate_product_caption(
             product_name=request.product_name,
             product_description=request.description,
             price=request.price,  # Already a float from the model
-            category=request.category
+            category=request.category,
+            fresh=fresh
         )
         
         return caption_response
         
+    except GeminiBusyError:
+        raise
     except Exception as e:
         # Return a fallback caption if AI generation fails
         price_text = f"{request.price} taka" if request.price else "best price"
@@ -54,3 +70,34 @@ async def generate_caption(request: CaptionRequest):
             caption=fallback_caption,
             hashtags=["#handmade", "#craftsmanship", "#beautiful", "#affordable", "#quality"]
         )
+
+@router.post("/generate-captions/batch", response_model=BatchCaptionResponse)
+async def generate_captions_batch(request: BatchCaptionRequest, fresh: bool = False):
+    """
+    Generate AI captions for several products at once
+    
+    Products are sent to Gemini together in one prompt (up to
+    `caption_batch_size` per call) instead of one call each. Captions come
+    back in the order of `products`. Cached captions are reused unless
+    `fresh=true`.
+    """
+    
+    if not request.products:
+        raise HTTPException(status_code=400, detail="products must not be empty")
+    if len(request.products) > MAX_BATCH_PRODUCTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PRODUCTS} products per batch")
+    
+    captions = await get_ai_service().generate_product_captions(
+        [
+            {
+                "product_name": product.product_name,
+                "product_description": product.description,
+                "price": product.price,
+                "category": product.category
+            }
+            for product in request.products
+        ],
+        fresh=fresh
+    )
+    
+    return BatchCaptionResponse(captions=captions)
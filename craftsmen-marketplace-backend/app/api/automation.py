@@ -1,17 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, List
 from pydantic import BaseModel
 
 from app.core.database import get_db
-from app.services.social_media_automation import SocialMediaAutomationService
-from app.models.models import Product
+from app.services.registry import get_social_automation
+from app.services.product_cache import get_cached_product
 
 router = APIRouter(prefix="/automation", tags=["social-media-automation"])
 
-# Initialize automation service
-automation_service = SocialMediaAutomationService()
-
 
 class MonitorPostRequest(BaseModel):
     """Request model for monitoring social media posts"""
@@ -38,14 +35,14 @@ class CommentResponse(BaseModel):
 async def monitor_product_post(
     request: MonitorPostRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Monitor a product's social media post for comments and automatically respond
     This runs in the background to continuously monitor interactions
     """
     
-    product = db.query(Product).filter(Product.id == request.product_id).first()
+    product = await get_cached_product(db, request.product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -64,7 +61,7 @@ async def monitor_product_post(
     
     # Start background monitoring
     background_tasks.add_task(
-        automation_service.monitor_and_respond_to_comments,
+        get_social_automation().monitor_and_respond_to_comments,
         post_ids
     )
     
@@ -91,7 +88,7 @@ async def handle_direct_message(request: DirectMessageRequest):
     }
     
     # Generate AI response
-    ai_response = await automation_service.handle_direct_message_inquiry(
+    ai_response = await get_social_automation().handle_direct_message_inquiry(
         message_text=request.message_text,
         sender_info=sender_info
     )
@@ -102,7 +99,7 @@ async def handle_direct_message(request: DirectMessageRequest):
         "sender_info": sender_info,
         "original_message": request.message_text,
         "response_type": "direct_message",
-        "business_hours": automation_service.is_business_hours()
+        "business_hours": get_social_automation().is_business_hours()
     }
 
 
@@ -114,7 +111,7 @@ async def generate_comment_response(request: CommentResponse):
     """
     
     # Generate response using the automation service
-    ai_response = await automation_service._generate_comment_response(
+    ai_response = await get_social_automation()._generate_comment_response(
         comment_text=request.comment_text,
         platform=request.platform
     )
@@ -139,7 +136,7 @@ async def get_business_status():
         "business_hours": {
             "start": settings.business_hours_start,
             "end": settings.business_hours_end,
-            "currently_open": automation_service.is_business_hours()
+            "currently_open": get_social_automation().is_business_hours()
         },
         "contact_info": {
             "phone": settings.business_phone,
@@ -157,7 +154,7 @@ async def get_business_status():
 async def update_business_hours(
     start_time: str,
     end_time: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update business hours for automated responses"""
     
@@ -177,11 +174,11 @@ async def update_business_hours(
 @router.get("/engagement-stats/{product_id}")
 async def get_product_engagement_stats(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get engagement statistics for a product's social media posts"""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await get_cached_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -190,7 +187,7 @@ async def get_product_engagement_stats(
     # Get Facebook engagement
     if product.facebook_post_id:
         try:
-            fb_stats = await automation_service._monitor_facebook_comments(
+            fb_stats = await get_social_automation()._monitor_facebook_comments(
                 product.facebook_post_id
             )
             stats["facebook"] = {
@@ -204,7 +201,7 @@ async def get_product_engagement_stats(
     # Get Instagram engagement
     if product.instagram_post_id:
         try:
-            ig_stats = await automation_service._monitor_instagram_comments(
+            ig_stats = await get_social_automation()._monitor_instagram_comments(
                 product.instagram_post_id
             )
             stats["instagram"] = {
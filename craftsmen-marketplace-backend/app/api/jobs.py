@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.query_budget import query_budget
+from app.models.models import PostingJob
+from app.schemas.schemas import JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+@query_budget(1)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the status and result of a background posting job"""
+    
+    job = await db.get(PostingJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return JobResponse.from_orm(job)
@@ -1,80 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-import os
-import uuid
 import json
-from PIL import Image
 
 from app.core.database import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, apply_keyset, paginate
 from app.models.models import Product
 from app.schemas.schemas import ProductResponse, FileUploadResponse
-from app.services.ai_service import AIService
-from app.services.social_media_automation import SocialMediaAutomationService
-from app.services.google_ai_agent import get_ai_agent
-from app.core.config import settings
+from app.services.registry import get_ai_agent, get_product_cache, get_social_automation
+from app.services.job_queue import enqueue_job
+from app.services.image_upload import (
+    save_product_image, resolve_product_image, local_image_path, platform_image_paths
+)
+from app.services.image_store import acquire_image
+from app.services.category_facets import record_category_change
+from app.services.gemini_client import GeminiBusyError
+from app.services.content_previews import consume_preview, post_content, save_preview
 
 router = APIRouter(prefix="/products", tags=["products"])
 
-# Initialize services
-ai_service = AIService()
-social_automation = SocialMediaAutomationService()
-
 
 @router.post("/upload-image", response_model=FileUploadResponse)
 async def upload_product_image(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Upload a product image"""
-    
-    # Validate file type
-    if not file.filename.lower().endswith(tuple(settings.allowed_extensions)):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed types: {', '.join(settings.allowed_extensions)}"
-        )
-    
-    # Check file size
-    contents = await file.read()
-    if len(contents) > settings.max_file_size:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File size too large. Maximum size: {settings.max_file_size / (1024*1024)}MB"
-        )
+    """Upload a product image (streamed, validated by content)"""
     
-    # Create uploads directory if it doesn't exist
-    os.makedirs(settings.upload_folder, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = file.filename.split('.')[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(settings.upload_folder, unique_filename)
-    
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    # Optimize image
-    try:
-        with Image.open(file_path) as img:
-            # Resize if too large
-            if img.width > 1200 or img.height > 1200:
-                img.thumbnail((1200, 1200), Image.Resampling.LANCZOS)
-                img.save(file_path, optimize=True, quality=85)
-    except Exception as e:
-        print(f"Error optimizing image: {str(e)}")
-    
-    return FileUploadResponse(
-        filename=unique_filename,
-        file_url=f"/uploads/{unique_filename}",
-        file_size=len(contents)
-    )
+    image_upload = await save_product_image(file, db)
+    await db.commit()
+    return image_upload
 
 
-@router.post("/create-and-post-native", response_model=Dict[str, Any])
+@router.post("/create-and-post-native", response_model=Dict[str, Any], status_code=202)
 async def create_product_and_auto_post_native(
-    file: UploadFile = File(...),  # Changed from image_file to file to match frontend
+    file: Optional[UploadFile] = File(None),  # Changed from image_file to file to match frontend
     product_name: str = Form(...),
     price: float = Form(...),
     description: Optional[str] = Form(None),
@@ -82,11 +43,24 @@ async def create_product_and_auto_post_native(
     caption: Optional[str] = Form(None),  # Accept pre-generated caption
     owner_id: int = Form(1),
     platforms: str = Form('["facebook", "instagram"]'),  # JSON string from FlutterFlow
-    db: Session = Depends(get_db)
+    storage_key: Optional[str] = Form(None),  # Key from POST /api/storage/presign instead of file
+    preview_token: Optional[str] = Form(None),  # From /preview-content; posts that content instead of generating
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Complete workflow for FlutterFlow: Upload image, create product, 
     generate AI caption with Google ADK, and auto-post to social media
+    
+    The image is either sent as `file` or uploaded beforehand to a
+    presigned URL and referenced by `storage_key`.
+    
+    With `preview_token`, the content generated by /preview-content is
+    posted as previewed and no caption is generated. A token is used up by
+    the post and must come with the product name and price it was
+    generated for.
+    
+    Caption generation and posting run as a background job; poll
+    GET /api/jobs/{job_id} for the result.
     """
     
     # Handle product name
@@ -94,8 +68,11 @@ async def create_product_and_auto_post_native(
     if not product_name_value:
         raise HTTPException(status_code=400, detail="Product name is required")
     
-    # Upload image first
-    image_upload = await upload_product_image(file=file, db=db)
+    # Check the token before anything is stored
+    previewed = post_content(await consume_preview(db, preview_token, product_name, price)) if preview_token else None
+    
+    # Store the image first
+    image_upload = await resolve_product_image(db, file, storage_key)
     
     # Create product in database
     db_product = Product(
@@ -104,15 +81,16 @@ async def create_product_and_auto_post_native(
         price=price,
         category=category,
         image_url=image_upload.file_url,
+        image_variants=image_upload.variants,
         owner_id=owner_id
     )
     
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    
-    # Get full image path for social media posting
-    image_path = os.path.join(settings.upload_folder, image_upload.filename)
+    await acquire_image(db, db_product.image_url)
+    await record_category_change(db, new_category=category, is_active=True)
+    await db.commit()
+    await db.refresh(db_product)
+    await get_product_cache().invalidate()
     
     # Parse platforms (FlutterFlow sends as JSON string)
     try:
@@ -120,139 +98,80 @@ async def create_product_and_auto_post_native(
     except:
         platforms_list = ["facebook", "instagram"]  # fallback
     
-    # Use enhanced Google AI Agent for caption generation (only if no caption provided)
-    if caption and caption.strip():
-        # Use the provided caption from frontend preview
-        ai_caption = caption
-        platform_content = {
-            "instagram": caption,
-            "facebook": caption
-        }
-        hashtags = []  # Extract hashtags from caption if needed
-        marketing_insights = {"caption_source": "frontend_preview"}
-        
-        # Extract hashtags from the provided caption
-        import re
-        hashtag_matches = re.findall(r'#\w+', caption)
-        hashtags = [tag.replace('#', '') for tag in hashtag_matches]
-        
-        print(f"✅ Using frontend-provided caption: {caption[:50]}...")
-        print(f"📝 Full caption: {caption}")
-        
-    else:
-        print("🤖 No caption provided from frontend, generating new one...")
-        print(f"🔍 Caption value received: '{caption}'")
-        # Generate new caption using AI
-        ai_agent = get_ai_agent()
-        
-        # Determine platform for optimization
-        platform_target = "both"
-        if len(platforms_list) == 1:
-            platform_target = platforms_list[0]
-        
-        # Generate enhanced content using Google ADK
-        try:
-            enhanced_content = await ai_agent.generate_enhanced_content(
-                product_name=product_name_value,
-                price=price,
-                category=category,
-                description=description,
-                target_audience="craft enthusiasts and art lovers",
-                platform=platform_target
-            )
-            
-            # Extract platform-specific content
-            platform_content = enhanced_content.get("platform_content", {})
-            ai_caption = enhanced_content.get("base_caption", "")
-            hashtags = enhanced_content.get("hashtags", [])
-            marketing_insights = enhanced_content.get("marketing_insights", {})
-            
-        except Exception as e:
-            print(f"Enhanced AI agent failed, using fallback: {e}")
-            # Fallback to basic AI service
-            ai_caption_response = await ai_service.generate_product_caption(
-                product_name=product_name_value,
-                product_description=description or "",
-                price=price,
-                category=category or "handmade"
-            )
-            # Extract the actual caption string from the response
-            ai_caption = ai_caption_response.caption
-            platform_content = {
-                "instagram": ai_caption,
-                "facebook": ai_caption
-            }
-            hashtags = ai_caption_response.hashtags
-            marketing_insights = {"fallback_used": True}
-    
-    # Use social media automation with enhanced content
-    automation_result = await social_automation.create_and_post_product_with_content(
-        image_path=image_path,
-        product_name=product_name_value,
-        price=price,
-        description=description,
-        category=category,
-        platforms=platforms_list,
-        ai_caption=ai_caption,
-        platform_content=platform_content,
-        hashtags=hashtags
+    # Caption generation (only if no caption provided) and posting happen in a queue worker
+    job = await enqueue_job(
+        db,
+        job_type="create_and_post_native",
+        payload={
+            "platforms": platforms_list,
+            "caption": caption,
+            "content": previewed
+        },
+        product_id=db_product.id
     )
     
-    # Update product with social media post IDs and enhanced data
-    post_results = automation_result.get("post_results", {})
-    if post_results.get("facebook", {}).get("post_id"):
-        db_product.facebook_post_id = post_results["facebook"]["post_id"]
-    if post_results.get("instagram", {}).get("post_id"):
-        db_product.instagram_post_id = post_results["instagram"]["post_id"]
-    
-    # Store AI-generated caption and insights
-    db_product.ai_generated_caption = ai_caption
-    
-    db.commit()
-    db.refresh(db_product)
-    
     return {
         "success": True,
         "product": {
             "id": db_product.id,
             "name": db_product.name,
             "price": db_product.price,
-            "image_url": db_product.image_url,
-            "ai_caption": db_product.ai_generated_caption,
-            "facebook_post_id": db_product.facebook_post_id,
-            "instagram_post_id": db_product.instagram_post_id
-        },
-        "enhanced_content": {
-            "platform_content": platform_content,
-            "hashtags": hashtags,
-            "marketing_insights": marketing_insights
+            "image_url": db_product.image_url
         },
-        "automation_result": automation_result,
-        "message": "Product created and posted to social media using enhanced Google ADK AI agent with automated business responses enabled"
+        "job_id": job.id,
+        "job_status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "message": "Product created; AI caption generation and social media posting are running in the background"
     }
 
 
 @router.get("/", response_model=List[Dict[str, Any]])
 async def get_products(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
     owner_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,  # X-Next-Cursor from the previous page; takes precedence over skip
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get list of products with optional filtering"""
+    """
+    Get list of products with optional filtering, newest first
     
-    query = db.query(Product).filter(Product.is_active == True)
+    Pass the X-Next-Cursor header of a response as `cursor` to fetch the
+    next page; `skip` still works but gets slower the deeper it goes.
+    Pages are cached per filter combination until a product changes.
+    """
+    
+    cache = get_product_cache()
+    cache_key = ("native_products", skip, limit, category, owner_id, cursor)
+    cached = await cache.get_listing(cache_key)
+    if cached is not None:
+        items, next_cursor = cached
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return items
+    
+    query = select(Product).where(Product.is_active == True)
     
     if category:
-        query = query.filter(Product.category == category)
+        query = query.where(Product.category == category)
     
     if owner_id:
-        query = query.filter(Product.owner_id == owner_id)
+        query = query.where(Product.owner_id == owner_id)
+    
+    if cursor:
+        # Keyset pagination: seek past the previous page instead of skipping rows
+        query = apply_keyset(query, Product.created_at, Product.id, cursor, db.bind.dialect.name)
+    else:
+        query = query.offset(skip)
     
-    products = query.offset(skip).limit(limit).all()
+    # Newest first; matches the (is_active, ..., created_at, id) indexes
+    query = query.order_by(Product.created_at.desc(), Product.id.desc())
+    result = await db.execute(query.limit(limit + 1))
+    products = paginate(result.scalars().all(), limit, response)
     
-    return [
+    items = [
         {
             "id": product.id,
             "name": product.name,
@@ -260,6 +179,8 @@ async def get_products(
             "description": product.description,
             "category": product.category,
             "image_url": product.image_url,
+            "thumbnail_url": (product.image_variants or {}).get("thumbnail", product.image_url),
+            "image_variants": product.image_variants,
             "ai_caption": product.ai_generated_caption,
             "facebook_post_id": product.facebook_post_id,
             "instagram_post_id": product.instagram_post_id,
@@ -267,6 +188,9 @@ async def get_products(
         }
         for product in products
     ]
+    
+    await cache.set_listing(cache_key, items, response.headers.get(NEXT_CURSOR_HEADER))
+    return items
 
 
 @router.post("/preview-content", response_model=Dict[str, Any])
@@ -275,11 +199,17 @@ async def preview_ai_content(
     price: float = Form(...),
     description: Optional[str] = Form(None),
     category: Optional[str] = Form(None),
-    platform: str = Form("both")
+    platform: str = Form("both"),
+    fresh: bool = False,  # Skip the caption cache, e.g. for a "regenerate" button
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Preview AI-generated content using Google ADK before posting
     Perfect for the Flutter frontend preview screen
+    
+    The content is stored server-side. Post it by passing the returned
+    `preview_token` to /post-with-preview or /create-and-post-native
+    before `preview_expires_at`.
     """
     
     # Get the enhanced AI agent
@@ -293,15 +223,19 @@ async def preview_ai_content(
             category=category,
             description=description,
             target_audience="craft enthusiasts and art lovers",
-            platform=platform
+            platform=platform,
+            fresh=fresh
         )
         
         # Analyze content performance
         base_caption = enhanced_content.get("base_caption", "")
         performance_analysis = await ai_agent.analyze_content_performance(base_caption)
+        preview = await save_preview(db, enhanced_content, name, price)
         
         return {
             "success": True,
+            "preview_token": preview.token,
+            "preview_expires_at": preview.expires_at.isoformat(),
             "content": enhanced_content,
             "performance_analysis": performance_analysis,
             "preview_data": {
@@ -313,20 +247,26 @@ async def preview_ai_content(
             "message": "Content preview generated successfully with Google ADK insights"
         }
         
+    except GeminiBusyError:
+        raise
     except Exception as e:
         # Fallback preview
         basic_caption = f"Check out this amazing {name}! Handcrafted with love and attention to detail. Perfect for anyone who appreciates quality craftsmanship. 💫\n\nPrice: ${price}"
+        basic_content = {
+            "base_caption": basic_caption,
+            "hashtags": ["#handmade", "#crafts", "#artisan", "#supportlocal"],
+            "platform_content": {
+                "instagram": basic_caption + "\n\n#handmade #crafts #artisan",
+                "facebook": basic_caption + "\n\n#handmade #crafts"
+            }
+        }
+        preview = await save_preview(db, basic_content, name, price)
         
         return {
             "success": True,
-            "content": {
-                "base_caption": basic_caption,
-                "hashtags": ["#handmade", "#crafts", "#artisan", "#supportlocal"],
-                "platform_content": {
-                    "instagram": basic_caption + "\n\n#handmade #crafts #artisan",
-                    "facebook": basic_caption + "\n\n#handmade #crafts"
-                }
-            },
+            "preview_token": preview.token,
+            "preview_expires_at": preview.expires_at.isoformat(),
+            "content": basic_content,
             "performance_analysis": {"analysis": "Basic content analysis", "error": str(e)},
             "preview_data": {
                 "instagram_preview": basic_caption + "\n\n#handmade #crafts #artisan",
@@ -343,18 +283,34 @@ async def post_with_previewed_content(
     image_file: UploadFile = File(...),
     name: str = Form(...),
     price: float = Form(...),
-    preview_content: str = Form(...),  # JSON string with previewed content
+    preview_content: Optional[str] = Form(None),  # JSON string with previewed content
     platforms: str = Form('["facebook", "instagram"]'),
     description: Optional[str] = Form(None),
     category: Optional[str] = Form(None),
     owner_id: int = Form(1),
-    db: Session = Depends(get_db)
+    preview_token: Optional[str] = Form(None),  # From /preview-content; replaces preview_content
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Post to social media using content that was previously previewed
     This is for when users approve the preview in Flutter
+    
+    Send either the `preview_token` returned by /preview-content (usable
+    once, with the same name and price) or the previewed JSON itself as
+    `preview_content`.
     """
     
+    # Resolve the previewed content before anything is stored
+    if preview_token:
+        content_data = await consume_preview(db, preview_token, name, price)
+    elif preview_content:
+        try:
+            content_data = json.loads(preview_content)
+        except ValueError:
+            content_data = {}
+    else:
+        raise HTTPException(status_code=400, detail="preview_token or preview_content is required")
+    
     # Upload image first
     image_upload = await upload_product_image(file=image_file, db=db)
     
@@ -365,23 +321,22 @@ async def post_with_previewed_content(
         price=price,
         category=category,
         image_url=image_upload.file_url,
+        image_variants=image_upload.variants,
         owner_id=owner_id
     )
     
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    
-    # Get full image path
-    image_path = os.path.join(settings.upload_folder, image_upload.filename)
+    await acquire_image(db, db_product.image_url)
+    await record_category_change(db, new_category=category, is_active=True)
+    await db.commit()
+    await db.refresh(db_product)
+    await get_product_cache().invalidate()
     
-    # Parse platforms and preview content
+    # Parse platforms
     try:
         platforms_list = json.loads(platforms) if isinstance(platforms, str) else platforms
-        content_data = json.loads(preview_content) if isinstance(preview_content, str) else preview_content
     except:
         platforms_list = ["facebook", "instagram"]
-        content_data = {}
     
     # Extract content from preview
     ai_caption = content_data.get("base_caption", f"Check out this amazing {name}!")
@@ -389,8 +344,8 @@ async def post_with_previewed_content(
     hashtags = content_data.get("hashtags", ["#handmade", "#crafts"])
     
     # Post using the previewed content
-    automation_result = await social_automation.create_and_post_product_with_content(
-        image_path=image_path,
+    automation_result = await get_social_automation().create_and_post_product_with_content(
+        image_path=await local_image_path(image_upload.file_url),
         product_name=name,
         price=price,
         description=description,
@@ -398,7 +353,8 @@ async def post_with_previewed_content(
         platforms=platforms_list,
         ai_caption=ai_caption,
         platform_content=platform_content,
-        hashtags=hashtags
+        hashtags=hashtags,
+        platform_image_paths=await platform_image_paths(image_upload.file_url, image_upload.variants)
     )
     
     # Update product with results
@@ -409,8 +365,9 @@ async def post_with_previewed_content(
         db_product.instagram_post_id = post_results["instagram"]["post_id"]
     
     db_product.ai_generated_caption = ai_caption
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    await db.refresh(db_product)
+    await get_product_cache().invalidate(db_product.id)
     
     return {
         "success": True,
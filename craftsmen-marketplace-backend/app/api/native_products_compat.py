@@ -9,5 +9,6 @@ router.add_api_route(
     "/create-and-post-native",
     create_product_and_auto_post_native,
     methods=["POST"],
-    response_model=dict
+    response_model=dict,
+    status_code=202
 )
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 
 from app.core.database import get_db
 from app.schemas.schemas import SpeechToTextResponse
+from app.services.category_facets import CATEGORY_KEYWORDS, DEFAULT_CATEGORY
 
 router = APIRouter(prefix="/speech", tags=["speech-native"])
 
@@ -33,7 +34,7 @@ class ParsedProductDetails(BaseModel):
 @router.post("/process-native-speech", response_model=ParsedProductDetails)
 async def process_native_speech_text(
     request: ParseSpeechRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Process speech text from Flutter native speech recognition
@@ -153,22 +154,13 @@ def _extract_product_info(text: str) -> dict:
 def _guess_category(text: str) -> Optional[str]:
     """Guess product category from speech text"""
     
-    categories = {
-        'jewelry': ['jewelry', 'necklace', 'bracelet', 'ring', 'earring', 'pendant'],
-        'pottery': ['pottery', 'ceramic', 'bowl', 'vase', 'mug', 'plate', 'clay'],
-        'woodwork': ['wooden', 'wood', 'carved', 'furniture', 'cutting board'],
-        'textiles': ['fabric', 'woven', 'knitted', 'embroidered', 'scarf', 'blanket'],
-        'art': ['painting', 'drawing', 'artwork', 'canvas', 'sculpture'],
-        'home decor': ['decoration', 'decorative', 'home', 'ornament']
-    }
-    
     text_lower = text.lower()
     
-    for category, keywords in categories.items():
+    for category, keywords in CATEGORY_KEYWORDS.items():
         if any(keyword in text_lower for keyword in keywords):
             return category.title()
     
-    return "Handmade"  # Default category
+    return DEFAULT_CATEGORY
 
 
 @router.post("/validate-speech-text", response_model=dict)
@@ -1,28 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.pagination import apply_keyset, paginate
+from app.core.query_budget import query_budget
 from app.models.models import Order, OrderItem, Product
-from app.schemas.schemas import OrderCreate, OrderResponse, OrderUpdate
-from app.services.ai_service import AIService
+from app.schemas.schemas import (
+    OrderCreate, OrderItemResponse, OrderResponse, OrderUpdate, ProductResponse, SalesAnalyticsResponse
+)
+from app.services.sales_rollups import record_status_change, sales_analytics
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
-ai_service = AIService()
+MAX_ANALYTICS_DAYS = 366
+
+
+def _order_with_items():
+    """
+    Select orders with their items and products loaded up front
+
+    Two queries in total however many orders are returned: the orders, then
+    one IN query for all of their items joined to their products.
+    """
+    return select(Order).options(
+        selectinload(Order.order_items).joinedload(OrderItem.product)
+    )
+
+
+async def _get_order(db: AsyncSession, order_id: int) -> Optional[Order]:
+    """Load a single order ready for OrderResponse serialization"""
+    result = await db.execute(
+        _order_with_items()
+        .where(Order.id == order_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
 
 @router.post("/", response_model=OrderResponse)
-async def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
-    """Create a new order"""
+@query_budget(3)
+async def create_order(order_data: OrderCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Create a new order
+    
+    Three statements in one transaction whatever the number of items: one IN
+    query for all referenced products, the order INSERT and a single
+    multi-row INSERT for the items. The response is built from those results
+    without reloading anything.
+    """
+    
+    if not order_data.items:
+        raise HTTPException(status_code=422, detail="An order needs at least one item")
+    
+    # Verify all products exist in one round trip
+    product_ids = {item.product_id for item in order_data.items}
+    result = await db.execute(select(Product).where(Product.id.in_(product_ids)))
+    products = {product.id: product for product in result.scalars()}
     
     # Calculate total amount
     total_amount = 0
     order_items_data = []
     
     for item in order_data.items:
-        # Verify product exists
-        product = db.query(Product).filter(Product.id == item.product_id).first()
+        product = products.get(item.product_id)
         if not product:
             raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
         
@@ -40,7 +86,7 @@ async def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
             "price": item_price
         })
     
-    # Create order
+    # Create order; id and created_at come back from the INSERT itself
     db_order = Order(
         customer_name=order_data.customer_name,
         customer_phone=order_data.customer_phone,
@@ -51,52 +97,121 @@ async def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    await db.flush()
     
-    # Create order items
+    # Create all order items with one multi-row INSERT
     for item_data in order_items_data:
-        db_order_item = OrderItem(
-            order_id=db_order.id,
-            **item_data
-        )
-        db.add(db_order_item)
+        item_data["order_id"] = db_order.id
+    item_rows = (await db.execute(
+        insert(OrderItem)
+        .values(order_items_data)
+        .returning(OrderItem.id, OrderItem.product_id, OrderItem.quantity, OrderItem.price)
+    )).all()
     
-    db.commit()
+    await db.commit()
     
-    # Refresh to get relationships
-    db.refresh(db_order)
+    # RETURNING row order is not guaranteed; identical rows are interchangeable
+    item_ids = defaultdict(list)
+    for row in item_rows:
+        item_ids[(row.product_id, row.quantity, row.price)].append(row.id)
     
-    return OrderResponse.from_orm(db_order)
+    return OrderResponse(
+        id=db_order.id,
+        customer_name=db_order.customer_name,
+        customer_phone=db_order.customer_phone,
+        customer_email=db_order.customer_email,
+        delivery_address=db_order.delivery_address,
+        notes=db_order.notes,
+        total_amount=db_order.total_amount,
+        status=db_order.status,
+        created_at=db_order.created_at,
+        order_items=[
+            OrderItemResponse(
+                id=item_ids[(item_data["product_id"], item_data["quantity"], item_data["price"])].pop(0),
+                product_id=item_data["product_id"],
+                quantity=item_data["quantity"],
+                price=item_data["price"],
+                product=ProductResponse.from_orm(products[item_data["product_id"]])
+            )
+            for item_data in order_items_data
+        ]
+    )
 
 
 @router.get("/", response_model=List[OrderResponse])
+@query_budget(2)
 async def get_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: str = None,
     customer_id: int = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,  # X-Next-Cursor from the previous page; takes precedence over skip
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get list of orders with optional filtering"""
+    """
+    Get list of orders with optional filtering, newest first
+    
+    Pass the X-Next-Cursor header of a response as `cursor` to fetch the
+    next page; `skip` still works but gets slower the deeper it goes.
+    """
     
-    query = db.query(Order)
+    query = _order_with_items()
     
     if status:
-        query = query.filter(Order.status == status)
+        query = query.where(Order.status == status)
     
     if customer_id:
-        query = query.filter(Order.customer_id == customer_id)
+        query = query.where(Order.customer_id == customer_id)
     
-    orders = query.offset(skip).limit(limit).all()
+    if cursor:
+        # Keyset pagination: seek past the previous page instead of skipping rows
+        query = apply_keyset(query, Order.created_at, Order.id, cursor, db.bind.dialect.name)
+    else:
+        query = query.offset(skip)
+    
+    # Newest first; matches the (status|customer_id, created_at, id) indexes
+    query = query.order_by(Order.created_at.desc(), Order.id.desc())
+    result = await db.execute(query.limit(limit + 1))
+    orders = paginate(result.scalars().all(), limit, response)
     return [OrderResponse.from_orm(order) for order in orders]
 
 
+@router.get("/analytics", response_model=SalesAnalyticsResponse)
+@query_budget(3)
+async def get_sales_analytics(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    owner_id: Optional[int] = None,
+    limit: int = Query(10, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Sales per day, best-selling products and revenue per owner
+    
+    Days are the UTC days orders were placed, inclusive; the default is the
+    last 30. Read from the daily rollups that order transitions keep up to
+    date, never from the orders themselves. `owner_id` narrows products and
+    owners; the daily figures are marketplace-wide. Declared before
+    /{order_id} so "analytics" is not taken for an id.
+    """
+    
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_ANALYTICS_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ANALYTICS_DAYS} days per request")
+    
+    return await sales_analytics(db, start, end, owner_id=owner_id, limit=limit)
+
+
 @router.get("/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+async def get_order(order_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific order"""
     
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await _get_order(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -104,61 +219,68 @@ async def get_order(order_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{order_id}", response_model=OrderResponse)
+@query_budget(5)
 async def update_order(
     order_id: int,
     order_update: OrderUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an order"""
     
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await _get_order(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Update fields
+    # Update fields; a status change also moves the order between sales rollups
     update_data = order_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(order, field, value)
+    if update_data.get("status"):
+        await record_status_change(db, order, update_data.pop("status"), update_data)
+    else:
+        for field, value in update_data.items():
+            setattr(order, field, value)
     
-    db.commit()
-    db.refresh(order)
+    await db.commit()
     
+    # Items and products are still loaded (expire_on_commit=False); no reload needed
     return OrderResponse.from_orm(order)
 
 
 @router.post("/{order_id}/confirm")
-async def confirm_order(order_id: int, db: Session = Depends(get_db)):
+@query_budget(5)
+async def confirm_order(order_id: int, db: AsyncSession = Depends(get_db)):
     """Confirm an order"""
     
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await _get_order(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    order.status = "confirmed"
-    db.commit()
+    await record_status_change(db, order, "confirmed")
+    await db.commit()
     
     return {"message": "Order confirmed successfully"}
 
 
 @router.post("/{order_id}/complete")
-async def complete_order(order_id: int, db: Session = Depends(get_db)):
+@query_budget(5)
+async def complete_order(order_id: int, db: AsyncSession = Depends(get_db)):
     """Mark an order as completed"""
     
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await _get_order(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    order.status = "completed"
-    db.commit()
+    await record_status_change(db, order, "completed")
+    await db.commit()
     
     return {"message": "Order completed successfully"}
 
 
 @router.post("/{order_id}/cancel")
-async def cancel_order(order_id: int, db: Session = Depends(get_db)):
+@query_budget(5)
+async def cancel_order(order_id: int, db: AsyncSession = Depends(get_db)):
     """Cancel an order"""
     
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await _get_order(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -168,7 +290,8 @@ async def cancel_order(order_id: int, db: Session = Depends(get_db)):
             detail=f"Cannot cancel order with status: {order.status}"
         )
     
-    order.status = "cancelled"
-    db.commit()
+    # Only applies if the status is still the one checked above; 409 otherwise
+    await record_status_change(db, order, "cancelled")
+    await db.commit()
     
     return {"message": "Order cancelled successfully"}
@@ -1,98 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-import os
-import uuid
-from PIL import Image
 
 from app.core.database import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, apply_keyset, paginate
+from app.core.query_budget import query_budget
 from app.models.models import Product, User
 from app.schemas.schemas import (
     ProductCreate, ProductResponse, ProductUpdate,
     GenerateCaptionRequest, GenerateCaptionResponse,
     SocialMediaPostRequest, SocialMediaPostResponse,
-    FileUploadResponse
+    FileUploadResponse, CategoryCountResponse
 )
-from app.services.ai_service import AIService
-from app.services.social_media_automation import SocialMediaAutomationService
-from app.core.config import settings
+from app.services.registry import get_ai_service, get_product_cache, get_social_automation
+from app.services.job_queue import enqueue_job
+from app.services.image_upload import (
+    save_product_image, resolve_product_image, local_image_path, platform_image_paths
+)
+from app.services.image_store import acquire_image, release_image
+from app.services.category_facets import get_category_facets, record_category_change
+from app.services.product_cache import get_cached_product
+from app.services.product_search import build_search_query, search_terms
 
 router = APIRouter(prefix="/products", tags=["products"])
 
-# Initialize services
-ai_service = AIService()
-social_automation = SocialMediaAutomationService()
-
 
 @router.post("/upload-image", response_model=FileUploadResponse)
 async def upload_product_image(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Upload a product image"""
-    
-    # Validate file type
-    if not file.filename.lower().endswith(tuple(settings.allowed_extensions)):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed types: {', '.join(settings.allowed_extensions)}"
-        )
-    
-    # Check file size
-    contents = await file.read()
-    if len(contents) > settings.max_file_size:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File size too large. Maximum size: {settings.max_file_size / (1024*1024)}MB"
-        )
-    
-    # Create uploads directory if it doesn't exist
-    os.makedirs(settings.upload_folder, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = file.filename.split('.')[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(settings.upload_folder, unique_filename)
-    
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    # Optimize image
-    try:
-        with Image.open(file_path) as img:
-            # Resize if too large
-            if img.width > 1200 or img.height > 1200:
-                img.thumbnail((1200, 1200), Image.Resampling.LANCZOS)
-                img.save(file_path, optimize=True, quality=85)
-    except Exception as e:
-        print(f"Error optimizing image: {str(e)}")
-    
-    return FileUploadResponse(
-        filename=unique_filename,
-        file_url=f"/uploads/{unique_filename}",
-        file_size=len(contents)
-    )
+    """Upload a product image (streamed, validated by content)"""
+    
+    image_upload = await save_product_image(file, db)
+    await db.commit()
+    return image_upload
 
 
-@router.post("/create-and-post", response_model=Dict[str, Any])
+@router.post("/create-and-post", response_model=Dict[str, Any], status_code=202)
 async def create_product_and_auto_post(
-    image_file: UploadFile = File(...),
+    image_file: Optional[UploadFile] = File(None),
     name: str = Form(...),
     price: float = Form(...),
     description: Optional[str] = Form(None),
     category: Optional[str] = Form(None),
     owner_id: int = Form(...),
     platforms: List[str] = Form(["facebook", "instagram"]),
-    db: Session = Depends(get_db)
+    storage_key: Optional[str] = Form(None),  # Key from POST /api/storage/presign instead of image_file
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Complete workflow: Upload image, create product, generate AI caption, 
     and auto-post to social media with business automation
+    
+    The image is either sent as `image_file` or uploaded beforehand to a
+    presigned URL and referenced by `storage_key`.
+    
+    Caption generation and posting run as a background job; poll
+    GET /api/jobs/{job_id} for the result.
     """
     
-    # Upload image first
-    image_upload = await upload_product_image(file=image_file, db=db)
+    # Store the image first
+    image_upload = await resolve_product_image(db, image_file, storage_key)
     
     # Create product in database
     db_product = Product(
@@ -101,113 +71,213 @@ async def create_product_and_auto_post(
         price=price,
         category=category,
         image_url=image_upload.file_url,
+        image_variants=image_upload.variants,
         owner_id=owner_id
     )
     
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    
-    # Get full image path for social media posting
-    image_path = os.path.join(settings.upload_folder, image_upload.filename)
-    
-    # Use advanced social media automation
-    automation_result = await social_automation.create_and_post_product(
-        image_path=image_path,
-        product_name=name,
-        price=price,
-        description=description,
-        category=category,
-        platforms=platforms
+    await acquire_image(db, db_product.image_url)
+    await record_category_change(db, new_category=category, is_active=True)
+    await db.commit()
+    await db.refresh(db_product)
+    await get_product_cache().invalidate()
+    
+    # Caption generation and social posting happen in a queue worker
+    job = await enqueue_job(
+        db,
+        job_type="create_and_post",
+        payload={
+            "platforms": platforms
+        },
+        product_id=db_product.id
     )
     
-    # Update product with social media post IDs
-    post_results = automation_result.get("post_results", {})
-    if post_results.get("facebook", {}).get("post_id"):
-        db_product.facebook_post_id = post_results["facebook"]["post_id"]
-    if post_results.get("instagram", {}).get("post_id"):
-        db_product.instagram_post_id = post_results["instagram"]["post_id"]
-    
-    # Store AI-generated caption
-    db_product.ai_generated_caption = automation_result.get("ai_caption", "")
-    
-    db.commit()
-    db.refresh(db_product)
-    
     return {
         "success": True,
         "product": ProductResponse.from_orm(db_product),
-        "automation_result": automation_result,
-        "message": "Product created and posted to social media with automated business responses enabled"
+        "job_id": job.id,
+        "job_status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "message": "Product created; caption generation and social media posting are running in the background"
     }
 
 
 @router.get("/", response_model=List[ProductResponse])
+@query_budget(1)
 async def get_products(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
     owner_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,  # X-Next-Cursor from the previous page; takes precedence over skip
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get list of products with optional filtering"""
+    """
+    Get list of products with optional filtering, newest first
+    
+    Pass the X-Next-Cursor header of a response as `cursor` to fetch the
+    next page; `skip` still works but gets slower the deeper it goes.
+    Pages are cached per filter combination until a product changes.
+    """
+    
+    cache = get_product_cache()
+    cache_key = ("products", skip, limit, category, owner_id, cursor)
+    cached = await cache.get_listing(cache_key)
+    if cached is not None:
+        items, next_cursor = cached
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return items
     
-    query = db.query(Product).filter(Product.is_active == True)
+    query = select(Product).where(Product.is_active == True)
     
     if category:
-        query = query.filter(Product.category == category)
+        query = query.where(Product.category == category)
     
     if owner_id:
-        query = query.filter(Product.owner_id == owner_id)
+        query = query.where(Product.owner_id == owner_id)
+    
+    if cursor:
+        # Keyset pagination: seek past the previous page instead of skipping rows
+        query = apply_keyset(query, Product.created_at, Product.id, cursor, db.bind.dialect.name)
+    else:
+        query = query.offset(skip)
+    
+    # Newest first; matches the (is_active, ..., created_at, id) indexes
+    query = query.order_by(Product.created_at.desc(), Product.id.desc())
+    result = await db.execute(query.limit(limit + 1))
+    products = paginate(result.scalars().all(), limit, response)
+    items = [ProductResponse.from_orm(product) for product in products]
+    
+    await cache.set_listing(
+        cache_key,
+        [item.model_dump(mode="json") for item in items],
+        response.headers.get(NEXT_CURSOR_HEADER)
+    )
+    return items
+
+
+@router.get("/search", response_model=List[ProductResponse])
+@query_budget(1)
+async def search_products(
+    q: str,
+    skip: int = 0,
+    limit: int = Query(20, le=100),
+    category: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over product name, description, category and caption
+    
+    Every word must match and the last one may be a prefix ("blue pot"
+    finds "Blue Pottery Vase"); products whose name matches come first, then
+    the rest, newest first within each. Declared before
+    /{product_id} so "search" is not taken for an id.
+    """
+    
+    terms = search_terms(q)
+    if not terms:
+        return []
+    
+    cache = get_product_cache()
+    cache_key = ("search", terms, category, skip, limit)
+    cached = await cache.get_listing(cache_key)
+    if cached is not None:
+        return cached[0]
+    
+    result = await db.execute(build_search_query(terms, db.bind.dialect.name, category, skip, limit))
+    items = [ProductResponse.from_orm(product) for product in result.scalars().all()]
+    
+    await cache.set_listing(cache_key, [item.model_dump(mode="json") for item in items], None)
+    return items
+
+
+@router.get("/categories", response_model=List[CategoryCountResponse])
+@query_budget(1)
+async def get_category_counts(db: AsyncSession = Depends(get_db)):
+    """
+    Active product count per category, largest first
+    
+    Read from the `category_counts` table that product writes keep up to
+    date, so the cost does not grow with the catalog. The categories
+    speech parsing can produce are always listed, at zero if unused.
+    Declared before /{product_id} so "categories" is not taken for an id.
+    """
+    
+    cache = get_product_cache()
+    cached = await cache.get_listing(("categories",))
+    if cached is not None:
+        return cached[0]
     
-    products = query.offset(skip).limit(limit).all()
-    return [ProductResponse.from_orm(product) for product in products]
+    items = [
+        CategoryCountResponse(category=category, count=count)
+        for category, count in await get_category_facets(db)
+    ]
+    
+    await cache.set_listing(("categories",), [item.model_dump() for item in items], None)
+    return items
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db: Session = Depends(get_db)):
+@query_budget(1)
+async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific product"""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await get_cached_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    return ProductResponse.from_orm(product)
+    return product
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: int,
     product_update: ProductUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a product"""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Update fields
     update_data = product_update.dict(exclude_unset=True)
+    was_active = product.is_active
+    old_category = product.category
     for field, value in update_data.items():
         setattr(product, field, value)
     
-    db.commit()
-    db.refresh(product)
+    # Keep the stored image's reference count in step with (re)activation
+    if product.is_active and not was_active:
+        await acquire_image(db, product.image_url)
+    elif was_active and not product.is_active:
+        await release_image(db, product.image_url)
+    await record_category_change(db, old_category, was_active, product.category, product.is_active)
+    
+    await db.commit()
+    await db.refresh(product)
+    await get_product_cache().invalidate(product_id)
     
     return ProductResponse.from_orm(product)
 
 
 @router.delete("/{product_id}")
-async def delete_product(product_id: int, db: Session = Depends(get_db)):
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a product (soft delete)"""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    if product.is_active:
+        await release_image(db, product.image_url)
+        await record_category_change(db, old_category=product.category, was_active=True)
     product.is_active = False
-    db.commit()
+    await db.commit()
+    await get_product_cache().invalidate(product_id)
     
     return {"message": "Product deleted successfully"}
 
@@ -215,24 +285,31 @@ async def delete_product(product_id: int, db: Session = Depends(get_db)):
 @router.post("/{product_id}/generate-caption", response_model=GenerateCaptionResponse)
 async def generate_product_caption(
     product_id: int,
-    db: Session = Depends(get_db)
+    fresh: bool = False,  # Skip the caption cache
+    db: AsyncSession = Depends(get_db)
 ):
     """Generate a new AI caption for a product"""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await get_cached_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    caption_response = await ai_service.generate_product_caption(
+    caption_response = await get_ai_service().generate_product_caption(
         product_name=product.name,
         product_description=product.description,
         price=product.price,
-        category=product.category
+        category=product.category,
+        fresh=fresh
     )
     
     # Update product with new caption
-    product.ai_generated_caption = caption_response.caption
-    db.commit()
+    await db.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(ai_generated_caption=caption_response.caption)
+    )
+    await db.commit()
+    await get_product_cache().invalidate(product_id)
     
     return caption_response
 
@@ -241,42 +318,42 @@ async def generate_product_caption(
 async def post_product_to_social_media(
     product_id: int,
     platforms: List[str] = ["facebook", "instagram"],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Post an existing product to social media platforms with business automation"""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await get_cached_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     if not product.image_url:
         raise HTTPException(status_code=400, detail="Product has no image")
     
-    # Construct full image path
-    filename = product.image_url.split('/')[-1]
-    image_path = os.path.join(settings.upload_folder, filename)
-    
-    # Use advanced social media automation
-    automation_result = await social_automation.create_and_post_product(
-        image_path=image_path,
+    # Use advanced social media automation with the platform-sized renditions
+    automation_result = await get_social_automation().create_and_post_product(
+        image_path=await local_image_path(product.image_url),
         product_name=product.name,
         price=product.price,
         description=product.description,
         category=product.category,
-        platforms=platforms
+        platforms=platforms,
+        platform_image_paths=await platform_image_paths(product.image_url, product.image_variants)
     )
     
     # Update product with social media post IDs
     post_results = automation_result.get("post_results", {})
+    values = {}
     if post_results.get("facebook", {}).get("post_id"):
-        product.facebook_post_id = post_results["facebook"]["post_id"]
+        values["facebook_post_id"] = post_results["facebook"]["post_id"]
     if post_results.get("instagram", {}).get("post_id"):
-        product.instagram_post_id = post_results["instagram"]["post_id"]
+        values["instagram_post_id"] = post_results["instagram"]["post_id"]
     
     # Update AI-generated caption
-    product.ai_generated_caption = automation_result.get("ai_caption", "")
+    values["ai_generated_caption"] = automation_result.get("ai_caption", "")
     
-    db.commit()
+    await db.execute(update(Product).where(Product.id == product_id).values(**values))
+    await db.commit()
+    await get_product_cache().invalidate(product_id)
     
     return {
         "success": True,
@@ -1,25 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import base64
 
 from app.core.database import get_db
 from app.schemas.schemas import SpeechToTextRequest, SpeechToTextResponse
-from app.services.speech_service import SpeechToTextService
+from app.services.registry import get_speech_service
 
 router = APIRouter(prefix="/speech", tags=["speech"])
 
-speech_service = SpeechToTextService()
-
 
 @router.post("/text-to-speech", response_model=SpeechToTextResponse)
 async def convert_speech_to_text(
     request: SpeechToTextRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Convert base64 encoded audio data to text"""
     
     try:
-        result = await speech_service.convert_speech_to_text(
+        result = await get_speech_service().convert_speech_to_text(
             audio_data=request.audio_data,
             language=request.language
         )
@@ -35,7 +33,7 @@ async def convert_speech_to_text(
 async def convert_audio_file_to_text(
     audio_file: UploadFile = File(...),
     language: str = "en-US",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Convert uploaded audio file to text"""
     
@@ -56,7 +54,7 @@ async def convert_audio_file_to_text(
             f.write(contents)
         
         # Convert to text
-        result = await speech_service.convert_audio_file_to_text(
+        result = await get_speech_service().convert_audio_file_to_text(
             file_path=temp_file_path,
             language=language
         )
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.config import settings
+from app.schemas.schemas import PresignUploadRequest, PresignUploadResponse
+from app.services.image_upload import is_allowed_format
+from app.services.registry import get_storage
+from app.services.storage import INCOMING_PREFIX, LocalStorage, new_incoming_key
+
+router = APIRouter(prefix="/storage", tags=["storage"])
+
+_IMAGE_CONTENT_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+
+@router.post("/presign", response_model=PresignUploadResponse)
+async def presign_upload(request: PresignUploadRequest):
+    """
+    Issue a presigned URL so the app can upload an image straight to storage
+    
+    Upload the bytes as described by the response, then pass `storage_key`
+    to a create-and-post endpoint instead of a multipart file.
+    """
+    
+    if not is_allowed_format(_IMAGE_CONTENT_TYPES.get(request.content_type)):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid content type. Allowed types: {', '.join(settings.allowed_extensions)}"
+        )
+    
+    key = new_incoming_key()
+    upload = get_storage().presign_upload(key, request.content_type)
+    return PresignUploadResponse(
+        storage_key=key,
+        expires_in=settings.storage_presign_expires,
+        **upload
+    )
+
+
+@router.put("/local-upload/{key:path}", status_code=204)
+async def local_presigned_upload(key: str, expires: int, signature: str, request: Request):
+    """Upload target for presigned URLs issued by the local storage backend"""
+    
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    if not key.startswith(INCOMING_PREFIX) or not LocalStorage.verify_signature(key, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload URL")
+    
+    # Enforce the size limit while streaming, as the bucket would for a presigned POST
+    chunks = []
+    total = 0
+    async for chunk in request.stream():
+        total += len(chunk)
+        if total > settings.max_file_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size too large. Maximum size: {settings.max_file_size / (1024*1024)}MB"
+            )
+        chunks.append(chunk)
+    
+    await storage.put(key, b"".join(chunks), request.headers.get("content-type", "application/octet-stream"))
@@ -12,6 +12,17 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./craftsmen_marketplace.db"
+    db_pool_size: int = 5  # Persistent connections per engine (Postgres)
+    db_max_overflow: int = 10  # Extra connections opened under burst load
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Seconds before a connection is replaced; below server/proxy idle timeouts
+    db_pool_pre_ping: bool = True  # Check connections on checkout so server restarts don't surface as errors
+    db_connect_timeout: int = 10  # Seconds to establish a Postgres connection
+    sqlite_journal_mode: str = "WAL"  # Readers don't block the writer and vice versa
+    sqlite_synchronous: str = "NORMAL"  # Safe with WAL; FULL fsyncs on every commit
+    sqlite_busy_timeout: int = 15000  # Milliseconds a writer waits for the lock before "database is locked"
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # Bytes of the database file read through mmap
+    sqlite_cache_size: int = 16 * 1024  # Page cache per connection, in KiB
     
     # Security
     secret_key: str = "your-secret-key-change-this-in-production"
@@ -24,6 +35,16 @@ class Settings(BaseSettings):
     
     # Gemini AI
     gemini_api_key: Optional[str] = None
+    gemini_max_concurrency: int = 8  # Concurrent in-flight Gemini requests per process
+    gemini_request_timeout: float = 30.0  # Seconds
+    gemini_rpm: int = 2000  # Requests per minute per process, 0 = unlimited (Gemini 2.0 Flash tier 1 allows 2000 per key)
+    gemini_tpm: int = 4000000  # Tokens per minute per process, 0 = unlimited (tier 1 allows 4M per key)
+    gemini_max_queue: int = 50  # Calls waiting per priority before requests get 503 Busy
+    caption_batch_size: int = 20  # Products per Gemini call in /ai/generate-captions/batch
+    caption_cache_ttl: float = 24 * 3600.0  # Seconds a generated caption is reused for the same product fields
+    caption_cache_max_entries: int = 1000  # In-memory entries per process
+    caption_cache_path: Optional[str] = None  # SQLite file shared by workers on the host, e.g. caption_cache.db; unset keeps memory only
+    preview_token_ttl: int = 3600  # Seconds a preview from /products/preview-content can be posted by token
     
     # Facebook API
     facebook_app_id: Optional[str] = None
@@ -38,15 +59,46 @@ class Settings(BaseSettings):
     
     # File Upload
     upload_folder: str = "uploads"
+    upload_incoming_folder: str = "uploads_incoming"  # Raw presigned uploads (EXIF intact); keep outside upload_folder
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     allowed_extensions: list = ["jpg", "jpeg", "png", "gif"]
+    max_upload_request_size: int = 11 * 1024 * 1024  # Whole multipart body: file plus form fields
+    image_pool_workers: int = 2  # Processes for image optimization; 0 runs it in a thread instead
+    image_prune_grace_hours: int = 24  # Unreferenced uploads younger than this are kept (product creation may follow)
+    
+    # Image Storage
+    storage_backend: str = "local"  # "local" (upload_folder) or "s3" (any S3-compatible service, e.g. MinIO)
+    storage_presign_expires: int = 900  # Seconds a presigned upload URL stays valid
+    s3_bucket: Optional[str] = None
+    s3_endpoint_url: Optional[str] = None  # Leave unset for AWS; e.g. http://localhost:9000 for MinIO
+    s3_region: Optional[str] = None
+    s3_access_key_id: Optional[str] = None
+    s3_secret_access_key: Optional[str] = None
+    s3_public_url: Optional[str] = None  # Base URL images are served from (CDN or bucket website)
+    
+    # Product Cache
+    product_cache_backend: str = "memory"  # "memory" (per process) or "redis" (shared by workers)
+    product_cache_ttl: float = 300.0  # Seconds a product stays cached
+    listing_cache_ttl: float = 30.0  # Seconds a listing page stays cached
+    product_cache_max_entries: int = 2000  # Products plus listing pages, memory backend only
+    category_reconcile_interval: float = 3600.0  # Seconds between category count checks in the API process; 0 disables
+    redis_url: Optional[str] = None  # e.g. redis://localhost:6379/0
     
     # Social Media Automation
+    social_post_timeout: float = 90.0  # Seconds allowed for each platform upload
     auto_respond_to_comments: bool = True
     auto_respond_to_messages: bool = True
     business_hours_start: str = "09:00"
     business_hours_end: str = "18:00"
     
+    # Background Posting Jobs
+    job_worker_count: int = 2  # In-process workers; set 0 when running `python -m app.services.job_queue` separately
+    job_poll_interval: float = 2.0  # Seconds between queue polls when idle
+    job_max_attempts: int = 5
+    job_retry_base_delay: float = 10.0  # Seconds; doubles on every retry
+    job_retry_max_delay: float = 600.0
+    job_lease_seconds: int = 600  # Running jobs older than this are assumed orphaned and requeued
+    
     # Business Information for AI Responses
     business_name: str = "Your Craft Business Name"
     business_location: str = "Your City, State"
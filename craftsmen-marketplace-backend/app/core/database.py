@@ -1,23 +1,126 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+
+# libpq query parameters that asyncpg.connect() rejects; sslmode is passed on as `ssl`
+_LIBPQ_ONLY_PARAMS = ("sslmode", "channel_binding", "connect_timeout")
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL to its async driver (aiosqlite / asyncpg)"""
+    if database_url.startswith("sqlite://"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql+asyncpg://", 1)
+    elif database_url.startswith("postgresql://") or database_url.startswith("postgresql+psycopg2://"):
+        database_url = "postgresql+asyncpg://" + database_url.split("://", 1)[1]
+    else:
+        return database_url
+    url = make_url(database_url)
+    return url.difference_update_query(_LIBPQ_ONLY_PARAMS).render_as_string(hide_password=False)
+
+
+def asyncpg_ssl(database_url: str) -> Optional[str]:
+    """The URL's sslmode (e.g. "require"), which asyncpg takes as its `ssl` argument"""
+    return make_url(database_url).query.get("sslmode")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    # A negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def engine_options(database_url: str) -> dict:
+    """
+    Keyword arguments for create_engine / create_async_engine
+    
+    Postgres gets a sized pool with pre-ping and recycling. SQLite keeps
+    SQLAlchemy's default pool; its tuning happens in the connect pragmas.
+    """
+    if database_url.startswith("sqlite"):
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                # Python's own lock wait, kept in line with busy_timeout
+                "timeout": settings.sqlite_busy_timeout / 1000
+            }
+        }
+    
+    if "+asyncpg" in database_url:
+        connect_args = {"timeout": settings.db_connect_timeout}
+    else:
+        connect_args = {"connect_timeout": settings.db_connect_timeout}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args
+    }
+
+
+def create_db_engine(database_url: str):
+    """Build a sync engine configured from settings"""
+    db_engine = create_engine(database_url, **engine_options(database_url))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def create_async_db_engine(database_url: str) -> AsyncEngine:
+    """Build an async engine configured from settings"""
+    async_url = get_async_database_url(database_url)
+    options = engine_options(async_url)
+    if "+asyncpg" in async_url and asyncpg_ssl(database_url):
+        options["connect_args"]["ssl"] = asyncpg_ssl(database_url)
+    db_engine = create_async_engine(async_url, **options)
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+# Create SQLAlchemy engine (sync - used by scripts; migrations build their own)
+engine = create_db_engine(settings.database_url)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engine used by the API routers
+async_engine = create_async_db_engine(settings.database_url)
+
+# Objects stay usable after commit so handlers can serialize them without
+# triggering lazy loads (which are not allowed on an AsyncSession)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class
 Base = declarative_base()
 
 
 # Dependency to get database session
-def get_db():
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,55 @@
+"""
+Apply Alembic migrations on deploy
+
+    python -m app.core.migrations
+
+Runs as the release step (Procfile, railway.toml) and on the cold start of
+the Vercel function (api/index.py), which has no release phase. It does
+what `alembic upgrade head` does, plus:
+
+    adoption  databases built by Base.metadata.create_all before migrations
+              existed have the tables but no alembic_version; they are
+              stamped at 0001 (the create_all schema) instead of running
+              0001 against tables that already exist
+    locking   on Postgres, a session advisory lock serializes concurrent
+              callers, e.g. several serverless instances starting at once
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.core.database import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent.parent / "alembic.ini"
+# Schema produced by create_all before migrations were introduced
+CREATE_ALL_REVISION = "0001"
+# Arbitrary key shared by every process that migrates this database
+ADVISORY_LOCK_KEY = 4_210_517
+
+
+def upgrade_database():
+    """Stamp a pre-migration database if needed, then upgrade to head"""
+    config = Config(str(ALEMBIC_INI))
+    with engine.connect() as connection:
+        postgres = connection.dialect.name == "postgresql"
+        if postgres:
+            connection.exec_driver_sql(f"SELECT pg_advisory_lock({ADVISORY_LOCK_KEY})")
+        try:
+            tables = inspect(connection).get_table_names()
+            # The lock's connection stays idle in a transaction otherwise
+            connection.rollback()
+            if "alembic_version" not in tables and "products" in tables:
+                print(f"📋 Tables exist without migration history; stamping {CREATE_ALL_REVISION}")
+                command.stamp(config, CREATE_ALL_REVISION)
+            command.upgrade(config, "head")
+        finally:
+            if postgres:
+                connection.exec_driver_sql(f"SELECT pg_advisory_unlock({ADVISORY_LOCK_KEY})")
+                connection.commit()
+
+
+if __name__ == "__main__":
+    upgrade_database()
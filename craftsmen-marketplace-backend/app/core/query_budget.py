@@ -0,0 +1,79 @@
+"""
+Per-request SQL query budgets
+
+Endpoints declare how many statements they may run with `@query_budget(n)`.
+Every statement executed through the async engine is counted against the
+request that issued it. The counter lives in a ContextVar, so concurrent
+requests and background workers do not mix. QueryBudgetMiddleware logs any
+request that overruns its endpoint's budget. In debug mode it also adds
+`X-Query-Count` / `X-Query-Budget` headers, which
+benchmarks/query_budgets.py uses to fail on N+1 regressions.
+"""
+
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import async_engine
+
+
+class _QueryCounter:
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+
+_current_counter: ContextVar[Optional[_QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare the maximum number of SQL statements an endpoint may run"""
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """Count each request's SQL statements and check them against the endpoint's budget"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = _QueryCounter()
+        token = _current_counter.set(counter)
+
+        async def checked_send(message: Message):
+            if message["type"] == "http.response.start":
+                # The endpoint has finished by the time its response starts
+                budget = getattr(scope.get("endpoint"), "__query_budget__", None)
+                if budget is not None and counter.count > budget:
+                    print(f"⚠️ {scope['method']} {scope['path']} ran {counter.count} SQL queries (budget {budget})")
+                if settings.debug:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Query-Count"] = str(counter.count)
+                    if budget is not None:
+                        headers["X-Query-Budget"] = str(budget)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, checked_send)
+        finally:
+            _current_counter.reset(token)
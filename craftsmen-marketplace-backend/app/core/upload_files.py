@@ -0,0 +1,85 @@
+"""
+Cache-friendly serving of uploaded product images
+
+Uploads are named after the sha256 of their content (see
+services/image_store.py), so a given URL can never change. They are served
+with a strong ETag and `Cache-Control: immutable`, and the Flutter client can
+keep them for a year instead of re-downloading them on every list refresh.
+Files with legacy uuid names get a short max-age and are revalidated with
+If-None-Match.
+
+Clients that send `Accept: image/webp` get the WebP rendition of a JPEG or
+PNG when one exists next to it and is smaller. Range requests and 304
+responses are handled by Starlette's FileResponse and StaticFiles.
+"""
+
+import os
+import re
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}(_[a-z]+)?\.[a-z]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+# Formats that may have a WebP rendition stored beside them
+_WEBP_CANDIDATES = (".jpg", ".jpeg", ".png")
+
+
+def accepts_webp(accept: str) -> bool:
+    """True when an Accept header lists image/webp with a non-zero quality"""
+    for media_range in accept.split(","):
+        media_type, _, params = media_range.strip().partition(";")
+        if media_type.strip().lower() != "image/webp":
+            continue
+        quality = params.strip().lower()
+        if not quality.startswith("q="):
+            return True
+        try:
+            return float(quality[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+class UploadFiles(StaticFiles):
+    """StaticFiles with long-lived caching and WebP negotiation for uploads"""
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path = str(full_path)
+        root, extension = os.path.splitext(path)
+        headers = {}
+
+        if extension.lower() in _WEBP_CANDIDATES:
+            # The representation depends on Accept, so shared caches must key on it
+            headers["vary"] = "Accept"
+            webp_path = root + ".webp"
+            if accepts_webp(request_headers.get("accept", "")) and os.path.isfile(webp_path):
+                webp_stat = os.stat(webp_path)
+                # Noisy photos occasionally encode larger as WebP; only swap when it saves bytes
+                if webp_stat.st_size < stat_result.st_size:
+                    path = webp_path
+                    stat_result = webp_stat
+
+        filename = os.path.basename(path)
+        if CONTENT_ADDRESSED_NAME.match(filename):
+            # The name is derived from the content, so it is a strong validator
+            headers["etag"] = f'"{filename}"'
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            headers["cache-control"] = DEFAULT_CACHE_CONTROL
+
+        response = FileResponse(path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,63 @@
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class MaxUploadSizeMiddleware:
+    """
+    Reject oversized multipart uploads before they are buffered
+
+    Requests whose Content-Length is over the limit are answered with 413
+    without reading the body. Chunked or mislabelled bodies are counted as
+    they stream in and aborted as soon as the limit is crossed.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int = None):
+        self.app = app
+        self.max_size = max_size or settings.max_upload_request_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = self._content_length(scope)
+        if content_length is not None and content_length > self.max_size:
+            response = JSONResponse(status_code=413, content={"detail": self._detail()})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _detail(self) -> str:
+        return f"Request too large. Maximum upload size: {settings.max_file_size / (1024*1024)}MB"
+
+    @staticmethod
+    def _is_multipart(scope: Scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == b"content-type":
+                return value.startswith(b"multipart/form-data")
+        return False
+
+    @staticmethod
+    def _content_length(scope: Scope):
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -32,6 +32,7 @@ class Product(Base):
     description = Column(Text)
     price = Column(Float, nullable=False)
     image_url = Column(String(500))
+    image_variants = Column(JSON)  # Rendition name -> URL, see services/image_pipeline.py
     ai_generated_caption = Column(Text)
     category = Column(String(100))
     is_active = Column(Boolean, default=True)
@@ -46,6 +47,13 @@ class Product(Base):
     # Relationships
     owner = relationship("User", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
+    
+    # Listing queries filter active products (optionally by category or owner), newest first
+    __table_args__ = (
+        Index("ix_products_active_created", "is_active", "created_at", "id"),
+        Index("ix_products_active_category_created", "is_active", "category", "created_at", "id"),
+        Index("ix_products_owner_active_created", "owner_id", "is_active", "created_at", "id"),
+    )
 
 
 class Order(Base):
@@ -69,6 +77,13 @@ class Order(Base):
     # Relationships
     customer = relationship("User", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order")
+    
+    # Order listings filter by status or customer, newest first
+    __table_args__ = (
+        Index("ix_orders_created", "created_at", "id"),
+        Index("ix_orders_status_created", "status", "created_at", "id"),
+        Index("ix_orders_customer_created", "customer_id", "created_at", "id"),
+    )
 
 
 class OrderItem(Base):
@@ -80,8 +95,8 @@ class OrderItem(Base):
     price = Column(Float, nullable=False)
     
     # Foreign Keys
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    product_id = Column(Integer, ForeignKey("products.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), index=True)
     
     # Relationships
     order = relationship("Order", back_populates="order_items")
@@ -99,3 +114,91 @@ class SocialMediaPost(Base):
     caption = Column(Text)
     engagement_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PostingJob(Base):
+    """Durable background job for caption generation and social posting"""
+    __tablename__ = "posting_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False)
+    status = Column(String(20), default="pending")  # pending, running, succeeded, failed
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON)  # Progress is saved here so retries skip finished steps
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    last_error = Column(Text)
+    next_run_at = Column(DateTime(timezone=True), server_default=func.now())
+    locked_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Foreign Key
+    product_id = Column(Integer, ForeignKey("products.id"))
+    
+    # Workers claim the oldest due job with a given status
+    __table_args__ = (
+        Index("ix_posting_jobs_status_next_run", "status", "next_run_at", "id"),
+    )
+
+
+class StoredImage(Base):
+    """Content-addressed upload: one row per distinct image, shared by products"""
+    __tablename__ = "stored_images"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)  # sha256 of the uploaded bytes
+    file_url = Column(String(500), unique=True, nullable=False)  # Main rendition
+    variants = Column(JSON)  # Rendition name -> URL, see services/image_pipeline.py
+    file_size = Column(Integer)
+    ref_count = Column(Integer, default=0)  # Active products using this image
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), default=func.now())  # Last stored or reused; prune grace starts here
+
+
+class ContentPreview(Base):
+    """Generated preview content, posted later by token instead of being regenerated or echoed back"""
+    __tablename__ = "content_previews"
+    
+    token = Column(String(32), primary_key=True)
+    content = Column(JSON, nullable=False)  # As returned by GoogleAIAgent.generate_enhanced_content
+    product_name = Column(String(200), nullable=False)
+    price = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class CategoryCount(Base):
+    """Active products per category, adjusted on every product write (see services/category_facets.py)"""
+    __tablename__ = "category_counts"
+    
+    category = Column(String(100), primary_key=True)  # "" for products without a category
+    product_count = Column(Integer, nullable=False, default=0)
+
+
+class DailySales(Base):
+    """Orders per creation day and status, adjusted on every order transition (see services/sales_rollups.py)"""
+    __tablename__ = "daily_sales"
+    
+    day = Column(Date, primary_key=True)  # UTC day the order was placed
+    status = Column(String(50), primary_key=True)  # confirmed, completed or cancelled
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class DailyProductSales(Base):
+    """Per-product breakdown of DailySales"""
+    __tablename__ = "daily_product_sales"
+    
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"))  # Product owner, copied so owner reports need no join
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    
+    # Owner reports read a date range of one owner's rows
+    __table_args__ = (
+        Index("ix_daily_product_sales_owner_day", "owner_id", "day"),
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Dict, Any
+from datetime import date, datetime
 
 
 # User Schemas
@@ -47,6 +47,7 @@ class ProductUpdate(BaseModel):
 class ProductResponse(ProductBase):
     id: int
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None
     ai_generated_caption: Optional[str] = None
     is_active: bool
     facebook_post_id: Optional[str] = None
@@ -58,6 +59,11 @@ class ProductResponse(ProductBase):
         from_attributes = True
 
 
+class CategoryCountResponse(BaseModel):
+    category: Optional[str] = None  # None for products without a category
+    count: int
+
+
 # Order Schemas
 class OrderItemBase(BaseModel):
     product_id: int
@@ -105,6 +111,60 @@ class OrderResponse(OrderBase):
         from_attributes = True
 
 
+# Sales Analytics Schemas
+class SalesTotals(BaseModel):
+    orders: int  # Confirmed or completed
+    revenue: float
+    completed_orders: int
+    cancelled_orders: int
+    cancelled_revenue: float
+
+
+class DailySalesResponse(SalesTotals):
+    day: date  # UTC day the orders were placed
+
+
+class ProductSalesResponse(BaseModel):
+    product_id: int
+    owner_id: Optional[int] = None
+    orders: int
+    units: int
+    revenue: float
+
+
+class OwnerSalesResponse(BaseModel):
+    owner_id: Optional[int] = None
+    units: int
+    revenue: float
+
+
+class SalesAnalyticsResponse(BaseModel):
+    start: date
+    end: date
+    totals: SalesTotals
+    days: List[DailySalesResponse]
+    products: List[ProductSalesResponse]  # Best sellers by revenue
+    owners: List[OwnerSalesResponse]
+
+
+# Posting Job Schemas
+class JobResponse(BaseModel):
+    id: int
+    job_type: str
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    next_run_at: Optional[datetime] = None
+    product_id: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
 # Speech Recognition Schema
 class SpeechToTextRequest(BaseModel):
     audio_data: str  # Base64 encoded audio data
@@ -129,6 +189,10 @@ class GenerateCaptionResponse(BaseModel):
     hashtags: List[str]
 
 
+class BatchCaptionResponse(BaseModel):
+    captions: List[GenerateCaptionResponse]  # In request order
+
+
 # Social Media Post Schema
 class SocialMediaPostRequest(BaseModel):
     product_id: int
@@ -147,6 +211,21 @@ class FileUploadResponse(BaseModel):
     filename: str
     file_url: str
     file_size: int
+    variants: Dict[str, str] = {}  # Rendition name -> URL (thumbnail, instagram, facebook, ...)
+
+
+# Direct-to-storage Upload Schemas
+class PresignUploadRequest(BaseModel):
+    content_type: str = "image/jpeg"
+
+
+class PresignUploadResponse(BaseModel):
+    storage_key: str  # Pass to create-and-post once the upload has finished
+    method: str  # POST (multipart form with `fields` plus a "file" part) or PUT (raw bytes)
+    url: str
+    fields: Dict[str, str] = {}
+    headers: Dict[str, str] = {}
+    expires_in: int  # Seconds
 
 
 # Native Speech Recognition Schemas
@@ -1,7 +1,21 @@
+import asyncio
+import json
+import re
 import google.generativeai as genai
-from typing import List
+from typing import Any, Dict, List
 from app.core.config import settings
 from app.schemas.schemas import GenerateCaptionResponse
+from app.services.caption_cache import caption_key
+from app.services.gemini_client import BACKGROUND, GeminiBusyError, generate_content
+from app.services.registry import get_caption_cache
+from app.services.single_flight import ai_flights
+
+# Bump when _create_caption_prompt, _create_batch_caption_prompt or their generation config
+# changes, so cached captions are retired
+CAPTION_PROMPT_VERSION = "1"
+
+# Output tokens allowed per product in a batched caption request
+BATCH_TOKENS_PER_PRODUCT = 160
 
 
 class AIService:
@@ -19,16 +33,20 @@ class AIService:
         product_name: str, 
         product_description: str = None, 
         price: float = None,
-        category: str = None
+        category: str = None,
+        fresh: bool = False
     ) -> GenerateCaptionResponse:
         """
         Generate an engaging caption for a product using Gemini AI
         
+        Captions are cached per product fields (see services/caption_cache.py).
+        
         Args:
             product_name: Name of the product
             product_description: Description of the product
             price: Price of the product
             category: Category of the product
+            fresh: Skip the cache and generate a new caption
             
         Returns:
             GenerateCaptionResponse with caption and hashtags
@@ -42,13 +60,37 @@ class AIService:
                 hashtags=["#handmade", "#craftsmanship", "#beautiful", "#affordable", "#quality"]
             )
         
+        cache = get_caption_cache()
+        key = caption_key(
+            "caption", CAPTION_PROMPT_VERSION,
+            name=product_name, description=product_description, price=price, category=category
+        )
+        cached = await cache.get(key, fresh=fresh)
+        if cached is not None:
+            return GenerateCaptionResponse(**cached)
+        
+        # Concurrent identical requests share one Gemini call
+        return await ai_flights.do(
+            key, lambda: self._generate_caption(key, product_name, product_description, price, category)
+        )
+    
+    async def _generate_caption(
+        self,
+        key: str,
+        product_name: str,
+        product_description: str,
+        price: float,
+        category: str
+    ) -> GenerateCaptionResponse:
+        """Call Gemini for a caption and cache it; falls back to a template on errors"""
         try:
             # Create a prompt for caption generation
             prompt = self._create_caption_prompt(product_name, product_description, price, category)
             print(f"🤖 Using Gemini AI for: {product_name} - {price} rupees")
             
             # Generate content using Gemini with higher creativity
-            response = self.model.generate_content(
+            response = await generate_content(
+                self.model,
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.9,  # Higher temperature for more creativity
@@ -69,11 +111,15 @@ class AIService:
             # Clean caption (remove hashtags from the main text)
             clean_caption = self._clean_caption(caption_text)
             
-            return GenerateCaptionResponse(
+            caption_response = GenerateCaptionResponse(
                 caption=clean_caption,
                 hashtags=hashtags
             )
+            await get_caption_cache().set(key, caption_response.model_dump())
+            return caption_response
             
+        except GeminiBusyError:
+            raise
         except Exception as e:
             print(f"❌ Error generating caption: {str(e)}")
             print(f"🔄 Using fallback for: {product_name}")
@@ -84,6 +130,161 @@ class AIService:
                 hashtags=["#handmade", "#craftsmanship", "#beautiful", "#affordable", "#quality"]
             )
     
+    async def generate_product_captions(
+        self,
+        products: List[Dict[str, Any]],
+        fresh: bool = False
+    ) -> List[GenerateCaptionResponse]:
+        """
+        Generate captions for several products with one Gemini call
+        
+        Cached captions are reused. The rest are requested together, up to
+        `caption_batch_size` products per call. A product whose caption is
+        missing or malformed in the reply falls back to
+        generate_product_caption on its own.
+        
+        Args:
+            products: Dicts with product_name and optionally
+                product_description, price and category
+            fresh: Skip the cache and generate new captions
+            
+        Returns:
+            One GenerateCaptionResponse per product, in order
+        """
+        if not self.model:
+            return [await self.generate_product_caption(**product) for product in products]
+        
+        cache = get_caption_cache()
+        keys = [
+            caption_key(
+                "caption", CAPTION_PROMPT_VERSION,
+                name=product["product_name"], description=product.get("product_description"),
+                price=product.get("price"), category=product.get("category")
+            )
+            for product in products
+        ]
+        captions: Dict[str, GenerateCaptionResponse] = {}
+        missing: Dict[str, Dict[str, Any]] = {}
+        for key, product in zip(keys, products):
+            if key in captions or key in missing:
+                continue
+            cached = await cache.get(key, fresh=fresh)
+            if cached is not None:
+                captions[key] = GenerateCaptionResponse(**cached)
+            else:
+                missing[key] = product
+        
+        pending = list(missing.items())
+        batches = [
+            pending[start:start + settings.caption_batch_size]
+            for start in range(0, len(pending), settings.caption_batch_size)
+        ]
+        replies = await asyncio.gather(*(
+            self._generate_caption_batch([product for _, product in batch]) for batch in batches
+        ))
+        
+        unparsed = []
+        for batch, parsed in zip(batches, replies):
+            for index, (key, product) in enumerate(batch):
+                if index in parsed:
+                    captions[key] = parsed[index]
+                    await cache.set(key, parsed[index].model_dump())
+                else:
+                    unparsed.append((key, product))
+        
+        if unparsed:
+            print(f"🔄 No usable batch caption for {len(unparsed)} product(s), generating them one by one")
+            singles = await asyncio.gather(*(
+                self.generate_product_caption(**product, fresh=True) for _, product in unparsed
+            ))
+            captions.update((key, caption) for (key, _), caption in zip(unparsed, singles))
+        
+        return [captions[key] for key in keys]
+    
+    async def _generate_caption_batch(self, products: List[Dict[str, Any]]) -> Dict[int, GenerateCaptionResponse]:
+        """Call Gemini once for several captions; returns the parsed ones by index (none on errors)"""
+        try:
+            prompt = self._create_batch_caption_prompt(products)
+            print(f"🤖 Using Gemini AI for a batch of {len(products)} captions")
+            
+            response = await generate_content(
+                self.model,
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.9,
+                    top_p=0.95,
+                    top_k=40,
+                    max_output_tokens=BATCH_TOKENS_PER_PRODUCT * len(products),
+                    response_mime_type="application/json",
+                )
+            )
+            return self._parse_caption_batch(response.text, len(products))
+            
+        except GeminiBusyError:
+            raise
+        except Exception as e:
+            print(f"❌ Error generating caption batch: {str(e)}")
+            return {}
+    
+    def _create_batch_caption_prompt(self, products: List[Dict[str, Any]]) -> str:
+        """Create a prompt asking for one caption per product as a JSON array"""
+        
+        items = [
+            {
+                "id": index,
+                "name": product["product_name"],
+                "description": product.get("product_description"),
+                "price": product.get("price"),
+                "category": product.get("category")
+            }
+            for index, product in enumerate(products)
+        ]
+        
+        return f"""
+        Write a ready-to-post social media caption for each of these handcrafted products:
+
+        {json.dumps(items, ensure_ascii=False)}
+
+        CRITICAL INSTRUCTIONS (for every caption):
+        - Write ONLY the caption text that can be directly posted, no options or suggestions
+        - MUST include the product's EXACT price in rupees (not [Price] or placeholder)
+        - MUST include "DM to order" or "DM us to order"
+        - Include emojis naturally in the text
+        - End with relevant hashtags (at least 5 hashtags)
+        - Make it engaging and sales-focused
+        - Keep it under 280 characters
+        - Use Bangladeshi/local context
+        - Be direct and persuasive
+
+        Reply with ONLY a JSON array containing one object per product, in the same order:
+        [{{"id": <product id>, "caption": "<caption ending with its hashtags>", "hashtags": ["#tag", ...]}}]
+        """
+    
+    def _parse_caption_batch(self, text: str, count: int) -> Dict[int, GenerateCaptionResponse]:
+        """Captions by product index from a batch reply; malformed entries are left out"""
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip())
+        try:
+            entries = json.loads(text)
+        except ValueError:
+            return {}
+        if not isinstance(entries, list):
+            return {}
+        
+        captions = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            index, caption = entry.get("id"), entry.get("caption")
+            if not isinstance(index, int) or not 0 <= index < count or index in captions:
+                continue
+            if not isinstance(caption, str) or not caption.strip():
+                continue
+            hashtags = entry.get("hashtags")
+            if not isinstance(hashtags, list) or not all(isinstance(tag, str) and tag.startswith("#") for tag in hashtags):
+                hashtags = self._extract_hashtags(caption)
+            captions[index] = GenerateCaptionResponse(caption=self._clean_caption(caption), hashtags=hashtags)
+        return captions
+    
     def _create_caption_prompt(self, name: str, description: str, price: float, category: str) -> str:
         """Create a prompt for caption generation"""
         
@@ -166,6 +367,11 @@ class AIService:
         if not self.model:
             return "Thank you for your interest! Please DM us for more details."
         
+        key = caption_key("comment_response", "", comment=original_comment, context=product_context)
+        return await ai_flights.do(key, lambda: self._generate_comment_response(original_comment, product_context))
+    
+    async def _generate_comment_response(self, original_comment: str, product_context: str) -> str:
+        """Call Gemini for a reply; falls back to a generic one on errors"""
         try:
             prompt = f"""
             Generate a friendly and professional response to this customer comment about a handcrafted product:
@@ -181,9 +387,12 @@ class AIService:
             5. Include a call-to-action if appropriate
             """
             
-            response = self.model.generate_content(prompt)
+            # Auto-replies to comments and DMs must not hold up interactive requests
+            response = await generate_content(self.model, prompt, priority=BACKGROUND)
             return response.text.strip()
             
+        except GeminiBusyError:
+            raise
         except Exception as e:
             print(f"Error generating comment response: {str(e)}")
             return "Thank you for your comment! Feel free to message us for more information. 😊"
@@ -0,0 +1,157 @@
+"""
+Cache for generated captions and preview content
+
+Artisans regenerate captions for the same item again and again, and the
+app asks for one on every preview page load. Gemini output is therefore
+cached, keyed on the normalized product fields (trimmed, whitespace
+collapsed, case-folded; prices to two decimals) plus the prompt version of
+the generator. Bumping CAPTION_PROMPT_VERSION or
+ENHANCED_CONTENT_PROMPT_VERSION next to a prompt retires its old entries.
+
+Two tiers:
+
+    memory  LRU of `caption_cache_max_entries` entries per process
+    sqlite  optional file at `caption_cache_path`, shared by every worker
+            on the host; memory misses fall through to it
+
+Entries live for `caption_cache_ttl` seconds in both. Only real model
+output is cached, never the fallback text used when Gemini fails. Callers
+pass `fresh=True` to skip the lookup (e.g. a "regenerate" button). The new
+result then replaces the cached one. Hit, miss and bypass counts are
+reported on /health.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.product_cache import MemoryCacheBackend
+
+# Expired rows are deleted from the SQLite tier every this many writes
+_PRUNE_EVERY = 200
+
+
+def _normalize(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"{float(value):.2f}"
+    text = " ".join(str(value).split()).casefold()
+    return text or None
+
+
+def caption_key(kind: str, prompt_version: str, **fields: Any) -> str:
+    """
+    Cache key for a generation request
+
+    Args:
+        kind: What is generated ("caption", "enhanced_content", ...)
+        prompt_version: Version of the prompt that produces it
+        **fields: The request inputs, e.g. product_name, price, category
+    """
+    normalized = {name: _normalize(value) for name, value in fields.items()}
+    digest = hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+    return f"{kind}:{prompt_version}:{digest}"
+
+
+class SqliteCaptionTier:
+    """Entries in a SQLite file, so workers on one host share what any of them generated"""
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS caption_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM caption_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO caption_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl)
+            )
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY == 0:
+                self._connection.execute("DELETE FROM caption_cache WHERE expires_at <= ?", (time.time(),))
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    def close(self):
+        self._connection.close()
+
+
+class CaptionCache:
+    """Memory tier in front of an optional shared tier, with hit-rate counters per kind"""
+
+    def __init__(self, memory: MemoryCacheBackend, shared: Optional[SqliteCaptionTier], ttl: float):
+        self.memory = memory
+        self.shared = shared
+        self.ttl = ttl
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: str, outcome: str):
+        kind = key.split(":", 1)[0]
+        counters = self._counters.setdefault(kind, {"memory_hits": 0, "shared_hits": 0, "misses": 0, "fresh": 0})
+        counters[outcome] += 1
+
+    async def get(self, key: str, fresh: bool = False) -> Optional[Any]:
+        """Cached value for a `caption_key`, or None; `fresh` always misses"""
+        if fresh:
+            self._count(key, "fresh")
+            return None
+        value = await self.memory.get(key)
+        if value is not None:
+            self._count(key, "memory_hits")
+            # The memory tier holds live objects; callers get their own copy
+            return copy.deepcopy(value)
+        if self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                self._count(key, "shared_hits")
+                await self.memory.set(key, copy.deepcopy(value), self.ttl)
+                return value
+        self._count(key, "misses")
+        return None
+
+    async def set(self, key: str, value: Any):
+        """Store a JSON-compatible value in every tier"""
+        await self.memory.set(key, copy.deepcopy(value), self.ttl)
+        if self.shared is not None:
+            await self.shared.set(key, value, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"shared_tier": self.shared is not None}
+        for kind, counters in self._counters.items():
+            hits = counters["memory_hits"] + counters["shared_hits"]
+            lookups = hits + counters["misses"]
+            stats[kind] = {**counters, "hit_rate": round(hits / lookups, 3) if lookups else None}
+        return stats
+
+    def close(self):
+        if self.shared is not None:
+            self.shared.close()
+
+
+def build_caption_cache() -> CaptionCache:
+    shared = SqliteCaptionTier(settings.caption_cache_path) if settings.caption_cache_path else None
+    return CaptionCache(MemoryCacheBackend(settings.caption_cache_max_entries), shared, settings.caption_cache_ttl)
@@ -0,0 +1,162 @@
+"""
+Per-category product counts for the home screen facets
+
+`category_counts` holds the number of active products in each category.
+Counting with GROUP BY on every load scans the whole catalog. Instead, the
+product endpoints adjust the affected counters in the same transaction as
+the product write, through `record_category_change`. The adjustment is a
+single upsert that adds the delta in the database, so concurrent writes
+don't overwrite each other.
+
+A reconciliation compares the counters with a real GROUP BY and repairs
+any drift, e.g. from rows edited by hand. It runs every
+`category_reconcile_interval` seconds in the API process (see main.py) and
+can also be run on its own:
+
+    python -m app.services.category_facets
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.models import CategoryCount, Product
+from app.services.registry import get_product_cache
+
+# Keywords `_guess_category` in api/native_speech.py maps speech to a category with
+CATEGORY_KEYWORDS = {
+    'jewelry': ['jewelry', 'necklace', 'bracelet', 'ring', 'earring', 'pendant'],
+    'pottery': ['pottery', 'ceramic', 'bowl', 'vase', 'mug', 'plate', 'clay'],
+    'woodwork': ['wooden', 'wood', 'carved', 'furniture', 'cutting board'],
+    'textiles': ['fabric', 'woven', 'knitted', 'embroidered', 'scarf', 'blanket'],
+    'art': ['painting', 'drawing', 'artwork', 'canvas', 'sculpture'],
+    'home decor': ['decoration', 'decorative', 'home', 'ornament']
+}
+DEFAULT_CATEGORY = "Handmade"
+
+# Always listed as facets, even before any product uses them
+KNOWN_CATEGORIES = [category.title() for category in CATEGORY_KEYWORDS] + [DEFAULT_CATEGORY]
+
+UNCATEGORIZED = ""
+
+
+def _key(category: Optional[str]) -> str:
+    return category or UNCATEGORIZED
+
+
+async def _adjust(db: AsyncSession, category: Optional[str], delta: int):
+    insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    statement = insert(CategoryCount).values(category=_key(category), product_count=delta)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[CategoryCount.category],
+        set_={"product_count": CategoryCount.product_count + delta}
+    ))
+
+
+async def record_category_change(
+    db: AsyncSession,
+    old_category: Optional[str] = None,
+    was_active: bool = False,
+    new_category: Optional[str] = None,
+    is_active: bool = False
+):
+    """
+    Adjust the counters for a product write (committed with the caller's transaction)
+
+    Args:
+        db: The session the product change is made in
+        old_category, was_active: The product before the write (defaults: it did not exist)
+        new_category, is_active: The product after the write
+    """
+    before = _key(old_category) if was_active else None
+    after = _key(new_category) if is_active else None
+    if before == after:
+        return
+    if before is not None:
+        await _adjust(db, before, -1)
+    if after is not None:
+        await _adjust(db, after, 1)
+
+
+async def get_category_facets(db: AsyncSession) -> List[Tuple[Optional[str], int]]:
+    """(category, active product count) pairs, largest first; known categories are included at zero"""
+    rows = (await db.execute(
+        select(CategoryCount.category, CategoryCount.product_count)
+        .where(CategoryCount.product_count > 0)
+        .order_by(CategoryCount.product_count.desc(), CategoryCount.category)
+    )).all()
+    facets = [(row.category or None, row.product_count) for row in rows]
+    listed = {category for category, _ in facets}
+    facets.extend((category, 0) for category in KNOWN_CATEGORIES if category not in listed)
+    return facets
+
+
+async def reconcile_category_counts() -> Dict[str, Tuple[int, int]]:
+    """
+    Compare the counters with the products table and repair any drift
+
+    Each repair is conditional on the counter still holding the value that
+    was read. A product write that lands during the check is never
+    overwritten; that counter is simply checked again on the next run.
+
+    Returns:
+        {category: (stored, actual)} for every counter that was corrected
+    """
+    async with AsyncSessionLocal() as db:
+        stored = dict((await db.execute(
+            select(CategoryCount.category, CategoryCount.product_count)
+        )).all())
+        actual = dict((await db.execute(
+            select(func.coalesce(Product.category, UNCATEGORIZED), func.count())
+            .where(Product.is_active == True)
+            .group_by(func.coalesce(Product.category, UNCATEGORIZED))
+        )).all())
+
+        corrected = {}
+        for category in stored.keys() | actual.keys():
+            expected = actual.get(category, 0)
+            if category not in stored:
+                insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+                result = await db.execute(
+                    insert(CategoryCount)
+                    .values(category=category, product_count=expected)
+                    .on_conflict_do_nothing(index_elements=[CategoryCount.category])
+                )
+            elif stored[category] != expected:
+                result = await db.execute(
+                    update(CategoryCount)
+                    .where(CategoryCount.category == category, CategoryCount.product_count == stored[category])
+                    .values(product_count=expected)
+                )
+            else:
+                continue
+            if result.rowcount == 1:
+                corrected[category] = (stored.get(category, 0), expected)
+        await db.commit()
+
+    if corrected:
+        # Cached facet listings were built from the wrong counts
+        await get_product_cache().invalidate()
+    for category, (was, now) in corrected.items():
+        print(f"⚠️ Category count for {category or 'uncategorized'!r} was {was}, corrected to {now}")
+    print(f"✅ Category counts reconciled ({len(corrected)} corrected)")
+    return corrected
+
+
+async def reconcile_periodically(interval: float):
+    """Run `reconcile_category_counts` every `interval` seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile_category_counts()
+        except Exception as e:
+            print(f"⚠️ Category count reconciliation failed: {e}")
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile_category_counts())
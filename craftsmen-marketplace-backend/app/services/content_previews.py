@@ -0,0 +1,96 @@
+"""
+Server-side storage for previewed content
+
+POST /products/preview-content generates a caption, platform content and
+hashtags for the app's preview screen. The content is saved here under a
+short random token. Once the artisan approves it, the app posts with
+`preview_token` instead of echoing the whole JSON back. The posting
+endpoints then reuse the stored content without another Gemini call.
+
+A token is consumed when it is posted, and only for the product name and
+price the preview was generated for. Previews expire after
+`preview_token_ttl` seconds. Expired rows are deleted whenever a new
+preview is saved.
+"""
+
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.models import ContentPreview
+
+# 9 random bytes -> 12 URL-safe characters
+PREVIEW_TOKEN_BYTES = 9
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def save_preview(db: AsyncSession, content: Dict[str, Any], product_name: str, price: float) -> ContentPreview:
+    """
+    Store generated content and commit
+
+    Args:
+        db: Database session
+        content: As returned by GoogleAIAgent.generate_enhanced_content
+        product_name, price: What the preview was generated for
+
+    Returns:
+        The stored preview; its `token` is handed to the client
+    """
+    now = _utcnow()
+    await db.execute(delete(ContentPreview).where(ContentPreview.expires_at <= now))
+    preview = ContentPreview(
+        token=secrets.token_urlsafe(PREVIEW_TOKEN_BYTES),
+        content=content,
+        product_name=product_name,
+        price=price,
+        expires_at=now + timedelta(seconds=settings.preview_token_ttl)
+    )
+    db.add(preview)
+    await db.commit()
+    return preview
+
+
+async def consume_preview(db: AsyncSession, token: str, product_name: str, price: float) -> Dict[str, Any]:
+    """
+    Take the content stored under a preview token
+
+    The row is deleted in the caller's transaction, so the token is used up
+    once the caller commits and stays valid if the request fails first.
+    Nothing between this call and the caller's commit may commit or roll
+    back the session (image_store.record_stored_image uses a savepoint).
+
+    Raises:
+        HTTPException: 404 if the token is unknown, expired or already used;
+            400 if it was generated for another product name or price
+    """
+    preview = (await db.execute(
+        delete(ContentPreview)
+        .where(ContentPreview.token == token, ContentPreview.expires_at > _utcnow())
+        .returning(ContentPreview.content, ContentPreview.product_name, ContentPreview.price)
+    )).first()
+    if preview is None:
+        raise HTTPException(status_code=404, detail="Preview not found or expired; generate a new preview")
+    if preview.product_name != product_name or round(preview.price, 2) != round(price, 2):
+        raise HTTPException(
+            status_code=400,
+            detail="Preview was generated for a different product name or price; generate a new preview"
+        )
+    return preview.content
+
+
+def post_content(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Previewed content in the shape the posting job uses (see product_posting.generate_enhanced_content)"""
+    return {
+        "ai_caption": content.get("base_caption", ""),
+        "platform_content": content.get("platform_content", {}),
+        "hashtags": content.get("hashtags", []),
+        "marketing_insights": {"caption_source": "preview_token"}
+    }
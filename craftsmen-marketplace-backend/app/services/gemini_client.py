@@ -0,0 +1,255 @@
+"""
+Non-blocking, scheduled access to Gemini models
+
+Every Gemini call in the app goes through `generate_content` so that the LLM
+round trip never runs on the event loop thread. Calls use the SDK's async API
+and are admitted by one scheduler per process, because previews, comment and
+DM auto-replies and content analysis all share the same API quota:
+
+    concurrency   at most `gemini_max_concurrency` calls in flight
+    rate          token buckets for requests (`gemini_rpm`) and tokens
+                  (`gemini_tpm`) per minute, so calls wait here instead of
+                  failing with 429s
+    priority      INTERACTIVE calls (someone is waiting on the response) are
+                  admitted before any BACKGROUND call (comment and DM
+                  replies), so monitoring cannot starve the preview screen
+    backpressure  at most `gemini_max_queue` calls wait per priority; beyond
+                  that generate_content raises GeminiBusyError, which the
+                  API answers with 503 and Retry-After
+
+A call's token cost is estimated from the prompt length plus its
+max_output_tokens, and corrected from the response's usage metadata once it
+returns. Queue depth, admissions, rejections and queue waits per priority
+are reported on /health.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+# Admission order
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+# Buckets hold this many seconds of quota, which bounds bursts
+BURST_SECONDS = 10.0
+# Output tokens assumed for calls that do not set max_output_tokens
+DEFAULT_OUTPUT_TOKENS = 512
+# Recent queue waits kept per priority for the percentiles on /health
+_WAIT_SAMPLES = 1000
+
+_scheduler: Optional["GeminiScheduler"] = None
+_scheduler_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class GeminiBusyError(Exception):
+    """Too many Gemini calls are waiting; retry after `retry_after` seconds"""
+
+    def __init__(self, priority: str, retry_after: float):
+        super().__init__(f"Too many {priority} Gemini requests are queued")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills `per_minute` units a minute up to BURST_SECONDS worth; 0 means unlimited"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * BURST_SECONDS, 1.0)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (amounts above capacity only need a full bucket)"""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        return max(min(amount, self.capacity) - self.level, 0.0) / self.rate
+
+    def take(self, amount: float):
+        """Spend `amount` (negative refunds); the level may go below zero, delaying later calls"""
+        if self.rate:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+    def available(self) -> Optional[float]:
+        if not self.rate:
+            return None
+        self._refill()
+        return round(self.level, 1)
+
+
+class GeminiScheduler:
+    """Admits Gemini calls by priority within the concurrency and rate limits"""
+
+    def __init__(self, max_concurrency: int, rpm: int, tpm: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._loop = asyncio.get_running_loop()
+        self._queues: Dict[str, Deque[Tuple[asyncio.Future, int, float]]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._admitted = {priority: 0 for priority in PRIORITIES}
+        self._rejected = {priority: 0 for priority in PRIORITIES}
+        self._waits = {priority: deque(maxlen=_WAIT_SAMPLES) for priority in PRIORITIES}
+
+    def _dispatch(self):
+        """Admit waiting calls in priority order while slots and quota allow"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._in_flight < self.max_concurrency:
+            priority = next((priority for priority in PRIORITIES if self._queues[priority]), None)
+            if priority is None:
+                return
+            queue = self._queues[priority]
+            waiter, cost, enqueued_at = queue[0]
+            if waiter.done():
+                # Cancelled while queued; acquire() has not cleaned it up yet
+                queue.popleft()
+                continue
+            delay = max(self.requests.wait_time(1), self.tokens.wait_time(cost))
+            if delay > 0:
+                # Nothing overtakes the head of the queue; try again once the quota has refilled
+                self._timer = self._loop.call_later(delay, self._dispatch)
+                return
+            queue.popleft()
+            self.requests.take(1)
+            self.tokens.take(cost)
+            self._in_flight += 1
+            self._admitted[priority] += 1
+            self._waits[priority].append(time.monotonic() - enqueued_at)
+            waiter.set_result(None)
+
+    def _retry_after(self) -> float:
+        queued = sum(len(queue) for queue in self._queues.values())
+        if self.requests.rate:
+            return max(queued / self.requests.rate, 1.0)
+        return 1.0
+
+    async def acquire(self, priority: str, cost: int):
+        """
+        Wait until a call may start; pair with release()
+
+        Raises:
+            GeminiBusyError: `max_queue` calls of this priority are already waiting
+        """
+        queue = self._queues[priority]
+        if len(queue) >= self.max_queue:
+            self._rejected[priority] += 1
+            raise GeminiBusyError(priority, self._retry_after())
+
+        entry = (self._loop.create_future(), cost, time.monotonic())
+        queue.append(entry)
+        self._dispatch()
+        try:
+            await entry[0]
+        except asyncio.CancelledError:
+            if entry[0].cancelled():
+                try:
+                    queue.remove(entry)
+                except ValueError:
+                    pass  # Already dropped by _dispatch
+                self._dispatch()
+            else:
+                # Admitted just as the caller gave up
+                self.release()
+            raise
+
+    def release(self, token_correction: int = 0):
+        """Free the call's slot; `token_correction` is actual minus estimated tokens"""
+        self._in_flight -= 1
+        if token_correction:
+            self.tokens.take(token_correction)
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "in_flight": self._in_flight,
+            "requests_available": self.requests.available(),
+            "tokens_available": self.tokens.available()
+        }
+        for priority in PRIORITIES:
+            waits = sorted(self._waits[priority])
+            stats[priority] = {
+                "queued": len(self._queues[priority]),
+                "admitted": self._admitted[priority],
+                "rejected": self._rejected[priority],
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+                "wait_p95_ms": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else None,
+                "wait_max_ms": round(waits[-1] * 1000, 1) if waits else None
+            }
+        return stats
+
+
+def _get_scheduler() -> GeminiScheduler:
+    """Get the scheduler for the running event loop"""
+    global _scheduler, _scheduler_loop
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler_loop is not loop:
+        _scheduler = GeminiScheduler(
+            settings.gemini_max_concurrency, settings.gemini_rpm, settings.gemini_tpm, settings.gemini_max_queue
+        )
+        _scheduler_loop = loop
+    return _scheduler
+
+
+def scheduler_stats() -> Dict[str, Any]:
+    """Scheduler metrics for /health (empty until the first Gemini call)"""
+    return _scheduler.stats() if _scheduler is not None else {}
+
+
+def _estimate_tokens(prompt: str, generation_config: Any) -> int:
+    """Prompt tokens (about 4 characters each) plus the output allowance"""
+    if isinstance(generation_config, dict):
+        max_output = generation_config.get("max_output_tokens")
+    else:
+        max_output = getattr(generation_config, "max_output_tokens", None)
+    return len(prompt) // 4 + (max_output or DEFAULT_OUTPUT_TOKENS)
+
+
+async def generate_content(model: Any, prompt: str, priority: str = INTERACTIVE, **kwargs) -> Any:
+    """
+    Run `model.generate_content` without blocking the event loop
+
+    Args:
+        model: A configured genai.GenerativeModel
+        prompt: Prompt text
+        priority: INTERACTIVE, or BACKGROUND for work nobody is waiting on
+        **kwargs: Passed through to the SDK (e.g. generation_config)
+
+    Returns:
+        The SDK response object
+
+    Raises:
+        GeminiBusyError: Too many calls of this priority are already waiting
+    """
+    scheduler = _get_scheduler()
+    estimate = _estimate_tokens(prompt, kwargs.get("generation_config"))
+    await scheduler.acquire(priority, estimate)
+    correction = 0
+    try:
+        response = await asyncio.wait_for(
+            model.generate_content_async(prompt, **kwargs),
+            timeout=settings.gemini_request_timeout
+        )
+        used = getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
+        if used:
+            correction = used - estimate
+        return response
+    finally:
+        scheduler.release(correction)
@@ -9,6 +9,13 @@ from datetime import datetime
 import google.generativeai as genai
 
 from app.core.config import settings
+from app.services.caption_cache import caption_key
+from app.services.gemini_client import GeminiBusyError, generate_content
+from app.services.registry import get_caption_cache
+from app.services.single_flight import ai_flights
+
+# Bump when the generate_enhanced_content prompt or parsing changes, so cached content is retired
+ENHANCED_CONTENT_PROMPT_VERSION = "1"
 
 
 class GoogleAIAgent:
@@ -28,11 +35,44 @@ class GoogleAIAgent:
         category: Optional[str] = None,
         description: Optional[str] = None,
         target_audience: Optional[str] = None,
-        platform: str = "both"
+        platform: str = "both",
+        fresh: bool = False
     ) -> Dict[str, Any]:
         """
         Generate enhanced content using Gemini
+        
+        Results are cached per product fields (see services/caption_cache.py);
+        `fresh` skips the cache and generates new content.
         """
+        cache = get_caption_cache()
+        key = caption_key(
+            "enhanced_content", ENHANCED_CONTENT_PROMPT_VERSION,
+            name=product_name, price=price, category=category, description=description,
+            target_audience=target_audience, platform=platform
+        )
+        cached = await cache.get(key, fresh=fresh)
+        if cached is not None:
+            return cached
+        
+        # Concurrent identical requests share one Gemini call
+        return await ai_flights.do(
+            key,
+            lambda: self._generate_enhanced_content(
+                key, product_name, price, category, description, target_audience, platform
+            )
+        )
+    
+    async def _generate_enhanced_content(
+        self,
+        key: str,
+        product_name: str,
+        price: float,
+        category: Optional[str],
+        description: Optional[str],
+        target_audience: Optional[str],
+        platform: str
+    ) -> Dict[str, Any]:
+        """Call Gemini for the content and cache it; falls back to a template on errors"""
         try:
             # Create the prompt
             prompt = f"""
@@ -64,7 +104,7 @@ class GoogleAIAgent:
             """
             
             # Generate content with Gemini
-            response = self.model.generate_content(prompt)
+            response = await generate_content(self.model, prompt)
             content_text = response.text
             
             # Parse the response
@@ -89,7 +129,7 @@ class GoogleAIAgent:
             instagram_content = f"{caption}\n\n{' '.join(hashtags[:12])}"
             facebook_content = f"{caption}\n\n{' '.join(hashtags[:8])}"
             
-            return {
+            content = {
                 "base_caption": caption,
                 "hashtags": hashtags,
                 "platform_content": {
@@ -108,7 +148,11 @@ class GoogleAIAgent:
                     "agent_version": "1.0.0-simple"
                 }
             }
+            await get_caption_cache().set(key, content)
+            return content
             
+        except GeminiBusyError:
+            raise
         except Exception as e:
             # Fallback content
             return {
@@ -131,6 +175,11 @@ class GoogleAIAgent:
         """
         Analyze content performance potential
         """
+        key = caption_key("content_analysis", "", content=content)
+        return await ai_flights.do(key, lambda: self._analyze_content_performance(content))
+    
+    async def _analyze_content_performance(self, content: str) -> Dict[str, Any]:
+        """Call Gemini for the analysis"""
         try:
             prompt = f"""
             Analyze this social media content for effectiveness:
@@ -145,7 +194,7 @@ class GoogleAIAgent:
             Provide a brief analysis and suggestions for improvement.
             """
             
-            response = self.model.generate_content(prompt)
+            response = await generate_content(self.model, prompt)
             
             return {
                 "analysis": response.text,
@@ -153,6 +202,8 @@ class GoogleAIAgent:
                 "model": "gemini-2.0-flash"
             }
             
+        except GeminiBusyError:
+            raise
         except Exception as e:
             return {
                 "analysis": f"Content analysis unavailable: {str(e)}",
@@ -161,13 +212,7 @@ class GoogleAIAgent:
             }
 
 
-# Global agent instance
-_ai_agent: Optional[GoogleAIAgent] = None
-
-
 def get_ai_agent() -> GoogleAIAgent:
-    """Get or create the AI agent instance"""
-    global _ai_agent
-    if _ai_agent is None:
-        _ai_agent = GoogleAIAgent()
-    return _ai_agent
+    """Get or create the AI agent instance (shared through the service registry)"""
+    from app.services.registry import get_ai_agent as _get_registered_agent
+    return _get_registered_agent()
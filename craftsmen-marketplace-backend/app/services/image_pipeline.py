@@ -0,0 +1,170 @@
+"""
+In-memory product image optimization
+
+Each upload is decoded exactly once from memory. Large JPEGs are decoded with
+Pillow's draft mode, which lets libjpeg downscale in the DCT domain (1/2, 1/4
+or 1/8 scale) instead of decoding all 12 megapixels of a phone photo. EXIF
+orientation is applied to the pixels and metadata is dropped.
+
+From that single decode a set of named renditions is produced, largest
+first so each one is resized from the previous one (the Instagram crop is
+taken from the decode itself, so tall photos still reach 1080px wide):
+
+    facebook         1600px JPEG for Facebook uploads
+    main             1200px in the uploaded format (the product image_url)
+    main_webp        WebP of main
+    instagram        1080px wide JPEG, aspect ratio clamped to 4:5 .. 1.91:1
+    thumbnail        320px JPEG for product listings
+    thumbnail_webp   WebP of thumbnail
+
+Decoding and encoding are CPU-bound, so they run in a process pool (or a
+thread when `image_pool_workers` is 0, e.g. on serverless hosts without
+multiprocessing support) and never on the event loop.
+"""
+
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+MAX_DIMENSION = 1200
+FACEBOOK_DIMENSION = 1600
+INSTAGRAM_WIDTH = 1080
+THUMBNAIL_DIMENSION = 320
+JPEG_QUALITY = 85
+
+# Instagram feed posts must be between 4:5 portrait and 1.91:1 landscape
+INSTAGRAM_MIN_ASPECT = 4 / 5
+INSTAGRAM_MAX_ASPECT = 1.91
+
+# Rendition name -> file name suffix used when storing it
+VARIANT_SUFFIXES = {
+    "main": "",
+    "main_webp": "",
+    "facebook": "_fb",
+    "instagram": "_ig",
+    "thumbnail": "_thumb",
+    "thumbnail_webp": "_thumb",
+}
+
+Renditions = Dict[str, Tuple[bytes, str]]
+
+
+def _flatten(img: Image.Image) -> Image.Image:
+    """Convert to RGB, compositing transparency onto white"""
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    if img.mode not in ("RGB", "L"):
+        return img.convert("RGB")
+    return img
+
+
+def _encode(img: Image.Image, image_format: str, icc_profile: bytes = None) -> bytes:
+    """Encode without metadata (no exif/pnginfo is passed to the encoder)"""
+    output = io.BytesIO()
+    if image_format == "jpg":
+        _flatten(img).save(
+            output, "JPEG", quality=JPEG_QUALITY, optimize=True,
+            progressive=True, icc_profile=icc_profile
+        )
+    elif image_format == "webp":
+        img.save(output, "WEBP", quality=JPEG_QUALITY, method=4, icc_profile=icc_profile)
+    elif image_format == "png":
+        img.save(output, "PNG", optimize=True, icc_profile=icc_profile)
+    else:
+        if img.mode not in ("P", "L"):
+            img = img.convert("P", palette=Image.Palette.ADAPTIVE)
+        img.save(output, "GIF", optimize=True)
+    return output.getvalue()
+
+
+def _downscaled(img: Image.Image, max_dimension: int) -> Image.Image:
+    if max(img.size) <= max_dimension:
+        return img
+    resized = img.copy()
+    resized.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    return resized
+
+
+def _instagram_crop(img: Image.Image) -> Image.Image:
+    """Center-crop to Instagram's allowed aspect range and fit 1080px width"""
+    width, height = img.size
+    aspect = width / height
+    if aspect < INSTAGRAM_MIN_ASPECT:
+        new_height = round(width / INSTAGRAM_MIN_ASPECT)
+        top = (height - new_height) // 2
+        img = img.crop((0, top, width, top + new_height))
+    elif aspect > INSTAGRAM_MAX_ASPECT:
+        new_width = round(height * INSTAGRAM_MAX_ASPECT)
+        left = (width - new_width) // 2
+        img = img.crop((left, 0, left + new_width, height))
+
+    if img.width > INSTAGRAM_WIDTH:
+        new_height = round(img.height * INSTAGRAM_WIDTH / img.width)
+        img = img.resize((INSTAGRAM_WIDTH, new_height), Image.Resampling.LANCZOS)
+    return img
+
+
+def render_variants(data: bytes, image_format: str) -> Renditions:
+    """
+    Decode once and produce every rendition of an uploaded image
+
+    Args:
+        data: Original upload bytes
+        image_format: Sniffed format extension (jpg, png, gif, webp)
+
+    Returns:
+        Rendition name -> (encoded bytes, format extension)
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        animated = getattr(img, "is_animated", False)
+        icc_profile = img.info.get("icc_profile")
+
+        if img.format == "JPEG" and max(img.size) > FACEBOOK_DIMENSION:
+            # DCT-domain downscale to the smallest scale still >= the largest rendition.
+            # draft() keeps both sides >= the request, so it must have the image's aspect ratio
+            scale = FACEBOOK_DIMENSION / max(img.size)
+            img.draft("RGB", (round(img.width * scale), round(img.height * scale)))
+
+        # First frame only for animated GIFs; exif_transpose loads the pixels
+        oriented = ImageOps.exif_transpose(img)
+
+    facebook = _downscaled(oriented, FACEBOOK_DIMENSION)
+    main = _downscaled(facebook, MAX_DIMENSION)
+    instagram = _instagram_crop(oriented)
+    thumbnail = _downscaled(main, THUMBNAIL_DIMENSION)
+
+    renditions: Renditions = {
+        # Animated GIFs would lose their frames; keep the upload as the main image
+        "main": (data, image_format) if animated else (_encode(main, image_format, icc_profile), image_format),
+        "main_webp": (_encode(main, "webp", icc_profile), "webp"),
+        "facebook": (_encode(facebook, "jpg", icc_profile), "jpg"),
+        "instagram": (_encode(instagram, "jpg", icc_profile), "jpg"),
+        "thumbnail": (_encode(thumbnail, "jpg", icc_profile), "jpg"),
+        "thumbnail_webp": (_encode(thumbnail, "webp", icc_profile), "webp"),
+    }
+    if image_format == "webp":
+        # main is already WebP
+        del renditions["main_webp"]
+    return renditions
+
+
+def build_image_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=settings.image_pool_workers)
+
+
+async def process_image(data: bytes, image_format: str) -> Renditions:
+    """Run render_variants off the event loop"""
+    if settings.image_pool_workers <= 0:
+        return await asyncio.to_thread(render_variants, data, image_format)
+
+    from app.services.registry import get_image_pool
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_image_pool(), render_variants, data, image_format)
@@ -0,0 +1,166 @@
+"""
+Content-addressed index of uploaded images
+
+Every upload is named after the sha256 of its bytes and recorded once in the
+`stored_images` table together with its renditions. Uploading the same photo
+again (artisans often retry after a failed post) finds the existing row and
+skips decoding, optimization and writing entirely.
+
+`ref_count` tracks how many active products use an image. Products take a
+reference when they are created and release it when they are deleted. Images
+without references are removed by a periodic prune, which keeps a grace
+period because an upload is stored (or reused) before the product that uses
+it. The grace period runs from `last_used_at`, which every upload of the
+image refreshes, so a reused image is not pruned before its product takes
+the reference:
+
+    python -m app.services.image_store
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.models import StoredImage
+from app.services.registry import get_storage
+from app.services.storage import key_for_url
+
+
+async def find_stored_image(db: AsyncSession, content_hash: str) -> Optional[StoredImage]:
+    """
+    Return the stored image for a hash if its files are still in storage
+
+    Marks the image as used first (in the caller's transaction), so a prune
+    running before the product takes its reference keeps the row; if the
+    prune already removed it, this is a miss.
+    """
+    touched = await db.execute(
+        update(StoredImage)
+        .where(StoredImage.content_hash == content_hash)
+        .values(last_used_at=func.now())
+    )
+    if touched.rowcount != 1:
+        return None
+    stored = (await db.execute(
+        select(StoredImage).where(StoredImage.content_hash == content_hash)
+    )).scalar_one()
+    if not await get_storage().exists(key_for_url(stored.file_url)):
+        return None
+    return stored
+
+
+async def record_stored_image(
+    db: AsyncSession,
+    content_hash: str,
+    file_url: str,
+    variants: Dict[str, str],
+    file_size: int
+) -> StoredImage:
+    """
+    Add an image to the index, or refresh the row if it already exists
+
+    Written with the caller's transaction and committed with it; nothing
+    the caller did before is committed or rolled back here. Two identical
+    uploads can render at the same time; both write the same
+    content-addressed files, and the loser of the insert race reuses the row.
+    """
+    stored = (await db.execute(
+        select(StoredImage).where(StoredImage.content_hash == content_hash)
+    )).scalar_one_or_none()
+    if stored is not None:
+        # Files had gone missing and were rendered again
+        stored.file_url = file_url
+        stored.variants = variants
+        stored.file_size = file_size
+        stored.last_used_at = func.now()
+        await db.flush()
+        return stored
+
+    stored = StoredImage(
+        content_hash=content_hash,
+        file_url=file_url,
+        variants=variants,
+        file_size=file_size,
+        ref_count=0
+    )
+    try:
+        # A savepoint, so losing the race only undoes this insert
+        async with db.begin_nested():
+            db.add(stored)
+    except IntegrityError:
+        stored = (await db.execute(
+            select(StoredImage).where(StoredImage.content_hash == content_hash)
+        )).scalar_one()
+    return stored
+
+
+async def acquire_image(db: AsyncSession, image_url: Optional[str]):
+    """Take a reference for a product using this image (committed with the caller's transaction)"""
+    if image_url:
+        await db.execute(
+            update(StoredImage)
+            .where(StoredImage.file_url == image_url)
+            .values(ref_count=StoredImage.ref_count + 1)
+        )
+
+
+async def release_image(db: AsyncSession, image_url: Optional[str]):
+    """Drop a product's reference; the files stay until the next prune"""
+    if image_url:
+        await db.execute(
+            update(StoredImage)
+            .where(StoredImage.file_url == image_url, StoredImage.ref_count > 0)
+            .values(ref_count=StoredImage.ref_count - 1)
+        )
+
+
+async def prune_unreferenced_images(older_than: Optional[timedelta] = None) -> int:
+    """
+    Delete images no product references any more
+
+    Args:
+        older_than: Grace period for fresh uploads (defaults to `image_prune_grace_hours`)
+
+    Returns:
+        Number of images removed
+    """
+    if older_than is None:
+        older_than = timedelta(hours=settings.image_prune_grace_hours)
+    cutoff = datetime.now(timezone.utc) - older_than
+
+    async with AsyncSessionLocal() as db:
+        candidates = (await db.execute(
+            select(StoredImage).where(StoredImage.ref_count <= 0, StoredImage.last_used_at < cutoff)
+        )).scalars().all()
+
+        removed = 0
+        for stored in candidates:
+            # Re-check inside the delete so a reference taken or an upload reusing it meanwhile wins;
+            # the files are only removed once the row is gone
+            result = await db.execute(
+                delete(StoredImage).where(
+                    StoredImage.id == stored.id,
+                    StoredImage.ref_count <= 0,
+                    StoredImage.last_used_at < cutoff
+                ).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if result.rowcount != 1:
+                continue
+
+            for url in set((stored.variants or {}).values()) | {stored.file_url}:
+                await get_storage().delete(key_for_url(url))
+            removed += 1
+
+    print(f"🧹 Pruned {removed} unreferenced image(s)")
+    return removed
+
+
+if __name__ == "__main__":
+    asyncio.run(prune_unreferenced_images())
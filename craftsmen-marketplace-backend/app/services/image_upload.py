@@ -0,0 +1,217 @@
+"""
+Streaming product image uploads
+
+The multipart parser already spools each upload (memory for small files,
+disk beyond that), so the UploadFile is validated in place: it is read in
+small chunks, the image format is sniffed from the magic bytes of the first
+chunk and the size is enforced while reading, so a bad or oversized upload
+is rejected after at most one chunk past the limit without copying it.
+
+The sha256 of the bytes is computed in the same pass. Files are named after
+it, so a repeat upload of the same photo is answered from the
+`stored_images` index without decoding or optimizing it again.
+
+Images can also arrive through storage directly: the client uploads to a
+presigned URL (see api/storage.py) and passes the resulting key, which is
+ingested the same way. Renditions are written through the configured
+storage backend (services/storage.py).
+"""
+
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.schemas import FileUploadResponse
+from app.services.image_pipeline import VARIANT_SUFFIXES, process_image
+from app.services.image_store import find_stored_image, record_stored_image
+from app.services.registry import get_storage
+from app.services.storage import INCOMING_PREFIX, key_for_url
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Formats are named by the file extension they are saved with
+_FORMAT_ALIASES = {"jpg": {"jpg", "jpeg"}}
+_CONTENT_TYPES = {"jpg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
+
+
+def sniff_image_format(head: bytes) -> Optional[str]:
+    """Identify an image format from its leading magic bytes"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def is_allowed_format(image_format: Optional[str]) -> bool:
+    if image_format is None:
+        return False
+    names = _FORMAT_ALIASES.get(image_format, {image_format})
+    return any(name in settings.allowed_extensions for name in names)
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File size too large. Maximum size: {settings.max_file_size / (1024*1024)}MB"
+    )
+
+
+async def receive_image(file: UploadFile) -> Tuple[str, int, str]:
+    """
+    Validate an uploaded image in place with early rejection
+
+    Returns:
+        (sniffed format extension, size in bytes, sha256 hex digest); the
+        file is left positioned at 0
+    """
+    # The multipart parser already knows the part size - reject without reading
+    if file.size is not None and file.size > settings.max_file_size:
+        raise _too_large()
+
+    image_format = None
+    total = 0
+    digest = hashlib.sha256()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        if total == 0:
+            image_format = sniff_image_format(chunk)
+            if not is_allowed_format(image_format):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid file type. Allowed types: {', '.join(settings.allowed_extensions)}"
+                )
+
+        total += len(chunk)
+        if total > settings.max_file_size:
+            raise _too_large()
+        digest.update(chunk)
+
+    if total == 0:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+    await file.seek(0)
+    return image_format, total, digest.hexdigest()
+
+
+async def local_image_path(image_url: str) -> str:
+    """Local file for an image URL, downloaded from remote storage if needed"""
+    return await get_storage().local_path(key_for_url(image_url))
+
+
+async def platform_image_paths(image_url: str, image_variants: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Pick the pre-sized rendition for each social platform, falling back to the main image"""
+    variants = image_variants or {}
+    return {
+        platform: await local_image_path(variants.get(platform) or image_url)
+        for platform in ("facebook", "instagram")
+    }
+
+
+def _upload_response(file_url: str, file_size: int, variants: Dict[str, str]) -> FileUploadResponse:
+    return FileUploadResponse(
+        filename=key_for_url(file_url),
+        file_url=file_url,
+        file_size=file_size,
+        variants=variants
+    )
+
+
+async def _store_image(
+    db: AsyncSession,
+    original: bytes,
+    image_format: str,
+    size: int,
+    content_hash: str
+) -> FileUploadResponse:
+    """Render an image once and write every rendition to storage"""
+    # Render every size in one decode, off the event loop
+    try:
+        renditions = await process_image(original, image_format)
+    except Exception as e:
+        # Magic bytes matched but the image is truncated or corrupt
+        print(f"Error optimizing image: {str(e)}")
+        raise HTTPException(status_code=400, detail="Could not read image file")
+
+    # Name files after the content; extensions come from the encoded format, not the client's name
+    storage = get_storage()
+    variants = {}
+    for name, (contents, variant_format) in renditions.items():
+        key = f"{content_hash}{VARIANT_SUFFIXES[name]}.{variant_format}"
+        await storage.put(key, contents, _CONTENT_TYPES[variant_format])
+        variants[name] = storage.url(key)
+
+    stored = await record_stored_image(db, content_hash, variants["main"], variants, size)
+    return _upload_response(stored.file_url, stored.file_size, stored.variants or {})
+
+
+async def save_product_image(file: UploadFile, db: AsyncSession) -> FileUploadResponse:
+    """Receive a product image and store all of its renditions, reusing identical uploads"""
+    image_format, size, content_hash = await receive_image(file)
+    stored = await find_stored_image(db, content_hash)
+    if stored is not None:
+        print(f"♻️ Reusing stored image {stored.file_url}")
+        return _upload_response(stored.file_url, stored.file_size, stored.variants or {})
+    original = await file.read()
+
+    return await _store_image(db, original, image_format, size, content_hash)
+
+
+async def ingest_uploaded_image(storage_key: str, db: AsyncSession) -> FileUploadResponse:
+    """Process an image the client uploaded straight to storage with a presigned URL"""
+    if not storage_key.startswith(INCOMING_PREFIX):
+        raise HTTPException(status_code=400, detail="Invalid storage key")
+
+    storage = get_storage()
+    try:
+        original = await storage.get(storage_key)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid storage key")
+    if original is None:
+        raise HTTPException(status_code=404, detail="Uploaded image not found; it may have expired")
+
+    if len(original) > settings.max_file_size:
+        await storage.delete(storage_key)
+        raise _too_large()
+    image_format = sniff_image_format(original[:16])
+    if not is_allowed_format(image_format):
+        await storage.delete(storage_key)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed types: {', '.join(settings.allowed_extensions)}"
+        )
+
+    content_hash = hashlib.sha256(original).hexdigest()
+    stored = await find_stored_image(db, content_hash)
+    if stored is not None:
+        print(f"♻️ Reusing stored image {stored.file_url}")
+        response = _upload_response(stored.file_url, stored.file_size, stored.variants or {})
+    else:
+        response = await _store_image(db, original, image_format, len(original), content_hash)
+
+    # The renditions are stored; the raw upload is no longer needed
+    await storage.delete(storage_key)
+    return response
+
+
+async def resolve_product_image(
+    db: AsyncSession,
+    file: Optional[UploadFile],
+    storage_key: Optional[str]
+) -> FileUploadResponse:
+    """Take a product image from a multipart file or from a presigned upload's storage key"""
+    if (file is None) == (not storage_key):
+        raise HTTPException(status_code=400, detail="Provide either an image file or a storage_key")
+    if file is not None:
+        return await save_product_image(file, db)
+    return await ingest_uploaded_image(storage_key, db)
@@ -5,6 +5,7 @@ Complete Instagram posting service with Gemini AI caption generation
 from InstagramAPI import InstagramAPI
 from typing import Optional, Dict, Any, List
 from app.core.config import settings
+from app.services.gemini_client import GeminiBusyError, generate_content
 import google.generativeai as genai
 import os
 import logging
@@ -111,7 +112,8 @@ class InstagramGeminiService:
             logger.info(f"🤖 Generating caption with Gemini for: {product_name}")
             
             # Generate caption with Gemini
-            response = self.gemini_model.generate_content(
+            response = await generate_content(
+                self.gemini_model,
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.9,  # High creativity for engaging content
@@ -136,6 +138,8 @@ class InstagramGeminiService:
                 "full_response": caption_text
             }
             
+        except GeminiBusyError:
+            raise
         except Exception as e:
             logger.error(f"❌ Gemini caption generation failed: {e}")
             # Return fallback caption
@@ -1,6 +1,7 @@
 from instagrapi import Client
 from typing import Optional, Dict, Any
 from app.core.config import settings
+import asyncio
 import os
 import logging
 
@@ -97,7 +98,7 @@ class InstagramService:
         
         # Login if not already logged in
         if not self.is_logged_in:
-            if not self.login():
+            if not await asyncio.to_thread(self.login):
                 return {
                     "success": False,
                     "error": "Failed to login to Instagram",
@@ -108,8 +109,9 @@ class InstagramService:
             logger.info(f"📸 Posting to Instagram: {product_name} - {image_path}")
             logger.info(f"📝 Caption: {caption[:100]}...")
             
-            # Upload photo with caption using instagrapi
-            media = self.client.photo_upload(
+            # Upload photo with caption using instagrapi (blocking client, run off the event loop)
+            media = await asyncio.to_thread(
+                self.client.photo_upload,
                 path=image_path,
                 caption=caption
             )
@@ -0,0 +1,228 @@
+"""
+Durable job queue for slow product workflows
+
+Jobs are rows in the `posting_jobs` table, so they survive restarts of the
+API or worker process. Workers claim a job with a conditional UPDATE, which
+keeps two workers (or two processes) from running the same job. Failed jobs
+are retried with exponential backoff until `max_attempts` is reached.
+
+Workers run inside the API process (see the lifespan in main.py) or as a
+separate process:
+
+    python -m app.services.job_queue
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.models import PostingJob
+
+JobHandler = Callable[[PostingJob, AsyncSession], Awaitable[Dict[str, Any]]]
+
+
+class JobFailed(Exception):
+    """Raised by a job handler; `retryable=False` fails the job immediately"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _load_handlers() -> Dict[str, JobHandler]:
+    from app.services.product_posting import JOB_HANDLERS
+    return JOB_HANDLERS
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff delay in seconds for the given attempt number"""
+    delay = settings.job_retry_base_delay * (2 ** max(attempts - 1, 0))
+    return min(delay, settings.job_retry_max_delay)
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    job_type: str,
+    payload: Dict[str, Any],
+    product_id: Optional[int] = None
+) -> PostingJob:
+    """Persist a new job and wake up in-process workers"""
+    job = PostingJob(
+        job_type=job_type,
+        status="pending",
+        payload=payload,
+        attempts=0,
+        max_attempts=settings.job_max_attempts,
+        next_run_at=_utcnow(),
+        product_id=product_id
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    job_worker.notify()
+    return job
+
+
+async def requeue_stale_jobs() -> int:
+    """Return orphaned running jobs (worker died mid-job) to the queue"""
+    cutoff = _utcnow() - timedelta(seconds=settings.job_lease_seconds)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(PostingJob)
+            .where(PostingJob.status == "running", PostingJob.locked_at < cutoff)
+            .values(status="pending", locked_at=None, next_run_at=_utcnow())
+        )
+        await db.commit()
+        return result.rowcount or 0
+
+
+async def claim_next_job() -> Optional[int]:
+    """Atomically move the next due job from pending to running"""
+    async with AsyncSessionLocal() as db:
+        while True:
+            now = _utcnow()
+            job_id = (await db.execute(
+                select(PostingJob.id)
+                .where(PostingJob.status == "pending", PostingJob.next_run_at <= now)
+                .order_by(PostingJob.next_run_at, PostingJob.id)
+                .limit(1)
+            )).scalar()
+            if job_id is None:
+                return None
+
+            claimed = await db.execute(
+                update(PostingJob)
+                .where(PostingJob.id == job_id, PostingJob.status == "pending")
+                .values(status="running", locked_at=now, attempts=PostingJob.attempts + 1)
+            )
+            await db.commit()
+            if claimed.rowcount == 1:
+                return job_id
+            # Another worker won the race - try the next job
+
+
+async def run_job(job_id: int):
+    """Run a claimed job and record success, retry or failure"""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(PostingJob, job_id)
+        if job is None:
+            return
+
+        handler = _load_handlers().get(job.job_type)
+        try:
+            if handler is None:
+                raise JobFailed(f"Unknown job type: {job.job_type}", retryable=False)
+
+            result = await handler(job, db)
+            job.result = result
+            job.status = "succeeded"
+            job.last_error = None
+            job.locked_at = None
+            await db.commit()
+            print(f"✅ Job {job_id} ({job.job_type}) succeeded")
+
+        except Exception as e:
+            # Handlers commit their own progress; drop anything half-written
+            await db.rollback()
+            job = await db.get(PostingJob, job_id)
+            retryable = getattr(e, "retryable", True)
+
+            job.last_error = str(e)
+            job.locked_at = None
+            if retryable and job.attempts < job.max_attempts:
+                delay = retry_delay(job.attempts)
+                job.status = "pending"
+                job.next_run_at = _utcnow() + timedelta(seconds=delay)
+                print(f"🔄 Job {job_id} failed (attempt {job.attempts}), retrying in {delay:.0f}s: {e}")
+            else:
+                job.status = "failed"
+                print(f"❌ Job {job_id} failed permanently: {e}")
+            await db.commit()
+
+
+class JobWorker:
+    """Pool of asyncio tasks that poll the queue and run jobs"""
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self, concurrency: int):
+        """Requeue orphaned jobs and start `concurrency` worker tasks"""
+        if self._tasks or concurrency <= 0:
+            return
+
+        requeued = await requeue_stale_jobs()
+        if requeued:
+            print(f"🔄 Requeued {requeued} orphaned job(s)")
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run_loop(), name=f"job-worker-{i}")
+            for i in range(concurrency)
+        ]
+
+    async def stop(self):
+        """Cancel worker tasks; interrupted jobs are requeued after their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers after a job was enqueued in this process"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run_loop(self):
+        last_stale_check = _utcnow()
+        while True:
+            try:
+                if _utcnow() - last_stale_check > timedelta(seconds=settings.job_lease_seconds):
+                    await requeue_stale_jobs()
+                    last_stale_check = _utcnow()
+
+                job_id = await claim_next_job()
+                if job_id is not None:
+                    await run_job(job_id)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Job worker error: {e}")
+
+            # Idle: sleep until the poll interval elapses or a job is enqueued
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.job_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+job_worker = JobWorker()
+
+
+async def _run_standalone():
+    await job_worker.start(max(settings.job_worker_count, 1))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_worker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(_run_standalone())
@@ -0,0 +1,191 @@
+"""
+Read-through cache for products and product listings
+
+Product pages, the automation endpoints and the social posting endpoints
+all look a product up by id, and the app re-requests the same listing on
+every refresh. Both are served from a cache chosen by
+`settings.product_cache_backend`:
+
+    memory  an LRU of `product_cache_max_entries` entries per process
+    redis   shared by every worker at `redis_url`; needs redis
+
+Products are cached for `product_cache_ttl` seconds and listing pages,
+keyed by their filter tuple, for `listing_cache_ttl`. Every product write
+calls `invalidate(product_id)`. This drops the product and bumps a listing
+generation that is part of every listing key, so all cached pages go stale
+at once. With the memory backend and several workers, other workers only
+see a write once their entries expire. Use redis when that window matters.
+
+Entries are stored as JSON-compatible dicts, so callers never share a
+mutable object. Hit/miss counters are reported on /health.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.models import Product
+from app.schemas.schemas import ProductResponse
+from app.services.registry import get_product_cache
+
+_LISTING_GENERATION_KEY = "listing-generation"
+
+
+class MemoryCacheBackend:
+    """LRU with per-entry expiry, local to this process"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def increment(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisCacheBackend:
+    """Redis shared by all workers; values are stored as JSON"""
+
+    def __init__(self, url: str, prefix: str = "craftsmen:products:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def counter(self, key: str) -> int:
+        return int(await self.client.get(self.prefix + key) or 0)
+
+    async def increment(self, key: str) -> int:
+        return await self.client.incr(self.prefix + key)
+
+
+class ProductCache:
+    """Products by id and listing pages by filter tuple, with hit/miss counters"""
+
+    def __init__(self, backend, product_ttl: float, listing_ttl: float):
+        self.backend = backend
+        self.product_ttl = product_ttl
+        self.listing_ttl = listing_ttl
+        self.hits = {"product": 0, "listing": 0}
+        self.misses = {"product": 0, "listing": 0}
+
+    def _count(self, kind: str, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self.misses[kind] += 1
+        else:
+            self.hits[kind] += 1
+        return value
+
+    async def get_product(self, product_id: int) -> Optional[ProductResponse]:
+        data = self._count("product", await self.backend.get(f"product:{product_id}"))
+        return ProductResponse.model_validate(data) if data is not None else None
+
+    async def set_product(self, product: ProductResponse):
+        await self.backend.set(f"product:{product.id}", product.model_dump(mode="json"), self.product_ttl)
+
+    async def _listing_key(self, key: Tuple) -> str:
+        generation = await self.backend.counter(_LISTING_GENERATION_KEY)
+        return f"listing:{generation}:{json.dumps(key)}"
+
+    async def get_listing(self, key: Tuple) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Cached (items, next cursor) for a listing page, or None"""
+        data = self._count("listing", await self.backend.get(await self._listing_key(key)))
+        return (data["items"], data["next_cursor"]) if data is not None else None
+
+    async def set_listing(self, key: Tuple, items: List[Dict[str, Any]], next_cursor: Optional[str]):
+        await self.backend.set(
+            await self._listing_key(key),
+            {"items": items, "next_cursor": next_cursor},
+            self.listing_ttl
+        )
+
+    async def invalidate(self, product_id: Optional[int] = None):
+        """Forget a product (if given) and every cached listing page"""
+        if product_id is not None:
+            await self.backend.delete(f"product:{product_id}")
+        await self.backend.increment(_LISTING_GENERATION_KEY)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"backend": settings.product_cache_backend}
+        for kind in self.hits:
+            lookups = self.hits[kind] + self.misses[kind]
+            stats[kind] = {
+                "hits": self.hits[kind],
+                "misses": self.misses[kind],
+                "hit_rate": round(self.hits[kind] / lookups, 3) if lookups else None
+            }
+        return stats
+
+
+def build_product_cache() -> ProductCache:
+    if settings.product_cache_backend == "redis":
+        if not settings.redis_url:
+            raise RuntimeError("redis_url must be set when product_cache_backend is 'redis'")
+        backend = RedisCacheBackend(settings.redis_url)
+    elif settings.product_cache_backend == "memory":
+        backend = MemoryCacheBackend(settings.product_cache_max_entries)
+    else:
+        raise RuntimeError(f"Unknown product_cache_backend: {settings.product_cache_backend}")
+    return ProductCache(backend, settings.product_cache_ttl, settings.listing_cache_ttl)
+
+
+async def get_cached_product(db: AsyncSession, product_id: int) -> Optional[ProductResponse]:
+    """
+    Look a product up through the cache
+
+    Args:
+        db: Session used on a cache miss
+        product_id: Product to load
+
+    Returns:
+        The product as a ProductResponse, or None if it does not exist
+    """
+    cache = get_product_cache()
+    product = await cache.get_product(product_id)
+    if product is not None:
+        return product
+
+    db_product = await db.get(Product, product_id)
+    if db_product is None:
+        return None
+    product = ProductResponse.from_orm(db_product)
+    await cache.set_product(product)
+    return product
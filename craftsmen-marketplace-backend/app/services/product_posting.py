@@ -0,0 +1,255 @@
+"""
+Background handlers for the create-and-post workflows
+
+The create-and-post endpoints save the image and the product, then enqueue a
+job. These handlers do the slow part - caption generation and the social
+uploads - inside a queue worker. Progress is saved on the job after every
+step, so a retry reuses the generated caption and only re-posts to platforms
+that have not succeeded yet. Platforms whose upload timed out are never
+re-posted, since the upload may still finish and a retry would post the
+product twice; they are left for the artisan to check.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import PostingJob, Product
+from app.services.gemini_client import GeminiBusyError
+from app.services.image_upload import local_image_path, platform_image_paths
+from app.services.job_queue import JobFailed
+from app.services.registry import get_ai_agent, get_ai_service, get_product_cache, get_social_automation
+
+# Failures that retrying cannot fix
+_PERMANENT_ERROR_MARKERS = ("not configured", "not initialized", "not found", "check credentials")
+
+
+def _is_retryable(post_result: Dict[str, Any]) -> bool:
+    if post_result.get("outcome") == "unknown":
+        return False
+    message = (post_result.get("message") or "").lower()
+    return not any(marker in message for marker in _PERMANENT_ERROR_MARKERS)
+
+
+def _remaining_platforms(platforms: List[str], state: Dict[str, Any]) -> List[str]:
+    """Platforms that still need a (re)try"""
+    done = state.get("post_results", {})
+    return [
+        platform for platform in platforms
+        if platform not in done
+        or (not done[platform].get("success") and _is_retryable(done[platform]))
+    ]
+
+
+async def generate_enhanced_content(
+    product_name: str,
+    price: float,
+    description: Optional[str] = None,
+    category: Optional[str] = None,
+    platforms: Optional[List[str]] = None,
+    caption: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build the caption, platform content and hashtags for a native post
+
+    Uses the caption from the frontend preview when one was supplied,
+    otherwise the Google AI agent, falling back to the basic AI service.
+    """
+    platforms = platforms or ["facebook", "instagram"]
+
+    if caption and caption.strip():
+        # Use the provided caption from frontend preview
+        hashtag_matches = re.findall(r'#\w+', caption)
+        print(f"✅ Using frontend-provided caption: {caption[:50]}...")
+        return {
+            "ai_caption": caption,
+            "platform_content": {
+                "instagram": caption,
+                "facebook": caption
+            },
+            "hashtags": [tag.replace('#', '') for tag in hashtag_matches],
+            "marketing_insights": {"caption_source": "frontend_preview"}
+        }
+
+    print("🤖 No caption provided from frontend, generating new one...")
+
+    # Determine platform for optimization
+    platform_target = "both"
+    if len(platforms) == 1:
+        platform_target = platforms[0]
+
+    try:
+        enhanced_content = await get_ai_agent().generate_enhanced_content(
+            product_name=product_name,
+            price=price,
+            category=category,
+            description=description,
+            target_audience="craft enthusiasts and art lovers",
+            platform=platform_target
+        )
+        return {
+            "ai_caption": enhanced_content.get("base_caption", ""),
+            "platform_content": enhanced_content.get("platform_content", {}),
+            "hashtags": enhanced_content.get("hashtags", []),
+            "marketing_insights": enhanced_content.get("marketing_insights", {})
+        }
+
+    except GeminiBusyError:
+        # The job is retried later rather than queueing another call
+        raise
+    except Exception as e:
+        print(f"Enhanced AI agent failed, using fallback: {e}")
+        ai_caption_response = await get_ai_service().generate_product_caption(
+            product_name=product_name,
+            product_description=description or "",
+            price=price,
+            category=category or "handmade"
+        )
+        return {
+            "ai_caption": ai_caption_response.caption,
+            "platform_content": {
+                "instagram": ai_caption_response.caption,
+                "facebook": ai_caption_response.caption
+            },
+            "hashtags": ai_caption_response.hashtags,
+            "marketing_insights": {"fallback_used": True}
+        }
+
+
+async def _load_product(job: PostingJob, db: AsyncSession) -> Product:
+    product = await db.get(Product, job.product_id)
+    if product is None:
+        raise JobFailed(f"Product {job.product_id} no longer exists", retryable=False)
+    return product
+
+
+async def _save_progress(job: PostingJob, db: AsyncSession, state: Dict[str, Any]):
+    # Assign a fresh dict so SQLAlchemy detects the JSON change
+    job.result = dict(state)
+    await db.commit()
+    # Captions and post IDs land on the product with the progress
+    await get_product_cache().invalidate(job.product_id)
+
+
+async def _record_post_results(
+    job: PostingJob,
+    db: AsyncSession,
+    product: Product,
+    state: Dict[str, Any],
+    attempted: List[str],
+    post_results: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Merge this attempt's results, update the product and decide on a retry"""
+    merged = dict(state.get("post_results", {}))
+    for platform in attempted:
+        merged[platform] = post_results.get(platform) or {
+            "success": False,
+            "post_id": None,
+            "message": f"{platform.title()} not configured - skipped"
+        }
+    state["post_results"] = merged
+
+    if merged.get("facebook", {}).get("post_id"):
+        product.facebook_post_id = merged["facebook"]["post_id"]
+    if merged.get("instagram", {}).get("post_id"):
+        product.instagram_post_id = merged["instagram"]["post_id"]
+
+    await _save_progress(job, db, state)
+
+    retry = _remaining_platforms(job.payload["platforms"], state)
+    if retry:
+        raise JobFailed(f"Posting failed on: {', '.join(retry)}")
+    if not any(result.get("success") for result in merged.values()):
+        # Nothing was posted and nothing is worth retrying
+        unknown = [platform for platform, result in merged.items() if result.get("outcome") == "unknown"]
+        if unknown:
+            raise JobFailed(f"Upload outcome unknown on: {', '.join(unknown)}; not retried", retryable=False)
+        raise JobFailed(f"Posting failed on: {', '.join(merged)}", retryable=False)
+    return state
+
+
+async def run_create_and_post(job: PostingJob, db: AsyncSession) -> Dict[str, Any]:
+    """Generate a caption with AIService and post with business call-to-action"""
+    payload = job.payload
+    state = dict(job.result or {})
+    product = await _load_product(job, db)
+    social_automation = get_social_automation()
+
+    if "content" not in state:
+        caption_response = await get_ai_service().generate_product_caption(
+            product_name=product.name,
+            product_description=product.description,
+            price=product.price,
+            category=product.category
+        )
+        state["content"] = {
+            "ai_caption": caption_response.caption,
+            "full_caption": social_automation._create_business_caption(
+                ai_caption=caption_response.caption,
+                hashtags=caption_response.hashtags,
+                price=product.price
+            ),
+            "hashtags": caption_response.hashtags
+        }
+        product.ai_generated_caption = caption_response.caption
+        await _save_progress(job, db, state)
+
+    remaining = _remaining_platforms(payload["platforms"], state)
+    post_results = await social_automation._post_to_platforms(
+        image_path=await local_image_path(product.image_url),
+        caption=state["content"]["full_caption"],
+        platforms=remaining,
+        platform_image_paths=await platform_image_paths(product.image_url, product.image_variants)
+    )
+    return await _record_post_results(job, db, product, state, remaining, post_results)
+
+
+async def run_create_and_post_native(job: PostingJob, db: AsyncSession) -> Dict[str, Any]:
+    """Generate enhanced content (or reuse the previewed content or caption) and post it"""
+    payload = job.payload
+    state = dict(job.result or {})
+    product = await _load_product(job, db)
+
+    if "content" not in state and payload.get("content"):
+        # Posted with a preview token: the previewed content is used as-is
+        state["content"] = payload["content"]
+        product.ai_generated_caption = state["content"]["ai_caption"]
+        await _save_progress(job, db, state)
+    elif "content" not in state:
+        state["content"] = await generate_enhanced_content(
+            product_name=product.name,
+            price=product.price,
+            description=product.description,
+            category=product.category,
+            platforms=payload["platforms"],
+            caption=payload.get("caption")
+        )
+        product.ai_generated_caption = state["content"]["ai_caption"]
+        await _save_progress(job, db, state)
+
+    content = state["content"]
+    remaining = _remaining_platforms(payload["platforms"], state)
+    automation_result = await get_social_automation().create_and_post_product_with_content(
+        image_path=await local_image_path(product.image_url),
+        product_name=product.name,
+        price=product.price,
+        description=product.description,
+        category=product.category,
+        platforms=remaining,
+        ai_caption=content["ai_caption"],
+        platform_content=content["platform_content"],
+        hashtags=content["hashtags"],
+        platform_image_paths=await platform_image_paths(product.image_url, product.image_variants)
+    )
+    state["automation_enabled"] = state.get("automation_enabled") or automation_result.get("automation_enabled", False)
+    state["timings"] = automation_result.get("timings", {})
+    return await _record_post_results(
+        job, db, product, state, remaining, automation_result.get("post_results", {})
+    )
+
+
+JOB_HANDLERS = {
+    "create_and_post": run_create_and_post,
+    "create_and_post_native": run_create_and_post_native,
+}
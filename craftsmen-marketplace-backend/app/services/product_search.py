@@ -0,0 +1,148 @@
+"""
+Full-text product search
+
+Products are indexed on name, description, category and AI caption by
+migrations 0006 and 0011:
+
+    sqlite      FTS5 table `products_fts` over every searched column and
+                `products_fts_name` over names and categories, kept in sync
+                by triggers
+    postgresql  generated `search_vector` tsvector column with a GIN index;
+                names are its weight A entries
+
+Only active products are indexed. Both backends tokenize without stemming,
+so they behave the same. Every word of the query must match. The last word
+is also matched as a prefix while the user is still typing it ("blue pot"
+finds "Blue Pottery Vase"). On SQLite, a last word longer than the FTS5
+prefix indexes is matched on its first six characters, because expanding
+a long unindexed prefix is slow.
+
+Results come in two tiers: products whose name holds every word, then
+the other matches, newest first within each. Ranking needs no score, so
+on SQLite a page reads at most skip + limit entries per tier, walked in
+rowid order straight from the FTS doclists; the second tier is only read
+once the name tier has fewer rows than that. The cost depends on the
+page, not on how many products match; see benchmarks/product_search.py.
+"""
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import Select, case, column, false, func, literal, literal_column, select, table, union_all
+
+from app.models.models import Product
+
+MAX_SEARCH_TERMS = 8
+# FTS5 prefix indexes built by migrations 0006 and 0011 (prefix='2 3 4 5 6')
+PREFIX_INDEX_LENGTHS = range(2, 7)
+# FTS5 query that matches nothing, used to switch a tier off
+_NO_MATCH = '""'
+
+_products_fts = table("products_fts", column("rowid"), column("products_fts"))
+_products_fts_name = table("products_fts_name", column("rowid"), column("products_fts_name"))
+_search_vector = literal_column("products.search_vector")
+
+
+def search_terms(q: str) -> List[str]:
+    """Lower-cased words of a query; punctuation is dropped so users cannot inject query syntax"""
+    return re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+
+
+def _sqlite_last_term(term: str) -> str:
+    # One-letter prefixes have no index and would expand to a large part of the vocabulary
+    if len(term) < PREFIX_INDEX_LENGTHS[0]:
+        return f'"{term}"'
+    if len(term) in PREFIX_INDEX_LENGTHS:
+        return f'"{term}"*'
+    return f'("{term}" OR "{term[:PREFIX_INDEX_LENGTHS[-1]]}"*)'
+
+
+def _sqlite_matches(fts, match, category: Optional[str]) -> Select:
+    """Rowids of `fts` matching `match`, newest first, in exactly the category if one is given"""
+    query = select(fts.c.rowid.label("id")).where(fts.c[fts.name].op("MATCH")(match))
+    if category:
+        # The MATCH already narrowed to the category's words; this checks the exact value
+        query = query.join_from(fts, Product, Product.id == fts.c.rowid).where(Product.category == category)
+    return query.order_by(fts.c.rowid.desc())
+
+
+def _sqlite_ranked(match: str, category: Optional[str], skip: int, limit: int):
+    """Ids and tiers of one page, reading at most skip + limit rows per tier"""
+    wanted = skip + limit
+    in_category = ""
+    if category:
+        category_terms = " ".join(f'"{term}"' for term in search_terms(category))
+        in_category = f" AND category : ({category_terms})"
+    # Used twice below, so SQLite materializes it once
+    names = _sqlite_matches(_products_fts_name, f"name : ({match}){in_category}", category).limit(wanted).cte("names")
+    # Only search outside the names when they cannot fill the page; `names`
+    # then holds every name match, so excluding it is exact
+    rest_match = case(
+        (select(func.count()).select_from(names).scalar_subquery() < wanted, f"({match}){in_category}"),
+        else_=_NO_MATCH
+    )
+    rest = (
+        _sqlite_matches(_products_fts, rest_match, category)
+        .add_columns(literal(1).label("tier"))
+        .where(_products_fts.c.rowid.not_in(select(names.c.id)))
+        .limit(wanted)
+    )
+    ranked = union_all(select(names.c.id, literal(0).label("tier")), select(rest.subquery())).subquery()
+    return (
+        select(ranked.c.id, ranked.c.tier)
+        .order_by(ranked.c.tier, ranked.c.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+
+
+def build_search_query(
+    terms: List[str],
+    dialect_name: str,
+    category: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> Select:
+    """
+    Select one page of active products matching every term, best match first
+
+    Args:
+        terms: Words from `search_terms` (must not be empty)
+        dialect_name: "sqlite" or "postgresql"
+        category: Optional exact category filter
+        skip: Number of results to skip
+        limit: Page size
+
+    Returns:
+        A select of Product, already paged
+    """
+    if category and not search_terms(category):
+        # No product category is made of punctuation only
+        return select(Product).where(false())
+    if dialect_name == "sqlite":
+        match = " ".join(f'"{term}"' for term in terms[:-1]) + " " + _sqlite_last_term(terms[-1])
+        ranked = _sqlite_ranked(match, category, skip, limit)
+        return (
+            select(Product)
+            .join(ranked, ranked.c.id == Product.id)
+            .where(Product.is_active == True)
+            .order_by(ranked.c.tier, Product.id.desc())
+        )
+    if dialect_name == "postgresql":
+        prefix = "*" if len(terms[-1]) >= 2 else ""
+        ts_query = func.to_tsquery("simple", " & ".join(terms[:-1] + [f"{terms[-1]}:{prefix}" if prefix else terms[-1]]))
+        # The same words restricted to weight A, i.e. the name
+        name_query = func.to_tsquery("simple", " & ".join([f"{term}:A" for term in terms[:-1]] + [f"{terms[-1]}:{prefix}A"]))
+        tier = case((_search_vector.op("@@")(name_query), 0), else_=1)
+        query = (
+            select(Product)
+            .where(_search_vector.op("@@")(ts_query), Product.is_active == True)
+            .order_by(tier, Product.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        if category:
+            query = query.where(Product.category == category)
+        return query
+    raise RuntimeError(f"Full-text search is not supported on {dialect_name}")
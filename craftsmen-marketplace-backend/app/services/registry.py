@@ -0,0 +1,180 @@
+"""
+Process-wide registry for shared service clients
+
+Clients (Gemini models, Facebook/Instagram sessions, Speech client, object
+storage) are expensive to build, so nothing is constructed at import time.
+Each client is built once, on first use, and then shared by every router.
+The FastAPI lifespan in main.py calls `registry.shutdown()` so sessions are
+released when the process stops.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class ServiceRegistry:
+    """Lazily builds and caches named service instances"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._shutdown_hooks: Dict[str, Callable[[Any], None]] = {}
+        self._instances: Dict[str, Any] = {}
+        # Re-entrant: a factory may itself depend on another registered service
+        self._lock = threading.RLock()
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        shutdown: Optional[Callable[[Any], None]] = None
+    ):
+        """Register a factory that builds the service on first use"""
+        self._factories[name] = factory
+        if shutdown:
+            self._shutdown_hooks[name] = shutdown
+
+    def get(self, name: str) -> Any:
+        """Return the shared instance, building it if needed"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            # Another thread may have built it while we waited for the lock
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown service: {name}")
+                instance = self._factories[name]()
+                self._instances[name] = instance
+            return instance
+
+    def is_initialized(self, name: str) -> bool:
+        """Check whether a service has already been built"""
+        return name in self._instances
+
+    def status(self) -> Dict[str, bool]:
+        """Which registered services have been built so far"""
+        return {name: name in self._instances for name in self._factories}
+
+    def shutdown(self):
+        """Run shutdown hooks and drop all cached instances"""
+        with self._lock:
+            for name, instance in list(self._instances.items()):
+                hook = self._shutdown_hooks.get(name)
+                if hook:
+                    try:
+                        hook(instance)
+                    except Exception as e:
+                        print(f"⚠️ Error shutting down {name}: {e}")
+            self._instances.clear()
+
+
+# Service factories import lazily so that importing a router does not pull in
+# google.generativeai, instagrapi or google.cloud.speech on cold start.
+
+def _build_ai_service():
+    from app.services.ai_service import AIService
+    return AIService()
+
+
+def _build_ai_agent():
+    from app.services.google_ai_agent import GoogleAIAgent
+    return GoogleAIAgent()
+
+
+def _build_social_automation():
+    from app.services.social_media_automation import SocialMediaAutomationService
+    return SocialMediaAutomationService()
+
+
+def _shutdown_social_automation(service):
+    service.instagram_service.logout()
+
+
+def _build_speech_service():
+    from app.services.speech_service import SpeechToTextService
+    return SpeechToTextService()
+
+
+def _build_image_pool():
+    from app.services.image_pipeline import build_image_pool
+    return build_image_pool()
+
+
+def _shutdown_image_pool(pool):
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _build_storage():
+    from app.services.storage import build_storage
+    return build_storage()
+
+
+def _build_product_cache():
+    from app.services.product_cache import build_product_cache
+    return build_product_cache()
+
+
+def _build_caption_cache():
+    from app.services.caption_cache import build_caption_cache
+    return build_caption_cache()
+
+
+def _shutdown_caption_cache(cache):
+    cache.close()
+
+
+registry = ServiceRegistry()
+registry.register("ai_service", _build_ai_service)
+registry.register("ai_agent", _build_ai_agent)
+registry.register(
+    "social_automation",
+    _build_social_automation,
+    shutdown=_shutdown_social_automation
+)
+registry.register("speech_service", _build_speech_service)
+registry.register("image_pool", _build_image_pool, shutdown=_shutdown_image_pool)
+registry.register("storage", _build_storage)
+registry.register("product_cache", _build_product_cache)
+registry.register("caption_cache", _build_caption_cache, shutdown=_shutdown_caption_cache)
+
+
+def get_ai_service():
+    """Get the shared AIService instance"""
+    return registry.get("ai_service")
+
+
+def get_ai_agent():
+    """Get the shared GoogleAIAgent instance"""
+    return registry.get("ai_agent")
+
+
+def get_social_automation():
+    """Get the shared SocialMediaAutomationService instance"""
+    return registry.get("social_automation")
+
+
+def get_speech_service():
+    """Get the shared SpeechToTextService instance"""
+    return registry.get("speech_service")
+
+
+def get_image_pool():
+    """Get the shared process pool for image optimization"""
+    return registry.get("image_pool")
+
+
+def get_storage():
+    """Get the configured image storage backend"""
+    return registry.get("storage")
+
+
+def get_product_cache():
+    """Get the product and listing cache"""
+    return registry.get("product_cache")
+
+
+def get_caption_cache():
+    """Get the cache for generated captions and preview content"""
+    return registry.get("caption_cache")
@@ -0,0 +1,301 @@
+"""
+Daily sales rollups for order analytics
+
+Two tables hold running totals per UTC day the order was placed and order
+status:
+
+    daily_sales          orders and revenue
+    daily_product_sales  the same per product, with units and the product owner
+
+Only confirmed, completed and cancelled orders are counted. When an order
+changes status, `record_status_change` subtracts it from the totals of its
+old status and adds it to those of the new one. This happens in the same
+transaction as the status update, and each adjustment is an upsert that
+adds in SQL, so concurrent transitions cannot lose updates. The status
+update only applies if the order still has the status it was loaded with,
+so of two concurrent transitions from one status only one is counted; the
+other gets a 409. Reports read only these tables, however many orders
+there are.
+
+Existing orders are counted by rebuilding the tables from history:
+
+    python -m app.services.sales_rollups [BATCH_SIZE]
+
+The rebuild reads orders in id order, BATCH_SIZE at a time, and commits
+after each batch. Run it while orders are not being confirmed, completed
+or cancelled (e.g. right after migrating, before starting the API). A
+transition during the rebuild can be counted twice.
+"""
+
+import asyncio
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.database import AsyncSessionLocal
+from app.models.models import DailyProductSales, DailySales, Order, OrderItem, Product
+
+# Statuses with rollup rows; pending orders are not counted until confirmed
+TRACKED_STATUSES = ("confirmed", "completed", "cancelled")
+# Statuses that count as sales
+SOLD_STATUSES = ("confirmed", "completed")
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def order_day(created_at: datetime) -> date:
+    """UTC day an order belongs to (SQLite returns naive UTC, Postgres aware datetimes)"""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+class _Deltas:
+    """Rollup changes for a set of orders, applied with one upsert per table"""
+
+    def __init__(self):
+        self.daily = defaultdict(lambda: [0, 0.0])  # (day, status) -> [orders, revenue]
+        self.products = {}  # (day, product_id, status) -> [owner_id, orders, units, revenue]
+
+    def add(self, created_at: datetime, total_amount: float, items, status: str, sign: int):
+        """
+        Count an order under `status`; sign -1 removes it
+
+        `items` are (product_id, owner_id, quantity, price) tuples.
+        """
+        if status not in TRACKED_STATUSES:
+            return
+        day = order_day(created_at)
+        totals = self.daily[(day, status)]
+        totals[0] += sign
+        totals[1] += sign * total_amount
+
+        counted = set()
+        for product_id, owner_id, quantity, price in items:
+            row = self.products.setdefault((day, product_id, status), [owner_id, 0, 0, 0.0])
+            if product_id not in counted:
+                row[1] += sign
+                counted.add(product_id)
+            row[2] += sign * quantity
+            row[3] += sign * quantity * price
+
+    async def apply(self, db: AsyncSession):
+        insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        daily_rows = [
+            {"day": day, "status": status, "orders": orders, "revenue": revenue}
+            for (day, status), (orders, revenue) in self.daily.items()
+        ]
+        product_rows = [
+            {
+                "day": day, "product_id": product_id, "status": status,
+                "owner_id": owner_id, "orders": orders, "units": units, "revenue": revenue
+            }
+            for (day, product_id, status), (owner_id, orders, units, revenue) in self.products.items()
+        ]
+
+        for table, rows, summed in (
+            (DailySales, daily_rows, ("orders", "revenue")),
+            (DailyProductSales, product_rows, ("orders", "units", "revenue")),
+        ):
+            if not rows:
+                continue
+            # One cached statement executed for every row, rather than a large VALUES list compiled per batch
+            statement = insert(table)
+            await db.execute(statement.on_conflict_do_update(
+                index_elements=list(table.__table__.primary_key.columns),
+                set_={name: getattr(table, name) + statement.excluded[name] for name in summed}
+            ), rows)
+
+
+async def record_status_change(db: AsyncSession, order: Order, status: str, changes: Optional[Dict[str, Any]] = None):
+    """
+    Set an order's status and move it between rollups (committed with the caller's transaction)
+
+    Args:
+        db: The session the order was loaded in
+        order: The order, with order_items and their products loaded
+        status: The new status
+        changes: Other columns to set in the same UPDATE
+
+    Raises:
+        HTTPException: 409 if the order's status changed since it was loaded
+    """
+    changes = changes or {}
+    if order.status == status:
+        for field, value in changes.items():
+            setattr(order, field, value)
+        return
+    result = await db.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.status == order.status)
+        .values(status=status, **changes)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise HTTPException(status_code=409, detail="Order status changed concurrently; reload and retry")
+
+    items = [(item.product_id, item.product.owner_id, item.quantity, item.price) for item in order.order_items]
+    deltas = _Deltas()
+    deltas.add(order.created_at, order.total_amount, items, order.status, -1)
+    deltas.add(order.created_at, order.total_amount, items, status, 1)
+    await deltas.apply(db)
+    # Already written above; the flush must not update them again
+    for field, value in {**changes, "status": status}.items():
+        set_committed_value(order, field, value)
+
+
+async def sales_analytics(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    owner_id: Optional[int] = None,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Sales between two days (inclusive), read from the rollups only
+
+    Returns:
+        Per-day totals (marketplace-wide), the top `limit` products by
+        revenue and revenue per owner; `owner_id` narrows the last two
+    """
+    sold = DailySales.status.in_(SOLD_STATUSES)
+    cancelled = DailySales.status == "cancelled"
+    day_rows = (await db.execute(
+        select(
+            DailySales.day,
+            func.sum(DailySales.orders).filter(sold).label("orders"),
+            func.sum(DailySales.revenue).filter(sold).label("revenue"),
+            func.sum(DailySales.orders).filter(DailySales.status == "completed").label("completed_orders"),
+            func.sum(DailySales.orders).filter(cancelled).label("cancelled_orders"),
+            func.sum(DailySales.revenue).filter(cancelled).label("cancelled_revenue"),
+        )
+        .where(DailySales.day.between(start, end))
+        .group_by(DailySales.day)
+        .order_by(DailySales.day)
+    )).all()
+
+    product_sales = (
+        select(DailyProductSales)
+        .where(DailyProductSales.day.between(start, end), DailyProductSales.status.in_(SOLD_STATUSES))
+    )
+    if owner_id is not None:
+        product_sales = product_sales.where(DailyProductSales.owner_id == owner_id)
+    product_sales = product_sales.subquery()
+
+    revenue = func.sum(product_sales.c.revenue)
+    product_rows = (await db.execute(
+        select(
+            product_sales.c.product_id,
+            func.max(product_sales.c.owner_id).label("owner_id"),
+            func.sum(product_sales.c.orders).label("orders"),
+            func.sum(product_sales.c.units).label("units"),
+            revenue.label("revenue"),
+        )
+        .group_by(product_sales.c.product_id)
+        .having(func.sum(product_sales.c.orders) > 0)
+        .order_by(revenue.desc(), product_sales.c.product_id)
+        .limit(limit)
+    )).all()
+
+    owner_revenue = func.sum(product_sales.c.revenue)
+    owner_rows = (await db.execute(
+        select(
+            product_sales.c.owner_id,
+            func.sum(product_sales.c.units).label("units"),
+            owner_revenue.label("revenue"),
+        )
+        .group_by(product_sales.c.owner_id)
+        .having(func.sum(product_sales.c.orders) > 0)
+        .order_by(owner_revenue.desc())
+    )).all()
+
+    # Money is summed as floats; added and removed amounts can leave dust
+    days = [
+        {
+            "day": row.day,
+            "orders": row.orders or 0,
+            "revenue": round(row.revenue or 0, 2),
+            "completed_orders": row.completed_orders or 0,
+            "cancelled_orders": row.cancelled_orders or 0,
+            "cancelled_revenue": round(row.cancelled_revenue or 0, 2),
+        }
+        for row in day_rows
+    ]
+    return {
+        "start": start,
+        "end": end,
+        "totals": {
+            "orders": sum(day["orders"] for day in days),
+            "revenue": round(sum(day["revenue"] for day in days), 2),
+            "completed_orders": sum(day["completed_orders"] for day in days),
+            "cancelled_orders": sum(day["cancelled_orders"] for day in days),
+            "cancelled_revenue": round(sum(day["cancelled_revenue"] for day in days), 2),
+        },
+        "days": days,
+        "products": [
+            {**row._mapping, "revenue": round(row.revenue, 2)} for row in product_rows
+        ],
+        "owners": [
+            {**row._mapping, "revenue": round(row.revenue, 2)} for row in owner_rows
+        ],
+    }
+
+
+async def backfill_sales_rollups(batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Rebuild the rollups from every confirmed, completed and cancelled order
+
+    Returns:
+        Number of orders counted
+    """
+    counted = 0
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(DailyProductSales))
+        await db.execute(delete(DailySales))
+
+        last_id = 0
+        while True:
+            orders = (await db.execute(
+                select(Order.id, Order.created_at, Order.total_amount, Order.status)
+                .where(Order.status.in_(TRACKED_STATUSES), Order.id > last_id)
+                .order_by(Order.id)
+                .limit(batch_size)
+            )).all()
+            if not orders:
+                break
+
+            # Plain rows rather than ORM objects: the rebuild reads every order once
+            items = defaultdict(list)
+            for row in await db.execute(
+                select(OrderItem.order_id, OrderItem.product_id, Product.owner_id, OrderItem.quantity, OrderItem.price)
+                .join(Product, Product.id == OrderItem.product_id)
+                .where(OrderItem.order_id.in_([order.id for order in orders]))
+            ):
+                items[row.order_id].append(tuple(row)[1:])
+
+            deltas = _Deltas()
+            for order in orders:
+                deltas.add(order.created_at, order.total_amount, items[order.id], order.status, 1)
+            await deltas.apply(db)
+            await db.commit()
+
+            counted += len(orders)
+            last_id = orders[-1].id
+            print(f"📊 Sales rollups: {counted} orders counted (up to order {last_id})")
+
+        await db.commit()
+
+    print(f"✅ Sales rollups rebuilt from {counted} orders")
+    return counted
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_sales_rollups(int(sys.argv[1]) if len(sys.argv) > 1 else BACKFILL_BATCH_SIZE))
@@ -0,0 +1,67 @@
+"""
+Coalescing of concurrent identical AI requests
+
+When the preview screen fires twice, or several workers want the same
+caption or comment reply at once, each of them would start its own Gemini
+call. `ai_flights.do(key, factory)` runs the first caller's call and lets
+every caller that arrives with the same key while it is in flight await
+that same call. Afterwards the key is forgotten, so the next request
+starts a new call (or, for captions, finds the result in the caption
+cache).
+
+The call runs as its own task. A caller that is cancelled, e.g. because
+its client disconnected, does not cancel the call for the others.
+Exceptions reach every waiter. Joining callers get a copy of the result,
+so no two callers share a mutable object.
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """At most one in-flight call per key; later callers await the same result"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the outcome as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `factory()` unless a call with this key is already in flight
+
+        Args:
+            key: Identifies identical requests (e.g. a caption_key)
+            factory: Starts the call; only invoked by the first caller
+
+        Returns:
+            The call's result
+        """
+        task = self._calls.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = asyncio.ensure_future(factory())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        self.calls += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+# Shared by AIService and GoogleAIAgent
+ai_flights = SingleFlight()
@@ -1,13 +1,14 @@
 import facebook
 from instagrapi import Client
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable
 from datetime import datetime, time
+from time import perf_counter
 import asyncio
 import json
 
 from app.core.config import settings
-from app.services.ai_service import AIService
 from app.services.instagram_service import instagram_service
+from app.services.registry import get_ai_service
 from app.schemas.schemas import SocialMediaPostResponse
 
 
@@ -18,29 +19,24 @@ class SocialMediaAutomationService:
         # Initialize Facebook API
         self.facebook_api = None
         if settings.facebook_access_token:
-            self.facebook_api = facebook.GraphAPI(access_token=settings.facebook_access_token)
+            # Each Graph request times out on its own, so a stuck upload ends its worker thread
+            self.facebook_api = facebook.GraphAPI(
+                access_token=settings.facebook_access_token,
+                timeout=settings.social_post_timeout
+            )
         
-        # Initialize Instagram Service with username/password
+        # Initialize Instagram Service with username/password. The service is
+        # built on first use from async handlers, so it must not log in here:
+        # post_photo logs in on its first upload, in a worker thread
         self.instagram_service = instagram_service
         
-        # Auto-login to Instagram and keep session active
-        if self.instagram_service.client:
-            try:
-                login_success = self.instagram_service.login()
-                if login_success:
-                    print("✅ Instagram auto-login successful - ready for posting!")
-                else:
-                    print("⚠️ Instagram auto-login failed")
-            except Exception as e:
-                print(f"⚠️ Instagram auto-login error: {e}")
-        
         # Keep instagrapi as backup (if needed)
         self.instagram_client = None
         if settings.instagram_access_token:
             self.instagram_client = Client()
         
-        # Initialize AI service for automated responses
-        self.ai_service = AIService()
+        # Shared AI service for automated responses
+        self.ai_service = get_ai_service()
     
     async def create_and_post_product(
         self, 
@@ -49,7 +45,8 @@ class SocialMediaAutomationService:
         price: float,
         description: str = None,
         category: str = None,
-        platforms: List[str] = ["facebook", "instagram"]
+        platforms: List[str] = ["facebook", "instagram"],
+        platform_image_paths: Dict[str, str] = None
     ) -> Dict[str, Any]:
         """
         Complete workflow: Generate AI caption and post to social media
@@ -61,6 +58,7 @@ class SocialMediaAutomationService:
             description: Product description
             category: Product category
             platforms: Platforms to post to
+            platform_image_paths: Optional per-platform rendition paths overriding image_path
             
         Returns:
             Dictionary with post results and IDs
@@ -85,7 +83,8 @@ class SocialMediaAutomationService:
         post_results = await self._post_to_platforms(
             image_path=image_path,
             caption=full_caption,
-            platforms=platforms
+            platforms=platforms,
+            platform_image_paths=platform_image_paths
         )
         
         return {
@@ -94,7 +93,11 @@ class SocialMediaAutomationService:
             "full_caption": full_caption,
             "hashtags": caption_response.hashtags,
             "post_results": post_results,
-            "platforms_posted": platforms
+            "platforms_posted": platforms,
+            "timings": {
+                platform: result["duration_ms"]
+                for platform, result in post_results.items()
+            }
         }
     
     def _create_business_caption(self, ai_caption: str, hashtags: List[str], price: float) -> str:
@@ -118,65 +121,119 @@ class SocialMediaAutomationService:
         self, 
         image_path: str, 
         caption: str, 
-        platforms: List[str]
+        platforms: List[str],
+        platform_image_paths: Dict[str, str] = None
     ) -> Dict[str, Any]:
-        """Post to multiple social media platforms"""
+        """Post to multiple social media platforms concurrently"""
         
-        results = {}
+        image_paths = platform_image_paths or {}
+        posts = {}
         
         if "facebook" in platforms and self.facebook_api:
-            try:
-                fb_result = await self._post_to_facebook(image_path, caption)
-                results["facebook"] = {
-                    "success": fb_result is not None,
-                    "post_id": fb_result,
-                    "message": "Posted successfully" if fb_result else "Failed to post"
-                }
-            except Exception as e:
-                results["facebook"] = {
-                    "success": False,
-                    "post_id": None,
-                    "message": f"Error: {str(e)}"
-                }
+            posts["facebook"] = self._post_facebook_result(
+                image_paths.get("facebook", image_path), caption
+            )
         
         # Post to Instagram using InstagramService with username/password
         if "instagram" in platforms:
-            try:
-                print(f"📸 Posting to Instagram with caption: {caption[:100]}...")
-                
-                ig_result = await self.instagram_service.post_photo(
-                    image_path=image_path,
-                    caption=caption
+            print(f"📸 Posting to Instagram with caption: {caption[:100]}...")
+            posts["instagram"] = self._post_instagram_result(
+                image_paths.get("instagram", image_path), caption
+            )
+        
+        return await self._run_platform_posts(posts)
+    
+    async def _post_facebook_result(self, image_path: str, caption: str) -> Dict[str, Any]:
+        """Post to Facebook and format the result for _post_to_platforms"""
+        fb_result = await self._post_to_facebook(image_path, caption)
+        return {
+            "success": fb_result is not None,
+            "post_id": fb_result,
+            "message": "Posted successfully" if fb_result else "Failed to post"
+        }
+    
+    async def _post_instagram_result(self, image_path: str, caption: str) -> Dict[str, Any]:
+        """Post to Instagram and format the result for _post_to_platforms"""
+        ig_result = await self.instagram_service.post_photo(
+            image_path=image_path,
+            caption=caption
+        )
+        if ig_result["success"]:
+            print(f"✅ Instagram post successful! Post ID: {ig_result.get('post_id')}")
+        else:
+            print(f"❌ Instagram post failed: {ig_result.get('error')}")
+        return {
+            "success": ig_result["success"],
+            "post_id": ig_result.get("post_id"),
+            "message": ig_result.get("message", ig_result.get("error", "Unknown error"))
+        }
+    
+    async def _run_platform_posts(
+        self,
+        posts: Dict[str, Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Run platform uploads concurrently, each with its own timeout
+        
+        A failure or timeout on one platform never affects the others; it is
+        reported in that platform's result instead. Every result carries a
+        `duration_ms` timing.
+        
+        A timeout cannot stop the upload's worker thread, which may still
+        publish the post. Timed-out results are therefore marked
+        `"outcome": "unknown"` rather than reported as plain failures.
+        """
+        if not posts:
+            return {}
+        
+        outcomes = await asyncio.gather(
+            *(self._timed_platform_post(platform, post) for platform, post in posts.items())
+        )
+        return dict(zip(posts.keys(), outcomes))
+    
+    async def _timed_platform_post(
+        self,
+        platform: str,
+        post: Awaitable[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Await a single platform upload with timeout and error isolation"""
+        started = perf_counter()
+        try:
+            result = await asyncio.wait_for(post, timeout=settings.social_post_timeout)
+        except asyncio.TimeoutError:
+            result = {
+                "success": False,
+                "post_id": None,
+                "outcome": "unknown",
+                "message": (
+                    f"{platform.title()} upload still running after {settings.social_post_timeout}s; "
+                    "it may yet be published, check the account before posting again"
                 )
-                results["instagram"] = {
-                    "success": ig_result["success"],
-                    "post_id": ig_result.get("post_id"),
-                    "message": ig_result.get("message", ig_result.get("error", "Unknown error"))
-                }
-                if ig_result["success"]:
-                    print(f"✅ Instagram post successful! Post ID: {ig_result.get('post_id')}")
-                else:
-                    print(f"❌ Instagram post failed: {ig_result.get('error')}")
-            except Exception as e:
-                results["instagram"] = {
-                    "success": False,
-                    "post_id": None,
-                    "message": f"Error: {str(e)}"
-                }
-                print(f"❌ Instagram posting exception: {str(e)}")
-                import traceback
-                traceback.print_exc()
-
-        return results
+            }
+            print(f"⏱️ {platform.title()} upload timed out; outcome unknown")
+        except Exception as e:
+            result = {
+                "success": False,
+                "post_id": None,
+                "message": f"Error: {str(e)}"
+            }
+            print(f"❌ {platform.title()} posting exception: {str(e)}")
+        
+        result["duration_ms"] = round((perf_counter() - started) * 1000, 1)
+        return result
+    
+    def _upload_facebook_photo(self, image_path: str, caption: str) -> Dict[str, Any]:
+        """Blocking Graph API photo upload - run via asyncio.to_thread"""
+        with open(image_path, 'rb') as image_file:
+            return self.facebook_api.put_photo(
+                image=image_file,
+                message=caption
+            )
     
     async def _post_to_facebook(self, image_path: str, caption: str) -> Optional[str]:
         """Post to Facebook Page"""
         try:
-            with open(image_path, 'rb') as image_file:
-                response = self.facebook_api.put_photo(
-                    image=image_file,
-                    message=caption
-                )
+            response = await asyncio.to_thread(self._upload_facebook_photo, image_path, caption)
             return response.get('id')
         except Exception as e:
             print(f"Facebook posting error: {str(e)}")
@@ -412,7 +469,8 @@ class SocialMediaAutomationService:
         platforms: List[str] = ["facebook", "instagram"],
         ai_caption: str = None,
         platform_content: Dict[str, str] = None,
-        hashtags: List[str] = None
+        hashtags: List[str] = None,
+        platform_image_paths: Dict[str, str] = None
     ) -> Dict[str, Any]:
         """
         Enhanced workflow: Use pre-generated AI content and post to social media
@@ -427,6 +485,7 @@ class SocialMediaAutomationService:
             ai_caption: Pre-generated AI caption
             platform_content: Platform-specific content
             hashtags: Pre-generated hashtags
+            platform_image_paths: Optional per-platform rendition paths overriding image_path
             
         Returns:
             Dictionary with posting results and automation setup
@@ -458,13 +517,30 @@ class SocialMediaAutomationService:
             "automation_enabled": False
         }
         
-        # Post to platforms
+        # Post to platforms concurrently, each with its own rendition if available
+        image_paths = platform_image_paths or {}
+        posts = {}
         if "facebook" in platforms:
-            facebook_result = await self.post_to_facebook(
+            posts["facebook"] = self.post_to_facebook(
                 caption=facebook_caption,
-                image_path=image_path
+                image_path=image_paths.get("facebook", image_path)
+            )
+        if "instagram" in platforms:
+            posts["instagram"] = self.post_to_instagram(
+                caption=instagram_caption,
+                image_path=image_paths.get("instagram", image_path)
             )
-            results["post_results"]["facebook"] = facebook_result
+        
+        started = perf_counter()
+        results["post_results"] = await self._run_platform_posts(posts)
+        results["timings"] = {
+            platform: result["duration_ms"]
+            for platform, result in results["post_results"].items()
+        }
+        results["timings"]["total_ms"] = round((perf_counter() - started) * 1000, 1)
+        
+        if "facebook" in results["post_results"]:
+            facebook_result = results["post_results"]["facebook"]
             
             # Enable automated responses
             if facebook_result.get("success") and facebook_result.get("post_id"):
@@ -475,12 +551,8 @@ class SocialMediaAutomationService:
                 )
                 results["automation_enabled"] = True
         
-        if "instagram" in platforms:
-            instagram_result = await self.post_to_instagram(
-                caption=instagram_caption,
-                image_path=image_path
-            )
-            results["post_results"]["instagram"] = instagram_result
+        if "instagram" in results["post_results"]:
+            instagram_result = results["post_results"]["instagram"]
             
             # Enable automated responses
             if instagram_result.get("success") and instagram_result.get("post_id"):
@@ -499,11 +571,7 @@ class SocialMediaAutomationService:
             if not self.facebook_api:
                 return {"success": False, "message": "Facebook API not configured", "post_id": None}
             
-            with open(image_path, 'rb') as image_file:
-                response = self.facebook_api.put_photo(
-                    image=image_file,
-                    message=caption
-                )
+            response = await asyncio.to_thread(self._upload_facebook_photo, image_path, caption)
             
             post_id = response.get('id')
             return {
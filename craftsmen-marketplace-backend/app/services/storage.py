@@ -0,0 +1,286 @@
+"""
+Object storage for uploaded images
+
+Image renditions are written through a storage backend chosen by
+`settings.storage_backend`:
+
+    local   files under `upload_folder`, served by the API at /uploads;
+            raw `incoming/` uploads go to `upload_incoming_folder`, which is
+            not served, since they still carry EXIF and GPS metadata
+    s3      an S3-compatible bucket (AWS S3, MinIO, R2), served from
+            `s3_public_url`; needs boto3
+
+Both backends issue presigned uploads, so the Flutter app can send image
+bytes straight to storage and then hand the API a key under `incoming/`
+(see services/image_upload.py). On S3, add a lifecycle rule that expires
+`incoming/` objects that were never used.
+
+Social platforms need a file on disk, so `local_path` downloads remote
+objects into a local cache first. Rendition keys are content-addressed, so
+a cached copy never goes stale.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+INCOMING_PREFIX = "incoming/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def key_for_url(url: str) -> str:
+    """Storage key of a rendition URL (renditions are stored flat, by file name)"""
+    return url.split('/')[-1]
+
+
+def new_incoming_key() -> str:
+    return f"{INCOMING_PREFIX}{uuid.uuid4().hex}"
+
+
+def _validate_key(key: str) -> str:
+    if not key or key.startswith("/") or ".." in key.split("/"):
+        raise ValueError(f"Invalid storage key: {key!r}")
+    return key
+
+
+class StorageBackend(ABC):
+    """Interface shared by the storage backends"""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Public URL the image is served from"""
+        ...
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, content_type: str):
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Object contents, or None if the key does not exist"""
+        ...
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Delete an object; missing keys are ignored"""
+        ...
+
+    @abstractmethod
+    async def local_path(self, key: str) -> str:
+        """Path of a local file holding the object"""
+        ...
+
+    @abstractmethod
+    def presign_upload(self, key: str, content_type: str) -> Dict[str, Any]:
+        """
+        Build a direct upload for the client
+
+        Returns:
+            {"method", "url", "fields", "headers"} - POST the fields plus a
+            "file" part, or PUT the raw bytes with the headers
+        """
+        ...
+
+
+class LocalStorage(StorageBackend):
+    """Files under the upload folder; presigned uploads are HMAC-signed API URLs"""
+
+    def __init__(self, root: str, incoming_root: str):
+        self.root = root
+        self.incoming_root = incoming_root
+
+    def _path(self, key: str) -> str:
+        key = _validate_key(key)
+        if key.startswith(INCOMING_PREFIX):
+            # Outside the static mount: raw uploads are only read back by the API
+            return os.path.join(self.incoming_root, *key[len(INCOMING_PREFIX):].split("/"))
+        return os.path.join(self.root, *key.split("/"))
+
+    def url(self, key: str) -> str:
+        return f"/uploads/{key}"
+
+    async def put(self, key: str, data: bytes, content_type: str):
+        path = self._path(key)
+
+        def _write():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write via a temp file so a content-addressed name never holds a partial file;
+            # unique per write, since threads may write the same key at once
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        await asyncio.to_thread(_write)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+
+        def _read():
+            try:
+                with open(path, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                return None
+
+        return await asyncio.to_thread(_read)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(os.path.isfile, self._path(key))
+
+    async def delete(self, key: str):
+        path = self._path(key)
+
+        def _remove():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        await asyncio.to_thread(_remove)
+
+    async def local_path(self, key: str) -> str:
+        return self._path(key)
+
+    @staticmethod
+    def signature(key: str, expires: int) -> str:
+        message = f"{key}:{expires}".encode()
+        return hmac.new(settings.secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+    @classmethod
+    def verify_signature(cls, key: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(cls.signature(key, expires), signature)
+
+    def presign_upload(self, key: str, content_type: str) -> Dict[str, Any]:
+        expires = int(time.time()) + settings.storage_presign_expires
+        signature = self.signature(key, expires)
+        return {
+            "method": "PUT",
+            "url": f"/api/storage/local-upload/{key}?expires={expires}&signature={signature}",
+            "fields": {},
+            "headers": {"Content-Type": content_type}
+        }
+
+
+class S3Storage(StorageBackend):
+    """S3-compatible bucket; boto3 calls run in a thread to keep the event loop free"""
+
+    def __init__(self):
+        import boto3
+        from botocore.exceptions import ClientError
+
+        if not settings.s3_bucket:
+            raise RuntimeError("s3_bucket must be set when storage_backend is 's3'")
+        self.bucket = settings.s3_bucket
+        self.client_error = ClientError
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.s3_endpoint_url,
+            region_name=settings.s3_region,
+            aws_access_key_id=settings.s3_access_key_id,
+            aws_secret_access_key=settings.s3_secret_access_key
+        )
+        if settings.s3_public_url:
+            self.public_url = settings.s3_public_url.rstrip("/")
+        elif settings.s3_endpoint_url:
+            # Path-style addressing, as used by MinIO
+            self.public_url = f"{settings.s3_endpoint_url.rstrip('/')}/{self.bucket}"
+        else:
+            self.public_url = f"https://{self.bucket}.s3.amazonaws.com"
+        self.cache_dir = os.path.join(tempfile.gettempdir(), "craftsmen-storage-cache")
+
+    @staticmethod
+    def _is_missing(error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    async def put(self, key: str, data: bytes, content_type: str):
+        await asyncio.to_thread(
+            self.client.put_object,
+            Bucket=self.bucket,
+            Key=_validate_key(key),
+            Body=data,
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        def _get():
+            try:
+                response = self.client.get_object(Bucket=self.bucket, Key=_validate_key(key))
+            except self.client_error as e:
+                if self._is_missing(e):
+                    return None
+                raise
+            return response["Body"].read()
+
+        return await asyncio.to_thread(_get)
+
+    async def exists(self, key: str) -> bool:
+        def _head():
+            try:
+                self.client.head_object(Bucket=self.bucket, Key=_validate_key(key))
+                return True
+            except self.client_error as e:
+                if self._is_missing(e):
+                    return False
+                raise
+
+        return await asyncio.to_thread(_head)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=_validate_key(key))
+
+    async def local_path(self, key: str) -> str:
+        path = os.path.join(self.cache_dir, *_validate_key(key).split("/"))
+
+        def _download():
+            if os.path.isfile(path):
+                return
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique per download: concurrent requests for the same key each fetch their own copy
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            self.client.download_file(self.bucket, key, tmp_path)
+            os.replace(tmp_path, path)
+
+        await asyncio.to_thread(_download)
+        return path
+
+    def presign_upload(self, key: str, content_type: str) -> Dict[str, Any]:
+        # Presigned POST lets the bucket enforce the size limit itself
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=_validate_key(key),
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, settings.max_file_size]
+            ],
+            ExpiresIn=settings.storage_presign_expires
+        )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
+
+
+def build_storage() -> StorageBackend:
+    if settings.storage_backend == "s3":
+        return S3Storage()
+    if settings.storage_backend != "local":
+        raise RuntimeError(f"Unknown storage_backend: {settings.storage_backend}")
+    return LocalStorage(settings.upload_folder, settings.upload_incoming_folder)
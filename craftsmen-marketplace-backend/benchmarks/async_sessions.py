@@ -0,0 +1,151 @@
+"""
+Sync sessions on the event loop vs AsyncSession under concurrent load
+
+Migrates a database and runs two operations from CLIENTS concurrent tasks
+for SECONDS_PER_RUN each:
+
+    listing  the product listing query (100 active products)
+    order    order creation as the routers did it before batching: one
+             product lookup per item, then the order and its items
+
+Each operation runs twice with the same queries. The "sync" mode uses the
+old SessionLocal inside `async def` handlers, which blocks the event loop
+for every round trip. The "async" mode uses AsyncSessionLocal, as the
+routers now do. A ticker task records how late the event loop wakes it,
+which is the delay every other request would see.
+
+With no argument a scratch SQLite database is used. SQLite round trips are
+local, so the loop lag matters more there than the throughput. To measure
+on Postgres, where each round trip waits on the network, pass a URL for
+an empty database that can be migrated:
+
+    python benchmarks/async_sessions.py [DATABASE_URL]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+if len(sys.argv) > 1:
+    os.environ["DATABASE_URL"] = sys.argv[1]
+else:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'async_sessions.db')}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, SessionLocal, async_engine, engine  # noqa: E402
+from app.models.models import Order, OrderItem, Product  # noqa: E402
+from app.schemas.schemas import ProductResponse  # noqa: E402
+
+CLIENTS = 20
+PRODUCTS = 500
+ITEMS_PER_ORDER = 5
+SECONDS_PER_RUN = 3.0
+TICK = 0.005
+
+
+def _listing_query():
+    return select(Product).where(Product.is_active == True).limit(100)  # noqa: E712
+
+
+def _order(items):
+    return Order(customer_name="Benchmark", customer_phone="0000000000", total_amount=sum(price for _, price in items))
+
+
+async def listing_sync():
+    with SessionLocal() as db:
+        return [ProductResponse.from_orm(product) for product in db.execute(_listing_query()).scalars()]
+
+
+async def listing_async():
+    async with AsyncSessionLocal() as db:
+        return [ProductResponse.from_orm(product) for product in (await db.execute(_listing_query())).scalars()]
+
+
+async def order_sync(offset):
+    with SessionLocal() as db:
+        items = []
+        for i in range(ITEMS_PER_ORDER):
+            product = db.get(Product, (offset + i) % PRODUCTS + 1)
+            items.append((product.id, product.price))
+        order = _order(items)
+        db.add(order)
+        db.commit()
+        db.add_all(OrderItem(order_id=order.id, product_id=product_id, quantity=1, price=price) for product_id, price in items)
+        db.commit()
+
+
+async def order_async(offset):
+    async with AsyncSessionLocal() as db:
+        items = []
+        for i in range(ITEMS_PER_ORDER):
+            product = await db.get(Product, (offset + i) % PRODUCTS + 1)
+            items.append((product.id, product.price))
+        order = _order(items)
+        db.add(order)
+        await db.commit()
+        db.add_all(OrderItem(order_id=order.id, product_id=product_id, quantity=1, price=price) for product_id, price in items)
+        await db.commit()
+
+
+async def _run(operation):
+    """Operations per second and the loop lag p99 in ms while CLIENTS tasks run `operation`"""
+    stop = time.perf_counter() + SECONDS_PER_RUN
+    done = 0
+    lags = []
+
+    async def client(worker):
+        nonlocal done
+        while time.perf_counter() < stop:
+            await operation(worker * 1000 + done)
+            done += 1
+
+    async def ticker():
+        while time.perf_counter() < stop:
+            expected = time.perf_counter() + TICK
+            await asyncio.sleep(TICK)
+            lags.append(max(time.perf_counter() - expected, 0.0))
+
+    started = time.perf_counter()
+    await asyncio.gather(ticker(), *(client(worker) for worker in range(CLIENTS)))
+    lags.sort()
+    return done / (time.perf_counter() - started), lags[int(len(lags) * 0.99)] * 1000
+
+
+def _seed():
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, username, email, hashed_password, full_name, is_active) "
+            "VALUES (1, 'artisan', 'artisan@example.com', 'x', 'Artisan', true)"
+        )
+    with SessionLocal() as db:
+        db.add_all(Product(name=f"Product {i}", price=10.0 + i % 90, category="pottery", owner_id=1) for i in range(PRODUCTS))
+        db.commit()
+
+
+async def main():
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+    _seed()
+
+    print(f"Database: {engine.dialect.name}, {CLIENTS} concurrent clients\n")
+    print(f"{'':<10}{'sync ops/s':>12}{'async ops/s':>13}{'sync lag p99':>14}{'async lag p99':>15}")
+    for name, sync_operation, async_operation in (
+        ("listing", lambda offset: listing_sync(), lambda offset: listing_async()),
+        ("order", order_sync, order_async),
+    ):
+        sync_rate, sync_lag = await _run(sync_operation)
+        async_rate, async_lag = await _run(async_operation)
+        print(f"{name:<10}{sync_rate:>12.1f}{async_rate:>13.1f}{sync_lag:>12.1f}ms{async_lag:>13.1f}ms")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+Captions for many products: one batched Gemini call vs one call each
+
+Replaces the Gemini model of the shared AIService with a stand-in that
+answers after ROUND_TRIP seconds plus PER_CAPTION seconds for every caption
+it writes. It then captions PRODUCTS products four ways through the API:
+
+    python benchmarks/batch_captions.py [PRODUCTS]
+
+    sequential   POST /ai/generate-caption once per product
+    batched      one POST /ai/generate-captions/batch
+    partial      the same batch, but the reply omits one product and
+                 garbles another, so those two are generated alone
+    cached       the same batch again without fresh=true
+
+Each row prints the wall time and the number of Gemini requests. The run
+fails if a caption is missing, belongs to the wrong product or is the
+template fallback.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'batch_captions.db')}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+import httpx  # noqa: E402
+
+import main as app_main  # noqa: E402
+from app.services.registry import get_ai_service  # noqa: E402
+
+ROUND_TRIP = 0.4
+PER_CAPTION = 0.05
+
+
+class CaptionModel:
+    """Answers caption prompts like Gemini, single or batched, and counts the requests"""
+
+    def __init__(self):
+        self.requests = 0
+        self.broken = False
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.requests += 1
+        batch = next((line.strip() for line in prompt.splitlines() if line.strip().startswith('[{"id"')), None)
+        if batch is None:
+            name = prompt.split("Product:", 1)[1].splitlines()[0].strip()
+            await asyncio.sleep(ROUND_TRIP + PER_CAPTION)
+            return type("Response", (), {"text": f"{name} ✨ DM to order! #handmade #clay"})()
+
+        items = json.loads(batch)
+        await asyncio.sleep(ROUND_TRIP + PER_CAPTION * len(items))
+        entries = [
+            {"id": item["id"], "caption": f"{item['name']} ✨ DM to order! #handmade #clay", "hashtags": ["#handmade", "#clay"]}
+            for item in items
+        ]
+        if self.broken:
+            del entries[7]
+            entries[3]["caption"] = ""
+        return type("Response", (), {"text": json.dumps(entries, ensure_ascii=False)})()
+
+
+def _check(products, captions):
+    return len(captions) == len(products) and all(
+        caption.startswith(product["product_name"] + " ") for product, caption in zip(products, captions)
+    )
+
+
+async def _run(name, model, run):
+    requests_before = model.requests
+    started = time.perf_counter()
+    ok = await run()
+    seconds = time.perf_counter() - started
+    print(f"{'ok' if ok else 'FAIL':<5}{name:<14}{seconds:>9.2f}{model.requests - requests_before:>10}")
+    return ok
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    model = CaptionModel()
+    get_ai_service().model = model
+    products = [
+        {"product_name": f"Clay Vase {i}", "price": 100 + i, "category": "Pottery"}
+        for i in range(count)
+    ]
+
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def sequential():
+            captions = []
+            for product in products:
+                response = await client.post("/ai/generate-caption", json=product, params={"fresh": "true"})
+                captions.append(response.json()["caption"])
+            return _check(products, captions)
+
+        async def batched(fresh="true"):
+            response = await client.post("/ai/generate-captions/batch", json={"products": products}, params={"fresh": fresh})
+            return _check(products, [caption["caption"] for caption in response.json()["captions"]])
+
+        async def cached():
+            return await batched(fresh="false")
+
+        async def partial():
+            model.broken = True
+            try:
+                return await batched()
+            finally:
+                model.broken = False
+
+        print(f"{count} products\n\n{'':<5}{'':<14}{'wall s':>9}{'requests':>10}")
+        results = [
+            await _run("sequential", model, sequential),
+            await _run("batched", model, batched),
+            await _run("partial", model, partial),
+            await _run("cached", model, cached),
+        ]
+
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+Bytes transferred while browsing the product catalog
+
+Simulates the Flutter client opening the product list, scrolling through the
+thumbnails, opening a few products and refreshing the list several times.
+The client behaves like a standard HTTP cache: it reuses a response while
+its max-age is fresh and revalidates with If-None-Match otherwise.
+
+The same session is replayed against plain StaticFiles (before) and
+UploadFiles (after), for a client with and without WebP support:
+
+    python benchmarks/catalog_browse.py
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image, ImageDraw
+from starlette.staticfiles import StaticFiles
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.upload_files import UploadFiles  # noqa: E402
+from app.services.image_pipeline import VARIANT_SUFFIXES, render_variants  # noqa: E402
+
+PRODUCTS = 40
+OPENED_PRODUCTS = 5
+REFRESHES = 5
+HEADER_OVERHEAD = 200  # Rough bytes of request + response headers per round trip
+
+
+def _sample_photo(seed: int) -> bytes:
+    img = Image.new("RGB", (2400, 1800), (seed * 37 % 255, seed * 91 % 255, seed * 53 % 255))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, 2400, 40):
+        draw.line((i, 0, 2400 - i, 1800), fill=((i + seed) % 255, 120, 200 - seed % 100), width=7)
+    output = io.BytesIO()
+    img.save(output, "JPEG", quality=92)
+    return output.getvalue()
+
+
+def _build_catalog(folder: str):
+    """Write the renditions of PRODUCTS sample photos, as the upload pipeline would"""
+    catalog = []
+    for seed in range(PRODUCTS):
+        data = _sample_photo(seed)
+        content_hash = hashlib.sha256(data).hexdigest()
+        urls = {}
+        for name, (contents, fmt) in render_variants(data, "jpg").items():
+            filename = f"{content_hash}{VARIANT_SUFFIXES[name]}.{fmt}"
+            with open(os.path.join(folder, filename), "wb") as f:
+                f.write(contents)
+            urls[name] = f"/uploads/{filename}"
+        catalog.append(urls)
+    return catalog
+
+
+class CachingClient:
+    """Minimal private HTTP cache on top of TestClient"""
+
+    def __init__(self, client: TestClient, accept: str):
+        self.client = client
+        self.accept = accept
+        self.cache = {}
+        self.bytes = 0
+        self.requests = 0
+
+    def get(self, url: str):
+        entry = self.cache.get(url)
+        if entry and entry["expires"] > time.time():
+            return
+
+        headers = {"accept": self.accept}
+        if entry and entry["etag"]:
+            headers["if-none-match"] = entry["etag"]
+        response = self.client.get(url, headers=headers)
+        self.requests += 1
+        self.bytes += HEADER_OVERHEAD + len(response.content)
+
+        max_age = 0
+        for directive in response.headers.get("cache-control", "").split(","):
+            directive = directive.strip()
+            if directive.startswith("max-age="):
+                max_age = int(directive[len("max-age="):])
+        self.cache[url] = {"etag": response.headers.get("etag"), "expires": time.time() + max_age}
+
+
+def _browse(app: FastAPI, catalog, accept: str):
+    client = CachingClient(TestClient(app), accept)
+    for _ in range(REFRESHES + 1):
+        for urls in catalog:
+            client.get(urls["thumbnail"])
+        for urls in catalog[:OPENED_PRODUCTS]:
+            client.get(urls["main"])
+    return client
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        catalog = _build_catalog(folder)
+
+        before = FastAPI()
+        before.mount("/uploads", StaticFiles(directory=folder))
+        after = FastAPI()
+        after.mount("/uploads", UploadFiles(directory=folder))
+
+        print(f"{PRODUCTS} products, {OPENED_PRODUCTS} opened, list refreshed {REFRESHES} times\n")
+        print(f"{'client':<16}{'server':<14}{'requests':>10}{'KiB':>12}")
+        for label, accept in (("jpeg only", "image/jpeg,*/*"), ("webp capable", "image/webp,image/*,*/*")):
+            for server, app in (("StaticFiles", before), ("UploadFiles", after)):
+                session = _browse(app, catalog, accept)
+                print(f"{label:<16}{server:<14}{session.requests:>10}{session.bytes / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Category facet counts: GROUP BY over products vs the counter table
+
+Migrates a scratch SQLite database, inserts PRODUCTS products and
+reconciles `category_counts` against them. It then times both ways of
+answering the facet endpoint:
+
+    python benchmarks/category_counts.py [PRODUCTS]
+
+The run fails if reconciliation had to correct a counter after the seed,
+or if the two methods disagree.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+SCRATCH_DB = os.path.join(tempfile.mkdtemp(), "category_counts.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{SCRATCH_DB}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.models.models import CategoryCount, Product  # noqa: E402
+from app.services.category_facets import KNOWN_CATEGORIES, reconcile_category_counts  # noqa: E402
+
+REPEATS = 20
+
+
+def _seed(count: int):
+    rng = random.Random(42)
+    categories = KNOWN_CATEGORIES + [None]
+    with engine.begin() as connection:
+        for start in range(0, count, 50_000):
+            rows = [
+                (f"Product {i}", 499.0, rng.choice(categories), int(rng.random() > 0.1), 1)
+                for i in range(start, min(start + 50_000, count))
+            ]
+            connection.exec_driver_sql(
+                "INSERT INTO products (name, price, category, is_active, owner_id) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            # Keep the counters the way the product endpoints would
+            connection.exec_driver_sql(
+                "INSERT INTO category_counts (category, product_count) VALUES (?, 1) "
+                "ON CONFLICT (category) DO UPDATE SET product_count = product_count + 1",
+                [(category or "",) for _, _, category, active, _ in rows if active]
+            )
+
+
+def _time(connection, query):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        rows = connection.execute(query).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return dict(rows), timings[len(timings) // 2]
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+
+    print(f"Seeding {products:,} products...")
+    _seed(products)
+    corrected = asyncio.run(reconcile_category_counts())
+
+    group_by = (
+        select(func.coalesce(Product.category, ""), func.count())
+        .where(Product.is_active == True)
+        .group_by(func.coalesce(Product.category, ""))
+    )
+    counters = select(CategoryCount.category, CategoryCount.product_count).where(CategoryCount.product_count > 0)
+    with engine.connect() as connection:
+        expected, group_by_ms = _time(connection, group_by)
+        actual, counters_ms = _time(connection, counters)
+
+    print(f"\n{'method':<16}{'p50 ms':>9}")
+    print(f"{'GROUP BY':<16}{group_by_ms:>9.2f}")
+    print(f"{'counter table':<16}{counters_ms:>9.2f}")
+
+    if corrected or expected != actual:
+        print("\nFAIL: counters did not match the products table")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cold start: lazy service registry vs building every client at import
+
+Each run starts a fresh interpreter, like a new Vercel/Mangum instance,
+and times importing `main` and serving the first request (GET /). The
+"eager" mode then also builds every registered service before that
+request, which is what the routers used to do at import time:
+AIService/GoogleAIAgent run genai.configure and build a GenerativeModel,
+the automation service logged in to Instagram, the Speech client starts,
+and so on.
+
+    python benchmarks/cold_start.py [RUNS]
+
+Without credentials, the clients skip their network logins, so the eager
+numbers are a lower bound on the real saving.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in the child interpreter; prints its timings as JSON on the last line
+CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+if sys.argv[1] == "eager":
+    from app.services.registry import registry
+    for name in registry.status():
+        try:
+            registry.get(name)
+        except Exception:
+            pass
+    # The automation service used to log in to Instagram when it was built
+    from app.services.instagram_service import instagram_service
+    if instagram_service.client:
+        instagram_service.login()
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return (await client.get("/")).status_code
+
+status = asyncio.run(first_request())
+served = time.perf_counter()
+print(json.dumps({"import": imported - started, "first_request": served - started, "status": status}))
+"""
+
+
+def _run(mode: str, database_url: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": database_url, "PYTHONWARNINGS": "ignore"}
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, mode],
+        cwd=BACKEND_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'cold_start.db')}"
+
+    # One warm-up run so the bytecode cache is populated for both modes
+    _run("lazy", database_url)
+    results = {}
+    for mode in ("lazy", "eager"):
+        timings = [_run(mode, database_url) for _ in range(runs)]
+        assert all(timing["status"] == 200 for timing in timings)
+        results[mode] = {
+            key: statistics.median(timing[key] for timing in timings) * 1000 for key in ("import", "first_request")
+        }
+
+    print(f"{runs} runs per mode, median ms\n")
+    print(f"{'mode':<8}{'import main':>14}{'first request':>16}")
+    for mode, timings in results.items():
+        print(f"{mode:<8}{timings['import']:>14.0f}{timings['first_request']:>16.0f}")
+    saved = results["eager"]["first_request"] - results["lazy"]["first_request"]
+    print(f"\nLazy registry saves {saved:.0f} ms before the first response")
+
+
+if __name__ == "__main__":
+    main()
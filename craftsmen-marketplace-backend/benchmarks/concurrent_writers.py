@@ -0,0 +1,175 @@
+"""
+Concurrent writer stress test
+
+Several processes, each running many asyncio writers, create and confirm
+orders through the order endpoints for a fixed time while readers page
+through the order list. This is the load a few uvicorn workers put on a
+single SQLite file. The run fails if any request hits "database is locked"
+or another database error:
+
+    python benchmarks/concurrent_writers.py [DATABASE_URL]
+
+Without an argument a scratch SQLite database is used. Engine tuning comes
+from the usual settings, so the old behaviour (rollback journal, Python's
+default 5 second lock wait) can be reproduced for comparison:
+
+    SQLITE_JOURNAL_MODE=DELETE SQLITE_SYNCHRONOUS=FULL SQLITE_BUSY_TIMEOUT=5000 \\
+        python benchmarks/concurrent_writers.py
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+PROCESSES = int(os.environ.get("STRESS_PROCESSES", 4))
+WRITERS_PER_PROCESS = int(os.environ.get("STRESS_WRITERS", 8))
+READERS_PER_PROCESS = int(os.environ.get("STRESS_READERS", 2))
+DURATION = float(os.environ.get("STRESS_SECONDS", 10))
+PRODUCTS = 50
+
+
+def _setup_path():
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+
+async def _writer(stop_at: float, stats: dict, worker: int):
+    from fastapi import HTTPException
+    from sqlalchemy.exc import OperationalError
+
+    from app.api.orders import confirm_order, create_order
+    from app.core.database import AsyncSessionLocal
+    from app.schemas.schemas import OrderCreate
+
+    n = 0
+    while time.perf_counter() < stop_at:
+        order_data = OrderCreate(
+            customer_name=f"Writer {worker}",
+            customer_phone="0000000000",
+            items=[{"product_id": (worker + n + i) % PRODUCTS + 1, "quantity": 1, "price": 10.0} for i in range(3)]
+        )
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                order = await create_order(order_data, db)
+            async with AsyncSessionLocal() as db:
+                await confirm_order(order.id, db)
+            stats["latencies"].append(time.perf_counter() - started)
+            stats["writes"] += 2
+        except OperationalError as e:
+            key = "locked" if "locked" in str(e) else "errors"
+            stats[key] += 1
+        except HTTPException:
+            stats["errors"] += 1
+        n += 1
+
+
+async def _reader(stop_at: float, stats: dict):
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import selectinload
+
+    from app.core.database import AsyncSessionLocal
+    from app.models.models import Order
+
+    while time.perf_counter() < stop_at:
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    select(Order)
+                    .options(selectinload(Order.order_items))
+                    .order_by(Order.created_at.desc(), Order.id.desc())
+                    .limit(20)
+                )
+            stats["reads"] += 1
+        except OperationalError as e:
+            stats["locked" if "locked" in str(e) else "errors"] += 1
+
+
+def _run_process(worker_offset: int, results):
+    _setup_path()
+
+    async def run():
+        from app.core.database import async_engine
+
+        stats = {"writes": 0, "reads": 0, "locked": 0, "errors": 0, "latencies": []}
+        stop_at = time.perf_counter() + DURATION
+        await asyncio.gather(
+            *(_writer(stop_at, stats, worker_offset + i) for i in range(WRITERS_PER_PROCESS)),
+            *(_reader(stop_at, stats) for _ in range(READERS_PER_PROCESS))
+        )
+        await async_engine.dispose()
+        return stats
+
+    results.put(asyncio.run(run()))
+
+
+def _seed():
+    from alembic import command
+    from alembic.config import Config
+
+    from app.core.database import SessionLocal, engine
+    from app.models.models import Product
+
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+    with SessionLocal() as db:
+        db.add_all(Product(name=f"Product {i}", price=10.0, owner_id=1) for i in range(PRODUCTS))
+        db.commit()
+    engine.dispose()
+
+
+def main():
+    if len(sys.argv) > 1:
+        os.environ["DATABASE_URL"] = sys.argv[1]
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'concurrent_writers.db')}"
+    _setup_path()
+    _seed()
+
+    from app.core.config import settings
+
+    print(
+        f"{PROCESSES} processes x {WRITERS_PER_PROCESS} writers + {READERS_PER_PROCESS} readers "
+        f"for {DURATION:.0f}s on {settings.database_url.split(':', 1)[0]} "
+        f"(journal_mode={settings.sqlite_journal_mode}, busy_timeout={settings.sqlite_busy_timeout}ms)"
+    )
+
+    # Spawned processes re-read the environment, so they share the database URL
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=_run_process, args=(i * WRITERS_PER_PROCESS, results))
+        for i in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    writes = sum(s["writes"] for s in stats)
+    reads = sum(s["reads"] for s in stats)
+    locked = sum(s["locked"] for s in stats)
+    errors = sum(s["errors"] for s in stats)
+    latencies = sorted(l for s in stats for l in s["latencies"])
+
+    print(f"writes:  {writes} ({writes / DURATION:.0f}/s)")
+    print(f"reads:   {reads} ({reads / DURATION:.0f}/s)")
+    if latencies:
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"create+confirm latency: p50 {p50:.0f} ms, p99 {p99:.0f} ms")
+    print(f"locked:  {locked}")
+    print(f"errors:  {errors}")
+
+    if locked or errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
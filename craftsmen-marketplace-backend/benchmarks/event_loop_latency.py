@@ -0,0 +1,129 @@
+"""
+CRUD latency while caption generation is saturated
+
+Migrates a scratch SQLite database with PRODUCTS products. It then measures
+GET /api/products/ latency from one client while CAPTION_CLIENTS clients
+keep POST /ai/generate-caption busy. The Gemini model is a stand-in that
+takes GEMINI_SECONDS per call, in one of two ways:
+
+    blocking  sleeps on the calling thread, like the synchronous
+              model.generate_content the services used to call
+    async     awaits, like generate_content_async behind gemini_client
+
+    python benchmarks/event_loop_latency.py [SECONDS]
+
+The run fails if saturating captions raises the listing's p99 above
+P99_LIMIT_MS on the async path.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'event_loop_latency.db')}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+import httpx  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+import main as app_main  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.services.registry import get_ai_service  # noqa: E402
+
+PRODUCTS = 200
+CAPTION_CLIENTS = 16
+GEMINI_SECONDS = 0.5
+P99_LIMIT_MS = 100.0
+
+
+class StandInModel:
+    def __init__(self, blocking: bool):
+        self.blocking = blocking
+
+    async def generate_content_async(self, prompt, **kwargs):
+        if self.blocking:
+            time.sleep(GEMINI_SECONDS)
+        else:
+            await asyncio.sleep(GEMINI_SECONDS)
+        return type("Response", (), {"text": "Lovely vase ✨ DM to order #clay #handmade"})()
+
+
+def _seed():
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, username, email, hashed_password, full_name, is_active) "
+            "VALUES (1, 'artisan', 'artisan@example.com', 'x', 'Artisan', 1)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO products (id, name, price, is_active, owner_id) VALUES (?, ?, ?, 1, 1)",
+            [(i, f"Product {i}", 10.0 + i % 90) for i in range(1, PRODUCTS + 1)]
+        )
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000
+
+
+async def _measure(client, seconds, blocking=None):
+    """Listing latencies for `seconds`, with caption load unless `blocking` is None"""
+    stop = time.perf_counter() + seconds
+    captions = 0
+
+    async def caption_client(worker):
+        nonlocal captions
+        while time.perf_counter() < stop:
+            await client.post(
+                "/ai/generate-caption",
+                json={"product_name": f"Vase {worker}-{captions}", "price": 25},
+                params={"fresh": "true"}
+            )
+            captions += 1
+
+    if blocking is not None:
+        get_ai_service().model = StandInModel(blocking)
+        load = [asyncio.ensure_future(caption_client(worker)) for worker in range(CAPTION_CLIENTS)]
+        await asyncio.sleep(0.1)
+    else:
+        load = []
+
+    latencies = []
+    while time.perf_counter() < stop:
+        started = time.perf_counter()
+        response = await client.get("/api/products/", params={"limit": 20})
+        assert response.status_code == 200
+        latencies.append(time.perf_counter() - started)
+    await asyncio.gather(*load)
+    return latencies, captions
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+    _seed()
+
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        rows = [
+            ("idle", *await _measure(client, seconds)),
+            ("blocking Gemini", *await _measure(client, seconds, blocking=True)),
+            ("async Gemini", *await _measure(client, seconds, blocking=False)),
+        ]
+
+    print(f"GET /api/products/ with {CAPTION_CLIENTS} caption clients, {GEMINI_SECONDS * 1000:.0f} ms per Gemini call\n")
+    print(f"{'':<18}{'requests':>9}{'p50 ms':>9}{'p99 ms':>9}{'captions':>10}")
+    for name, latencies, captions in rows:
+        print(f"{name:<18}{len(latencies):>9}{_percentile(latencies, 0.5):>9.1f}{_percentile(latencies, 0.99):>9.1f}{captions:>10}")
+
+    if _percentile(rows[2][1], 0.99) > P99_LIMIT_MS:
+        print(f"\nFAIL: listing p99 above {P99_LIMIT_MS:.0f} ms while captions are generated")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+"""
+Gemini scheduler check: priorities, rate limits and backpressure
+
+Replaces the Gemini model of the shared AIService with a stand-in that
+answers after LATENCY seconds and records when each call started. It then
+runs each scenario against a fresh scheduler with its own limits:
+
+    python benchmarks/gemini_scheduler.py
+
+    priority      5 captions arrive behind a flood of 40 comment replies;
+                  they should skip the queue
+    no priority   the same captions queued as background calls, for
+                  comparison
+    rpm           40 calls at once under 600 requests/minute (1 s burst)
+    tpm           20 calls at once under 120k tokens/minute, with and
+                  without usage metadata in the replies
+    backpressure  20 replies against 1 slot and 5 queue places, then a
+                  caption request through the API when its queue is full
+
+The run fails if a scenario does not behave as described.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'gemini_scheduler.db')}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+import httpx  # noqa: E402
+
+import main as app_main  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.services import gemini_client  # noqa: E402
+from app.services.gemini_client import BACKGROUND, GeminiBusyError, generate_content, scheduler_stats  # noqa: E402
+from app.services.registry import get_ai_service  # noqa: E402
+
+LATENCY = 0.1
+
+
+class TimedModel:
+    """Answers like Gemini after LATENCY seconds and records call start times"""
+
+    def __init__(self):
+        self.starts = []
+        self.usage = None
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.starts.append(time.monotonic())
+        await asyncio.sleep(LATENCY)
+        usage = type("Usage", (), {"total_token_count": self.usage})() if self.usage else None
+        return type("Response", (), {"text": "CAPTION: Lovely ✨ DM to order #clay", "usage_metadata": usage})()
+
+
+def _configure(model, concurrency=8, rpm=0, tpm=0, max_queue=50, burst_seconds=10.0):
+    """Start the next scenario with a new scheduler and an empty call log"""
+    settings.gemini_max_concurrency = concurrency
+    settings.gemini_rpm = rpm
+    settings.gemini_tpm = tpm
+    settings.gemini_max_queue = max_queue
+    gemini_client.BURST_SECONDS = burst_seconds
+    gemini_client._scheduler = None
+    model.starts.clear()
+    model.usage = None
+
+
+def _report(ok, name, detail):
+    print(f"{'ok' if ok else 'FAIL':<5}{name:<15}{detail}")
+    return ok
+
+
+async def _timed(call):
+    started = time.monotonic()
+    await call
+    return time.monotonic() - started
+
+
+async def _captions_during_flood(model, service, as_background):
+    _configure(model, concurrency=2)
+    flood = [
+        asyncio.ensure_future(service.generate_comment_response(f"Question {i}?", "pottery shop"))
+        for i in range(40)
+    ]
+    await asyncio.sleep(0.05)
+    if as_background:
+        captions = [generate_content(model, f"Caption for vase {i}", priority=BACKGROUND) for i in range(5)]
+    else:
+        captions = [service.generate_product_caption(f"Vase {i}", fresh=True) for i in range(5)]
+    latencies = sorted(await asyncio.gather(*(_timed(caption) for caption in captions)))
+    await asyncio.gather(*flood)
+    return latencies, scheduler_stats()
+
+
+async def _rpm(model):
+    _configure(model, rpm=600, burst_seconds=1.0)
+    await asyncio.gather(*(generate_content(model, f"Prompt {i}") for i in range(40)))
+    first = model.starts[0]
+    busiest = max(sum(1 for start in model.starts if at <= start < at + 1.0) for at in model.starts)
+    elapsed = model.starts[-1] - first
+    # 10 from the full bucket, then 10 per second: the last 30 take about 3 s
+    ok = busiest <= 20 and 2.7 <= elapsed <= 3.5
+    return _report(ok, "rpm", f"40 calls started over {elapsed:.2f} s, at most {busiest} in any second")
+
+
+async def _tpm(model, usage):
+    _configure(model, tpm=120_000, burst_seconds=1.0)
+    model.usage = usage
+    prompt = "x" * 400  # 100 prompt tokens + 512 assumed output tokens
+    await asyncio.gather(*(generate_content(model, prompt) for _ in range(20)))
+    return model.starts[-1] - model.starts[0]
+
+
+async def _backpressure(model, service, client):
+    _configure(model, concurrency=1, max_queue=5)
+    results = await asyncio.gather(
+        *(service.generate_comment_response(f"Do you ship to {i}?", "pottery shop") for i in range(20)),
+        return_exceptions=True
+    )
+    rejected = sum(isinstance(result, GeminiBusyError) for result in results)
+    ok = rejected == 14
+    _report(ok, "backpressure", f"{rejected} of 20 replies rejected (1 running, 5 queued)")
+
+    waiting = [asyncio.ensure_future(service.generate_product_caption(f"Bowl {i}", fresh=True)) for i in range(6)]
+    await asyncio.sleep(0.01)
+    response = await client.post("/ai/generate-caption", json={"product_name": "Jug"}, params={"fresh": "true"})
+    await asyncio.gather(*waiting)
+    api_ok = response.status_code == 503 and "retry-after" in response.headers
+    _report(api_ok, "", f"API with a full queue: {response.status_code}, Retry-After {response.headers.get('retry-after')}")
+    return ok and api_ok
+
+
+async def main():
+    model = TimedModel()
+    service = get_ai_service()
+    service.model = model
+    results = []
+
+    prioritized, stats = await _captions_during_flood(model, service, as_background=False)
+    fifo, _ = await _captions_during_flood(model, service, as_background=True)
+    # With priority the 5 captions wait for a running reply, then take 3 rounds of the 2 slots;
+    # without it they wait behind the 40 replies (about 2 s)
+    results.append(_report(
+        prioritized[-1] < 5 * LATENCY, "priority",
+        f"caption latency p50 {prioritized[2] * 1000:.0f} ms, max {prioritized[-1] * 1000:.0f} ms"
+    ))
+    print(f"{'':<20}queue wait p95: interactive {stats['interactive']['wait_p95_ms']} ms, "
+          f"background {stats['background']['wait_p95_ms']} ms")
+    results.append(_report(
+        fifo[-1] > 10 * LATENCY, "no priority",
+        f"caption latency p50 {fifo[2] * 1000:.0f} ms, max {fifo[-1] * 1000:.0f} ms"
+    ))
+
+    results.append(await _rpm(model))
+
+    estimated, corrected = await _tpm(model, usage=None), await _tpm(model, usage=150)
+    # 20 x 612 tokens, 2000 in the bucket, 2000 per second: about 5.1 s; usage corrections shorten it
+    results.append(_report(
+        4.6 <= estimated <= 5.6 and corrected < estimated, "tpm",
+        f"estimates only {estimated:.2f} s, corrected from usage {corrected:.2f} s"
+    ))
+
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        results.append(await _backpressure(model, service, client))
+
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Image pipeline on 12MP phone photos: one in-memory decode vs the old handler
+
+Builds IMAGES synthetic 4032x3024 phone photos (smoothed noise over a
+gradient, so they compress about like camera output at quality 92). Half are stored the way
+phones store portrait shots: landscape pixels with EXIF orientation 6. Each
+photo is then processed three ways:
+
+    old handler   write the upload, reopen it, full decode, LANCZOS
+                  thumbnail to 1200px and rewrite the file (one rendition)
+    full decode   render_variants with JPEG draft mode disabled
+    pipeline      render_variants as used by the upload endpoints
+
+    python benchmarks/image_pipeline.py [IMAGES]
+
+The run fails if draft mode does not shrink the decode, or if a rendition
+has the wrong size or orientation.
+"""
+
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'image_pipeline.db')}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from PIL import Image, JpegImagePlugin  # noqa: E402
+
+from app.services.image_pipeline import (  # noqa: E402
+    FACEBOOK_DIMENSION,
+    INSTAGRAM_MIN_ASPECT,
+    INSTAGRAM_WIDTH,
+    MAX_DIMENSION,
+    render_variants
+)
+
+WIDTH, HEIGHT = 4032, 3024
+EXIF_ORIENTATION = 0x0112
+
+
+def _phone_photo(seed: int, rotated: bool) -> bytes:
+    gradient = Image.linear_gradient("L").resize((WIDTH, HEIGHT))
+    # Coarse noise scaled up: texture without the incompressible grain of per-pixel noise
+    noise = Image.effect_noise((WIDTH // 4, HEIGHT // 4), 40 + seed % 20)
+    noise = noise.resize((WIDTH, HEIGHT), Image.Resampling.BICUBIC)
+    photo = Image.merge("RGB", (gradient, noise, Image.blend(gradient, noise, 0.5)))
+    exif = Image.Exif()
+    if rotated:
+        exif[EXIF_ORIENTATION] = 6
+    output = io.BytesIO()
+    photo.save(output, "JPEG", quality=92, exif=exif.tobytes())
+    return output.getvalue()
+
+
+def old_handler(data: bytes, directory: str) -> None:
+    """What upload_product_image did before the pipeline"""
+    file_path = os.path.join(directory, "upload.jpg")
+    with open(file_path, "wb") as f:
+        f.write(data)
+    with Image.open(file_path) as img:
+        if img.width > 1200 or img.height > 1200:
+            img.thumbnail((1200, 1200), Image.Resampling.LANCZOS)
+            img.save(file_path, optimize=True, quality=85)
+
+
+def _decoded_size(data: bytes) -> tuple:
+    with Image.open(io.BytesIO(data)) as img:
+        scale = FACEBOOK_DIMENSION / max(img.size)
+        img.draft("RGB", (round(img.width * scale), round(img.height * scale)))
+        img.load()
+        return img.size
+
+
+def _check(renditions, rotated: bool) -> bool:
+    sizes = {name: Image.open(io.BytesIO(contents)).size for name, (contents, _) in renditions.items()}
+    portrait = sizes["facebook"][1] > sizes["facebook"][0]
+    return (
+        portrait == rotated
+        and max(sizes["facebook"]) == FACEBOOK_DIMENSION
+        and max(sizes["main"]) == MAX_DIMENSION
+        and sizes["instagram"][0] == INSTAGRAM_WIDTH
+        and sizes["instagram"][0] / sizes["instagram"][1] >= INSTAGRAM_MIN_ASPECT - 0.01
+    )
+
+
+def _timed(function, *args) -> float:
+    started = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    photos = [(_phone_photo(i, rotated=i % 2 == 1), i % 2 == 1) for i in range(count)]
+    directory = tempfile.mkdtemp()
+    megabytes = statistics.mean(len(data) for data, _ in photos) / (1024 * 1024)
+
+    old = [_timed(old_handler, data, directory) for data, _ in photos]
+    with mock.patch.object(JpegImagePlugin.JpegImageFile, "draft", lambda self, mode, size: None):
+        full = [_timed(render_variants, data, "jpg") for data, _ in photos]
+    pipeline = [_timed(render_variants, data, "jpg") for data, _ in photos]
+
+    print(f"{count} photos, {WIDTH}x{HEIGHT}, {megabytes:.1f} MB on average\n")
+    print(f"{'':<14}{'renditions':>11}{'median ms':>11}{'max ms':>9}")
+    for name, renditions, timings in (("old handler", 1, old), ("full decode", 6, full), ("pipeline", 6, pipeline)):
+        print(f"{name:<14}{renditions:>11}{statistics.median(timings):>11.0f}{max(timings):>9.0f}")
+
+    decoded = _decoded_size(photos[0][0])
+    ok = decoded == (WIDTH // 2, HEIGHT // 2)
+    print(f"\n{'ok' if ok else 'FAIL':<5}draft decode of {WIDTH}x{HEIGHT}: {decoded[0]}x{decoded[1]}")
+    for data, rotated in photos[:2]:
+        valid = _check(render_variants(data, "jpg"), rotated)
+        print(f"{'ok' if valid else 'FAIL':<5}renditions of a {'portrait (EXIF 6)' if rotated else 'landscape'} photo")
+        ok = ok and valid
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
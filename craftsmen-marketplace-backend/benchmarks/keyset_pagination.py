@@ -0,0 +1,105 @@
+"""
+OFFSET vs keyset page fetches on a large catalog
+
+Migrates a scratch SQLite database, inserts PRODUCTS active products and
+times fetching one 100-row page at increasing depths, first with
+OFFSET/LIMIT (the `skip` parameter) and then with the cursor condition the
+product listing uses:
+
+    python benchmarks/keyset_pagination.py [PRODUCTS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+SCRATCH_DB = os.path.join(tempfile.mkdtemp(), "keyset_pagination.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{SCRATCH_DB}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+
+from app.core.pagination import apply_keyset, encode_cursor  # noqa: E402
+from app.models.models import Product  # noqa: E402
+
+PAGE_SIZE = 100
+REPEATS = 5
+
+
+def _listing():
+    return (
+        select(Product)
+        .where(Product.is_active == True)  # noqa: E712
+        .order_by(Product.created_at.desc(), Product.id.desc())
+    )
+
+
+def _seed(connection, count: int):
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(count):
+        # Several products per second, as when a catalog is imported in bulk
+        created_at = (start + timedelta(seconds=i // 4)).strftime("%Y-%m-%d %H:%M:%S")
+        batch.append((f"Product {i}", 10.0, "pottery", 1, 1, created_at))
+        if len(batch) == 50_000:
+            connection.exec_driver_sql(
+                "INSERT INTO products (name, price, category, is_active, owner_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", batch
+            )
+            batch = []
+    if batch:
+        connection.exec_driver_sql(
+            "INSERT INTO products (name, price, category, is_active, owner_id, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", batch
+        )
+    connection.commit()
+
+
+def _time(connection, query) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        connection.execute(query).fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+    engine = create_engine(os.environ["DATABASE_URL"])
+
+    with engine.connect() as connection:
+        print(f"Seeding {products:,} products...")
+        _seed(connection, products)
+        connection.exec_driver_sql("ANALYZE")
+
+        print(f"\n{'depth':>10}{'offset ms':>12}{'keyset ms':>12}")
+        depths = sorted({d for d in (0, 10_000, 100_000, products // 2, products - PAGE_SIZE) if 0 <= d < products})
+        for depth in depths:
+            # The cursor a client would hold after scrolling to this depth
+            boundary = connection.execute(
+                _listing().with_only_columns(Product.created_at, Product.id).offset(max(depth - 1, 0)).limit(1)
+            ).first()
+            cursor = encode_cursor(boundary.created_at, boundary.id)
+
+            offset_query = _listing().offset(depth).limit(PAGE_SIZE)
+            keyset_query = _listing().limit(PAGE_SIZE)
+            if depth:
+                keyset_query = apply_keyset(keyset_query, Product.created_at, Product.id, cursor, "sqlite")
+
+            offset_ids = [row.id for row in connection.execute(offset_query)]
+            keyset_ids = [row.id for row in connection.execute(keyset_query)]
+            assert offset_ids == keyset_ids, f"keyset page differs from offset page at depth {depth}"
+
+            print(f"{depth:>10,}{_time(connection, offset_query):>12.2f}{_time(connection, keyset_query):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Order creation throughput for small and large orders
+
+Migrates a database and times creating orders of 1, 10 and 50 items. It
+compares the per-item path orders used to take against the current
+`create_order` endpoint, which reads all products with one IN query and
+writes the order and its items in a single transaction. With no argument a
+scratch SQLite database is used. To measure on Postgres, pass a URL for an
+empty database that can be migrated:
+
+    python benchmarks/order_throughput.py [DATABASE_URL]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+if len(sys.argv) > 1:
+    os.environ["DATABASE_URL"] = sys.argv[1]
+else:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'order_throughput.db')}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from app.api.orders import create_order  # noqa: E402
+from app.core.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.models.models import Order, OrderItem, Product  # noqa: E402
+from app.schemas.schemas import OrderCreate, OrderResponse  # noqa: E402
+
+ITEM_COUNTS = (1, 10, 50)
+PRODUCTS = 200
+SECONDS_PER_RUN = 3.0
+
+
+async def create_order_per_item(order_data: OrderCreate, db) -> OrderResponse:
+    """The previous implementation: one lookup per item, two commits and a reload"""
+    total_amount = 0
+    order_items_data = []
+    for item in order_data.items:
+        product = await db.get(Product, item.product_id)
+        item_price = item.price if item.price else product.price
+        total_amount += item_price * item.quantity
+        order_items_data.append({"product_id": item.product_id, "quantity": item.quantity, "price": item_price})
+
+    db_order = Order(
+        customer_name=order_data.customer_name,
+        customer_phone=order_data.customer_phone,
+        total_amount=total_amount
+    )
+    db.add(db_order)
+    await db.commit()
+    await db.refresh(db_order)
+
+    for item_data in order_items_data:
+        db.add(OrderItem(order_id=db_order.id, **item_data))
+    await db.commit()
+
+    result = await db.execute(
+        select(Order)
+        .options(selectinload(Order.order_items).joinedload(OrderItem.product))
+        .where(Order.id == db_order.id)
+        .execution_options(populate_existing=True)
+    )
+    return OrderResponse.from_orm(result.scalar_one())
+
+
+def _order(item_count: int, offset: int) -> OrderCreate:
+    return OrderCreate(
+        customer_name="Benchmark",
+        customer_phone="0000000000",
+        items=[
+            {"product_id": (offset + i) % PRODUCTS + 1, "quantity": 1 + i % 3, "price": 10.0}
+            for i in range(item_count)
+        ]
+    )
+
+
+async def _seed():
+    async with AsyncSessionLocal() as db:
+        db.add_all(
+            Product(name=f"Product {i}", price=10.0, category="pottery", owner_id=1)
+            for i in range(PRODUCTS)
+        )
+        await db.commit()
+
+
+async def _run(create, item_count: int) -> float:
+    """Create orders back to back for SECONDS_PER_RUN; returns orders per second"""
+    created = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < SECONDS_PER_RUN:
+        async with AsyncSessionLocal() as db:
+            response = await create(_order(item_count, created), db)
+        assert len(response.order_items) == item_count
+        created += 1
+    return created / (time.perf_counter() - started)
+
+
+async def main():
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+    await _seed()
+
+    print(f"Database: {async_engine.dialect.name}")
+    print(f"\n{'items':>6}{'per-item/s':>13}{'batched/s':>12}{'speedup':>10}")
+    for item_count in ITEM_COUNTS:
+        before = await _run(create_order_per_item, item_count)
+        after = await _run(create_order, item_count)
+        print(f"{item_count:>6}{before:>13.1f}{after:>12.1f}{after / before:>9.1f}x")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
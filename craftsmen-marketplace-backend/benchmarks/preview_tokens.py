@@ -0,0 +1,105 @@
+"""
+Check that a preview token is used up exactly once
+
+Migrates a scratch SQLite database, saves a preview and posts it through
+POST /api/products/create-and-post-native:
+
+    unreadable image   rejected before a product is created
+    failed product     the image is stored, then creating the product fails
+    valid post         creates the product
+    repeat post        the token is gone
+
+The token must survive the two failures, be accepted once and then be
+refused; anything else exits non-zero:
+
+    python benchmarks/preview_tokens.py
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(SCRATCH_DIR, 'preview_tokens.db')}",
+    UPLOAD_FOLDER=os.path.join(SCRATCH_DIR, "uploads"),
+    JOB_WORKER_COUNT="0",
+)
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+NAME, PRICE = "Blue Vase", 499.0
+UNREADABLE_PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+
+# (step, unreadable image, product creation fails, expected status, products afterwards)
+STEPS = [
+    ("unreadable image", True, False, 400, 0),
+    ("failed product", False, True, 500, 0),
+    ("valid post", False, False, 202, 1),
+    ("repeat post", False, False, 404, 1),
+]
+
+
+def _png() -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (64, 64), "blue").save(output, "PNG")
+    return output.getvalue()
+
+
+async def _save_preview() -> str:
+    from app.core.database import AsyncSessionLocal
+    from app.services.content_previews import save_preview
+
+    async with AsyncSessionLocal() as db:
+        preview = await save_preview(db, {"base_caption": "A blue vase"}, NAME, PRICE)
+        return preview.token
+
+
+async def _failing_acquire_image(db, image_url):
+    raise RuntimeError("simulated failure after the image was stored")
+
+
+def main() -> int:
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+    engine = create_engine(os.environ["DATABASE_URL"])
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, username, email, hashed_password, full_name, is_active) "
+            "VALUES (1, 'artisan', 'artisan@example.com', 'x', 'Artisan', 1)"
+        )
+
+    import main as app_main
+    from app.api import native_products
+
+    token = asyncio.run(_save_preview())
+    form = {"product_name": NAME, "price": str(PRICE), "owner_id": "1", "preview_token": token}
+    png = _png()
+
+    failures = 0
+    with TestClient(app_main.app, raise_server_exceptions=False) as client:
+        for step, unreadable, product_fails, expected_status, expected_products in STEPS:
+            acquire = _failing_acquire_image if product_fails else native_products.acquire_image
+            files = {"file": ("vase.png", io.BytesIO(UNREADABLE_PNG if unreadable else png), "image/png")}
+            with mock.patch.object(native_products, "acquire_image", acquire):
+                status = client.post("/api/products/create-and-post-native", data=form, files=files).status_code
+            with engine.connect() as connection:
+                products = connection.exec_driver_sql("SELECT count(*) FROM products").scalar()
+            ok = status == expected_status and products == expected_products
+            failures += not ok
+            print(f"{'ok' if ok else 'FAIL':<5}{step:<18}{status:>5}   {products} product(s)")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
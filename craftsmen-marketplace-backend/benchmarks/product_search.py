@@ -0,0 +1,122 @@
+"""
+Full-text product search latency on a large catalog
+
+Migrates a scratch SQLite database and inserts PRODUCTS products through
+the normal table, so the FTS5 triggers build the index as they would in
+production. It then times the queries the search endpoint issues (one
+page of 20) for common, rare, prefix and multi-word searches, and a deep
+page of a broad one:
+
+    python benchmarks/product_search.py [PRODUCTS]
+
+The run fails if a query's median exceeds 10 ms, or if the page at
+DEEP_SKIP is short or differs from the same rows cut from one long page.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+SCRATCH_DB = os.path.join(tempfile.mkdtemp(), "product_search.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{SCRATCH_DB}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.services.product_search import build_search_query, search_terms  # noqa: E402
+
+PAGE_SIZE = 20
+REPEATS = 20
+BUDGET_MS = 10.0
+DEEP_SKIP = 260
+
+CATEGORIES = ["pottery", "woodwork", "textiles", "jewelry", "metalwork", "painting", "leather", "glass"]
+COLORS = ["blue", "red", "green", "ochre", "indigo", "ivory", "black", "saffron", "teal", "maroon"]
+MATERIALS = ["clay", "teak", "cotton", "silver", "brass", "silk", "bamboo", "jute", "copper", "terracotta"]
+OBJECTS = ["vase", "bowl", "scarf", "bangle", "lamp", "plate", "basket", "mat", "mirror", "box", "bag", "diya"]
+STYLES = ["handmade", "handwoven", "carved", "painted", "embroidered", "glazed", "block-printed", "engraved"]
+
+QUERIES = [
+    ("blue", None, 0),                 # common word, ~10% of the catalog
+    ("blue", None, DEEP_SKIP),         # a deep page of it
+    ("blue", "pottery", 0),            # with a category filter
+    ("blue", "&&", 0),                 # category with no words, nothing matches
+    ("terracotta diya", None, 0),      # two common words
+    ("pot", None, 0),                  # short prefix
+    ("handw", None, 0),                # prefix of a common word
+    ("handwov", None, 0),              # prefix longer than the prefix indexes
+    ("indigo silk scarf", None, 0),    # three words
+    ("kalamkari", None, 0),            # rare word
+    ("zzzz", None, 0),                 # no match
+]
+
+
+def _product(rng: random.Random, i: int):
+    color, material, obj = rng.choice(COLORS), rng.choice(MATERIALS), rng.choice(OBJECTS)
+    name = f"{color.title()} {material} {obj}"
+    description = f"{rng.choice(STYLES)} {obj} made from {material} by artisan {i % 5000}"
+    if i % 2000 == 0:
+        description += " in the kalamkari tradition"
+    caption = f"{rng.choice(STYLES).title()} {name} - perfect gift #handmade #{material}" if i % 3 == 0 else None
+    return (name, description, 499.0, rng.choice(CATEGORIES), caption, 1, 1)
+
+
+def _seed(count: int):
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        for start in range(0, count, 50_000):
+            connection.exec_driver_sql(
+                "INSERT INTO products (name, description, price, category, ai_generated_caption, is_active, owner_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [_product(rng, i) for i in range(start, min(start + 50_000, count))]
+            )
+        for fts in ("products_fts", "products_fts_name"):
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+
+    print(f"Seeding {products:,} products...")
+    started = time.perf_counter()
+    _seed(products)
+    print(f"Seeded and indexed in {time.perf_counter() - started:.1f}s")
+
+    failed = False
+    print(f"\n{'query':<30}{'rows':>8}{'p50 ms':>9}{'p95 ms':>9}")
+    with engine.connect() as connection:
+        for q, category, skip in QUERIES:
+            page = build_search_query(search_terms(q), "sqlite", category, skip, PAGE_SIZE)
+            timings = []
+            for _ in range(REPEATS):
+                started = time.perf_counter()
+                rows = connection.execute(page).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p50, p95 = timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+            failed |= p50 > BUDGET_MS
+            label = (f"{q} [{category}]" if category else q) + (f", skip={skip}" if skip else "")
+            print(f"{label:<30}{len(rows):>8,}{p50:>9.2f}{p95:>9.2f}")
+
+        long_page = build_search_query(search_terms("blue"), "sqlite", None, 0, DEEP_SKIP + PAGE_SIZE)
+        deep = build_search_query(search_terms("blue"), "sqlite", None, DEEP_SKIP, PAGE_SIZE)
+        expected = [row.id for row in connection.execute(long_page).all()][DEEP_SKIP:]
+        deep_ids = [row.id for row in connection.execute(deep).all()]
+        print(f"\nblue, skip={DEEP_SKIP}: {len(deep_ids)} results, {'same as' if deep_ids == expected else 'DIFFERENT from'} one long page")
+        if len(deep_ids) != PAGE_SIZE or deep_ids != expected:
+            failed = True
+
+    if failed:
+        print("\nFAIL: a query was over budget or a deep page was wrong")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Check every budgeted endpoint against its SQL query budget
+
+Migrates a scratch SQLite database, seeds users, products and orders with
+several items each, then calls each endpoint decorated with @query_budget
+through the app. The X-Query-Count header (debug mode) is compared with the
+endpoint's budget; any overrun, or a budgeted route that was not exercised,
+exits non-zero:
+
+    python benchmarks/query_budgets.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(SCRATCH_DIR, 'query_budgets.db')}",
+    UPLOAD_FOLDER=os.path.join(SCRATCH_DIR, "uploads"),
+    DEBUG="true",
+    JOB_WORKER_COUNT="0",
+)
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+ORDERS = 100
+ITEMS_PER_ORDER = 5
+PRODUCTS = 50
+
+
+def _seed():
+    engine = create_engine(os.environ["DATABASE_URL"])
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, username, email, hashed_password, full_name, is_active) "
+            "VALUES (1, 'artisan', 'artisan@example.com', 'x', 'Artisan', 1)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO products (id, name, price, category, is_active, owner_id) VALUES (?, ?, ?, ?, 1, 1)",
+            [(i, f"Product {i}", 10.0 + i, "pottery") for i in range(1, PRODUCTS + 1)]
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO orders (id, total_amount, status, customer_name, customer_phone, customer_id) "
+            "VALUES (?, 0, 'pending', 'Customer', '555', 1)",
+            [(i,) for i in range(1, ORDERS + 1)]
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, 1, 10.0)",
+            [(o, (o + k) % PRODUCTS + 1) for o in range(1, ORDERS + 1) for k in range(ITEMS_PER_ORDER)]
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO posting_jobs (id, job_type, status, payload, attempts, max_attempts, product_id) "
+            "VALUES (1, 'create_and_post', 'succeeded', '{}', 1, 5, 1)"
+        )
+
+
+# (method, path, json body) for every budgeted route
+CALLS = [
+    ("GET", "/api/products/?limit=100", None),
+    ("GET", "/api/products/1", None),
+    ("GET", "/api/products/search?q=product", None),
+    ("GET", "/api/products/categories", None),
+    ("GET", "/api/orders/?limit=100", None),
+    ("GET", "/api/orders/?status=pending&limit=100", None),
+    ("GET", "/api/orders/1", None),
+    ("GET", "/api/orders/analytics", None),
+    ("POST", "/api/orders/", {
+        "customer_name": "Customer", "customer_phone": "555",
+        "items": [{"product_id": i, "quantity": 2, "price": 0} for i in range(1, 21)]
+    }),
+    ("PUT", "/api/orders/2", {"notes": "Gift wrap", "status": "confirmed"}),
+    ("POST", "/api/orders/3/confirm", None),
+    ("POST", "/api/orders/4/complete", None),
+    ("POST", "/api/orders/5/cancel", None),
+    ("GET", "/api/jobs/1", None),
+]
+
+
+def main() -> int:
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+    _seed()
+
+    import main as app_main
+
+    budgeted = {
+        route.endpoint
+        for name, module in list(sys.modules.items()) if name.startswith("app.api.")
+        for route in getattr(getattr(module, "router", None), "routes", [])
+        if isinstance(route, APIRoute) and hasattr(route.endpoint, "__query_budget__")
+    }
+    exercised = set()
+    failures = 0
+
+    async def recording_app(scope, receive, send):
+        # The router stores the matched endpoint in the scope
+        await app_main.app(scope, receive, send)
+        if scope.get("endpoint") is not None:
+            exercised.add(scope["endpoint"])
+
+    with TestClient(recording_app) as client:
+        for method, path, body in CALLS:
+            response = client.request(method, path, json=body)
+            count = int(response.headers["X-Query-Count"])
+            budget = response.headers.get("X-Query-Budget")
+            over = budget is not None and count > int(budget)
+            failures += over or response.status_code >= 400
+            print(f"{'FAIL' if over else 'ok':<5}{method:<5}{path:<45}{response.status_code:>5}{count:>4} / {budget}")
+
+    for endpoint in budgeted - exercised:
+        print(f"FAIL no call reaches budgeted endpoint {endpoint.__module__}.{endpoint.__name__}")
+        failures += 1
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
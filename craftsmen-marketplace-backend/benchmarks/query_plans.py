@@ -0,0 +1,99 @@
+"""
+Check that the listing queries are served by the composite indexes
+
+Migrates a scratch SQLite database to head, then runs EXPLAIN QUERY PLAN
+for every filter combination of GET /api/products/ and GET /api/orders/.
+A plan that scans a whole table or sorts in a temp B-tree is reported as a
+failure and the script exits non-zero:
+
+    python benchmarks/query_plans.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+SCRATCH_DB = os.path.join(tempfile.mkdtemp(), "query_plans.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{SCRATCH_DB}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+
+from app.core.pagination import apply_keyset, encode_cursor  # noqa: E402
+from app.models.models import Order, Product  # noqa: E402
+
+
+CURSOR = encode_cursor(datetime(2026, 1, 1, 12, 0, 0), 1000)
+
+
+def _product_listing(category=None, owner_id=None, cursor=None):
+    query = select(Product).where(Product.is_active == True)  # noqa: E712
+    if category:
+        query = query.where(Product.category == category)
+    if owner_id:
+        query = query.where(Product.owner_id == owner_id)
+    if cursor:
+        return apply_keyset(query, Product.created_at, Product.id, cursor, "sqlite") \
+            .order_by(Product.created_at.desc(), Product.id.desc()).limit(101)
+    return query.order_by(Product.created_at.desc(), Product.id.desc()).offset(0).limit(100)
+
+
+def _order_listing(status=None, customer_id=None, cursor=None):
+    query = select(Order)
+    if status:
+        query = query.where(Order.status == status)
+    if customer_id:
+        query = query.where(Order.customer_id == customer_id)
+    if cursor:
+        return apply_keyset(query, Order.created_at, Order.id, cursor, "sqlite") \
+            .order_by(Order.created_at.desc(), Order.id.desc()).limit(101)
+    return query.order_by(Order.created_at.desc(), Order.id.desc()).offset(0).limit(100)
+
+
+QUERIES = {
+    "products": _product_listing(),
+    "products?category": _product_listing(category="pottery"),
+    "products?owner_id": _product_listing(owner_id=1),
+    "products?category&owner_id": _product_listing(category="pottery", owner_id=1),
+    "products?cursor": _product_listing(cursor=CURSOR),
+    "products?category&cursor": _product_listing(category="pottery", cursor=CURSOR),
+    "orders": _order_listing(),
+    "orders?status": _order_listing(status="pending"),
+    "orders?customer_id": _order_listing(customer_id=1),
+    "orders?cursor": _order_listing(cursor=CURSOR),
+    "orders?status&cursor": _order_listing(status="pending", cursor=CURSOR),
+}
+
+
+def _problems(plan):
+    details = [row[-1] for row in plan]
+    problems = [d for d in details if d.startswith("SCAN") and "USING" not in d]
+    problems += [d for d in details if "TEMP B-TREE" in d]
+    return details, problems
+
+
+def main() -> int:
+    config = Config(str(BACKEND_ROOT / "alembic.ini"))
+    command.upgrade(config, "head")
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    failures = 0
+    with engine.connect() as connection:
+        for name, query in QUERIES.items():
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            details, problems = _problems(plan)
+            status = "FAIL" if problems else "ok"
+            failures += bool(problems)
+            print(f"{status:<5}{name:<30}{' | '.join(details)}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Sales analytics from rollups vs scanning orders
+
+Migrates a scratch SQLite database and inserts ORDERS orders spread over a
+year, then rebuilds the rollups with the backfill command. It times the
+three queries GET /api/orders/analytics runs for a 30-day window. It
+compares them with the same report computed from orders, order items and
+products:
+
+    python benchmarks/sales_rollups.py [ORDERS]
+
+The run fails if the two disagree on the daily sales.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+SCRATCH_DB = os.path.join(tempfile.mkdtemp(), "sales_rollups.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{SCRATCH_DB}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.models.models import Order, OrderItem, Product  # noqa: E402
+from app.services.sales_rollups import SOLD_STATUSES, backfill_sales_rollups, sales_analytics  # noqa: E402
+
+PRODUCTS = 2000
+OWNERS = 200
+ITEMS_PER_ORDER = 3
+REPEATS = 10
+FIRST_DAY = date(2025, 10, 1)
+WINDOW = (date(2026, 8, 1), date(2026, 8, 30))
+
+
+def _seed(count: int):
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, username, email, hashed_password, full_name, is_active) VALUES (?, ?, ?, 'x', 'Artisan', 1)",
+            [(i, f"artisan{i}", f"artisan{i}@example.com") for i in range(1, OWNERS + 1)]
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO products (id, name, price, is_active, owner_id) VALUES (?, ?, ?, 1, ?)",
+            [(i, f"Product {i}", 10.0 + i % 90, i % OWNERS + 1) for i in range(1, PRODUCTS + 1)]
+        )
+        for start in range(1, count + 1, 50_000):
+            orders, items = [], []
+            for order_id in range(start, min(start + 50_000, count + 1)):
+                day = FIRST_DAY + timedelta(days=order_id * 365 // count)
+                lines = [(rng.randint(1, PRODUCTS), rng.randint(1, 3)) for _ in range(ITEMS_PER_ORDER)]
+                total = sum(quantity * (10.0 + product % 90) for product, quantity in lines)
+                status = rng.choice(["pending", "confirmed", "completed", "completed", "cancelled"])
+                orders.append((order_id, total, status, f"{day} 12:00:00"))
+                items.extend((order_id, product, quantity, 10.0 + product % 90) for product, quantity in lines)
+            connection.exec_driver_sql(
+                "INSERT INTO orders (id, total_amount, status, customer_name, customer_phone, created_at) "
+                "VALUES (?, ?, ?, 'Customer', '555', ?)", orders
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)", items
+            )
+
+
+async def _time(run):
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            result = await run(db)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return result, timings[len(timings) // 2]
+
+
+async def _from_orders(db):
+    """The same report straight from orders, items and products (range on the created_at index)"""
+    start, end = WINDOW
+    lines = (
+        select(
+            func.date(Order.created_at).label("day"), Order.id.label("order_id"),
+            OrderItem.product_id, Product.owner_id, OrderItem.quantity,
+            (OrderItem.quantity * OrderItem.price).label("revenue")
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .where(
+            Order.status.in_(SOLD_STATUSES),
+            Order.created_at >= datetime.combine(start, datetime.min.time()),
+            Order.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+        )
+        .subquery()
+    )
+    days = (await db.execute(
+        select(lines.c.day, func.count(func.distinct(lines.c.order_id)), func.sum(lines.c.revenue))
+        .group_by(lines.c.day).order_by(lines.c.day)
+    )).all()
+    await db.execute(
+        select(lines.c.product_id, func.count(func.distinct(lines.c.order_id)), func.sum(lines.c.quantity), func.sum(lines.c.revenue))
+        .group_by(lines.c.product_id).order_by(func.sum(lines.c.revenue).desc()).limit(10)
+    )
+    await db.execute(
+        select(lines.c.owner_id, func.sum(lines.c.quantity), func.sum(lines.c.revenue)).group_by(lines.c.owner_id)
+    )
+    return [(date.fromisoformat(day), orders, round(revenue, 2)) for day, orders, revenue in days]
+
+
+async def main():
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+
+    print(f"Seeding {orders:,} orders...")
+    _seed(orders)
+    started = time.perf_counter()
+    await backfill_sales_rollups()
+    backfill_seconds = time.perf_counter() - started
+
+    analytics, rollup_ms = await _time(lambda db: sales_analytics(db, *WINDOW))
+    expected, scan_ms = await _time(_from_orders)
+    actual = [(day["day"], day["orders"], day["revenue"]) for day in analytics["days"]]
+
+    print(f"\nBackfill: {orders / backfill_seconds:,.0f} orders/s")
+    print(f"\n{'30-day report':<24}{'p50 ms':>9}")
+    print(f"{'rollups (3 queries)':<24}{rollup_ms:>9.2f}")
+    print(f"{'from orders (3 queries)':<24}{scan_ms:>9.2f}")
+
+    if actual != expected:
+        print("\nFAIL: rollups disagree with the orders table")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
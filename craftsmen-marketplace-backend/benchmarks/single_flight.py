@@ -0,0 +1,123 @@
+"""
+Single-flight check: concurrent identical AI requests make one Gemini call
+
+Replaces the Gemini model of the shared AIService and GoogleAIAgent with a
+counting stand-in that answers after LATENCY seconds. It then fires
+CONCURRENCY identical requests at once through the API and the services:
+
+    python benchmarks/single_flight.py [CONCURRENCY]
+
+Each scenario prints the number of upstream calls it caused. The run fails
+if any scenario makes a different number of calls than expected.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'single_flight.db')}"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+import httpx  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+import main as app_main  # noqa: E402
+from app.services.registry import get_ai_agent, get_ai_service  # noqa: E402
+from app.services.single_flight import ai_flights  # noqa: E402
+
+LATENCY = 0.2
+
+
+class CountingModel:
+    """Answers like Gemini after LATENCY seconds and counts the calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(LATENCY)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return type("Response", (), {"text": f"CAPTION: Reply {call} ✨ DM to order\nHASHTAGS: #handmade, #clay"})()
+
+
+async def _scenario(name, model, expected_calls, requests, calls_before=None):
+    calls_before = model.calls if calls_before is None else calls_before
+    results = await asyncio.gather(*requests)
+    calls = model.calls - calls_before
+    distinct = len({str(result) for result in results})
+    ok = calls == expected_calls
+    print(f"{'ok' if ok else 'FAIL':<5}{name:<52}{len(results):>4} requests{calls:>4} calls{distinct:>4} distinct")
+    return ok
+
+
+async def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    command.upgrade(Config(str(BACKEND_ROOT / "alembic.ini")), "head")
+    model = CountingModel()
+    get_ai_service().model = model
+    get_ai_agent().model = model
+    service, agent = get_ai_service(), get_ai_agent()
+
+    caption = {"product_name": "Blue Vase", "price": 25, "category": "Pottery"}
+    preview = {"name": "Blue Vase", "price": "25", "category": "Pottery"}
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def caption_text(**params):
+            response = await client.post("/ai/generate-caption", json=caption, params=params)
+            return response.json()["caption"]
+
+        async def preview_caption(**params):
+            response = await client.post("/api/products/preview-content", data=preview, params=params)
+            return response.json()["content"]["base_caption"]
+
+        results = [
+            # fresh=true bypasses the caption cache, so only coalescing can save the calls
+            await _scenario(
+                "POST /ai/generate-caption?fresh=true", model, 1,
+                [caption_text(fresh="true") for _ in range(concurrency)]
+            ),
+            await _scenario(
+                "POST /api/products/preview-content?fresh=true", model, 2,  # content plus its analysis
+                [preview_caption(fresh="true") for _ in range(concurrency)]
+            ),
+        ]
+
+    results.append(await _scenario(
+        "comment replies to the same comment", model, 1,
+        [service.generate_comment_response("How much is it?", "pricing") for _ in range(concurrency)]
+    ))
+    results.append(await _scenario(
+        "captions for different products", model, 3,
+        [service.generate_product_caption(f"Vase {i % 3}", fresh=True) for i in range(concurrency)]
+    ))
+
+    model.fail = True
+    results.append(await _scenario(
+        "failing upstream (every caller gets the fallback)", model, 1,
+        [service.generate_comment_response("Do you ship?", "shipping") for _ in range(concurrency)]
+    ))
+    model.fail = False
+
+    # The first caller gives up; the others still get the shared result
+    calls_before = model.calls
+    first = asyncio.ensure_future(agent.analyze_content_performance("Lovely vase"))
+    await asyncio.sleep(0)
+    others = [agent.analyze_content_performance("Lovely vase") for _ in range(concurrency - 1)]
+    first.cancel()
+    results.append(await _scenario("first caller cancelled", model, 1, others, calls_before))
+
+    print(f"\n{ai_flights.stats()}")
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,8 @@
+import asyncio
+import math
 import sys
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Add the project root to Python path for proper module resolution
@@ -13,9 +16,9 @@ print(f"Project root: {project_root}")
 print(f"Current working directory: {os.getcwd()}")
 
 try:
-    from fastapi import FastAPI, Depends
-    from fastapi.staticfiles import StaticFiles
+    from fastapi import FastAPI, Depends, Request
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
     print("✓ FastAPI imports successful")
 except ImportError as e:
     print(f"✗ FastAPI import error: {e}")
@@ -23,7 +26,14 @@ except ImportError as e:
 
 try:
     from app.core.config import settings
-    from app.core.database import engine, Base
+    from app.core.upload_limits import MaxUploadSizeMiddleware
+    from app.core.query_budget import QueryBudgetMiddleware
+    from app.core.upload_files import UploadFiles
+    from app.services.registry import registry, get_caption_cache, get_product_cache
+    from app.services.job_queue import job_worker
+    from app.services.single_flight import ai_flights
+    from app.services.gemini_client import GeminiBusyError, scheduler_stats
+    from app.services.category_facets import reconcile_periodically
     print("✓ Core module imports successful")
 except ImportError as e:
     print(f"✗ Core module import error: {e}")
@@ -31,7 +41,7 @@ except ImportError as e:
     raise
 
 try:
-    from app.api import products, orders, speech, automation, native_products, native_speech, ai, native_products_compat
+    from app.api import products, orders, speech, automation, native_products, native_speech, ai, native_products_compat, jobs, storage
     print("✓ API module imports successful")
     api_modules_loaded = True
 except ImportError as e:
@@ -39,14 +49,30 @@ except ImportError as e:
     # Set flag to skip router inclusion
     api_modules_loaded = False
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic migrations (`python -m app.core.migrations`
+# on deploy), so importing the app no longer touches the database
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background job workers; service clients are built lazily on first use"""
+    await job_worker.start(settings.job_worker_count)
+    reconciler = None
+    if settings.category_reconcile_interval > 0:
+        reconciler = asyncio.create_task(reconcile_periodically(settings.category_reconcile_interval))
+    yield
+    if reconciler:
+        reconciler.cancel()
+    await job_worker.stop()
+    registry.shutdown()
+
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.version,
     description="Backend API for Craftsmen Marketplace - helping craftsmen showcase and sell their work",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -56,8 +82,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset pagination cursor for list endpoints
 )
 
+# Abort oversized uploads while they stream in
+app.add_middleware(MaxUploadSizeMiddleware)
+
+# Count SQL statements per request against the endpoints' @query_budget
+app.add_middleware(QueryBudgetMiddleware)
+
+
+@app.exception_handler(GeminiBusyError)
+async def gemini_busy_handler(request: Request, exc: GeminiBusyError):
+    """A full Gemini queue sheds load; Retry-After says when it should have drained"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "AI service is busy, please retry shortly"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+
 # Include API routers only if modules loaded successfully
 if api_modules_loaded:
     app.include_router(products.router, prefix="/api")
@@ -66,6 +110,8 @@ if api_modules_loaded:
     app.include_router(automation.router, prefix="/api")
     app.include_router(native_products.router, prefix="/api")
     app.include_router(native_speech.router, prefix="/api")
+    app.include_router(jobs.router, prefix="/api")
+    app.include_router(storage.router, prefix="/api")
     app.include_router(ai.router, prefix="/ai", tags=["AI"])
     app.include_router(native_products_compat.router)  # Direct path for frontend compatibility
 else:
@@ -74,8 +120,8 @@ else:
 # Create uploads directory
 os.makedirs(settings.upload_folder, exist_ok=True)
 
-# Serve uploaded files
-app.mount(f"/{settings.upload_folder}", StaticFiles(directory=settings.upload_folder), name="uploads")
+# Serve uploaded files with long-lived caching and WebP negotiation
+app.mount(f"/{settings.upload_folder}", UploadFiles(directory=settings.upload_folder), name="uploads")
 
 
 @app.get("/")
@@ -92,7 +138,15 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "app": settings.app_name}
+    return {
+        "status": "healthy",
+        "app": settings.app_name,
+        "services": registry.status(),
+        "product_cache": get_product_cache().stats(),
+        "caption_cache": get_caption_cache().stats(),
+        "ai_single_flight": ai_flights.stats(),
+        "gemini_scheduler": scheduler_stats()
+    }
 
 
 if __name__ == "__main__":
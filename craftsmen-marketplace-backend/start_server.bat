@@ -9,4 +9,7 @@ echo.
 echo Press Ctrl+C to stop the server
 echo.
 
+echo Applying database migrations...
+uv run python -m app.core.migrations
+
 uv run python main.py
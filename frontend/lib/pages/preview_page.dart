@@ -123,7 +123,7 @@ class _PreviewPageState extends State<PreviewPage> {
       print('📊 Backend Response Status: ${response.statusCode}');
       print('📊 Backend Response Body: $responseBody');
 
-      if (response.statusCode == 200) {
+      if (response.statusCode == 200 || response.statusCode == 202) {
         var jsonResponse = json.decode(responseBody);
         _showSuccessDialog(jsonResponse);
       } else {
@@ -284,7 +284,7 @@ class _ProductUploadPageState extends State<ProductUploadPage> {
       print('📊 Backend Response Status: ${response.statusCode}');
       print('📊 Backend Response: $responseBody');
 
-      if (response.statusCode == 200) {
+      if (response.statusCode == 200 || response.statusCode == 202) {
         var jsonResponse = json.decode(responseBody);
         _showSuccessDialog(jsonResponse);
         _resetForm();